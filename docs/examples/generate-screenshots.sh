@@ -4,4 +4,4 @@ set -euo pipefail
 
 THIS_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 
-echo ${THIS_DIR}/*.py | xargs -n 1 -P 8 python
+python -m counterweight screenshots ${THIS_DIR}/*.py
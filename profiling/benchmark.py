@@ -0,0 +1,321 @@
+"""Per-phase render benchmarks on scalable synthetic trees.
+
+Unlike canvas.py and dashboard.py, which are meant to be watched (and run under
+scalene), this runs the render pipeline directly, without an event loop or a
+terminal, and times each phase of each frame separately: updating the shadow
+tree, layout, painting, border healing, diffing, and generating instructions.
+
+Each scenario is a synthetic tree of nested Divs with Text leaves, described by
+its number of nodes, depth, text per leaf and how it is wrapped, the fraction of
+Divs with (collapsed, healed) borders, the fraction of leaves whose text changes
+every frame, and the screen size. Pick scenarios by name, or describe your own, e.g.
+
+    python profiling/benchmark.py small nodes=5000,depth=4,width=200,height=60
+
+Results can be saved as JSON and compared against a saved baseline, in which
+case the script fails if any phase's median got slower than the threshold:
+
+    python profiling/benchmark.py --output baseline.json
+    python profiling/benchmark.py --baseline baseline.json
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+from dataclasses import asdict, dataclass, fields, replace
+from math import ceil
+from pathlib import Path
+from random import Random
+from time import perf_counter_ns
+
+import waxy
+from typer import Argument, Exit, Option, run
+
+from counterweight.app import diff_changes, diff_paint
+from counterweight.border_healing import BorderHealer
+from counterweight.components import Component, component
+from counterweight.constants import __version__
+from counterweight.elements import AnyElement, Chunk, Div, Text
+from counterweight.geometry import Position
+from counterweight.layout import compute_layout
+from counterweight.output import paint_to_instructions
+from counterweight.paint import BLANK, Paint, paint_layout
+from counterweight.recording import PhaseStats, PhaseTimings
+from counterweight.shadow import ShadowNode, update_shadow
+from counterweight.styles import Style
+from counterweight.styles.styles import CellStyle, TextWrap
+from counterweight.styles.utilities import (
+    amber_400,
+    border_collapse,
+    border_light,
+    col,
+    cyan_400,
+    green_400,
+    grow,
+    row,
+    slate_400,
+)
+
+_WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore".split()
+_STYLES = tuple(CellStyle(foreground=color) for color in (amber_400, cyan_400, green_400, slate_400))
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    nodes: int = 100
+    depth: int = 3
+    text: int = 20
+    """The number of characters of text in each leaf."""
+    borders: float = 0.5
+    """The fraction of Divs that have (collapsed) borders."""
+    churn: float = 0.1
+    """The fraction of leaves whose text changes every frame."""
+    wrap: TextWrap = "none"
+    """How the text in each leaf is wrapped."""
+    width: int = 80
+    height: int = 24
+    seed: int = 0
+
+    @classmethod
+    def parse(cls, spec: str) -> Scenario:
+        if spec in SCENARIOS:
+            return SCENARIOS[spec]
+
+        types = {f.name: f.type for f in fields(cls)}
+        changes: dict[str, float | int | str] = {}
+        for assignment in spec.split(","):
+            key, _, value = assignment.partition("=")
+            if key not in types:
+                raise ValueError(f"Unknown scenario {spec!r}: expected one of {sorted(SCENARIOS)} or key=value pairs")
+            match types[key]:
+                case "float":
+                    changes[key] = float(value)
+                case "int":
+                    changes[key] = int(value)
+                case _:
+                    changes[key] = value
+
+        return replace(cls(), **changes)  # type: ignore[arg-type]
+
+
+SCENARIOS = {
+    "small": Scenario(),
+    "wide": Scenario(nodes=1_000, depth=2),
+    "deep": Scenario(nodes=500, depth=12),
+    "text": Scenario(nodes=200, text=400, width=160, height=60),
+    "borders": Scenario(nodes=1_000, depth=4, borders=1.0, width=160, height=60),
+    "churn": Scenario(nodes=1_000, depth=4, churn=1.0, width=160, height=60),
+    "large": Scenario(nodes=2_000, depth=5, width=250, height=70),
+    "pretty": Scenario(nodes=20, depth=1, text=5_000, wrap="pretty", width=250, height=70),
+}
+
+
+@component
+def leaf(index: int, words: str, wrap: TextWrap, frame: int) -> Text:
+    return Text(
+        content=[
+            Chunk(content=f"{index}:{frame} ", style=_STYLES[index % len(_STYLES)]),
+            Chunk(content=words, style=_STYLES[(index + frame) % len(_STYLES)]),
+        ],
+        style=grow(1) | Style(text_wrap=wrap),
+    )
+
+
+def _words(rng: Random, length: int) -> str:
+    words: list[str] = []
+    while sum(map(len, words)) + len(words) < length:
+        words.append(rng.choice(_WORDS))
+    return " ".join(words)[:length]
+
+
+@component
+def synthetic(scenario: Scenario, frame: int) -> Div:
+    """
+    Nodes are handed out breadth-first, level by level, so the tree is as balanced as the node budget allows.
+    The structure and text are seeded, so they are the same in every frame (and every run);
+    only the churned leaves change from frame to frame.
+    """
+    rng = Random(scenario.seed)
+    branching = max(2, ceil(scenario.nodes ** (1 / max(scenario.depth, 1))))
+
+    levels: list[list[list[int]]] = [[[]]]  # the children (as indexes into the next level) of each node, by level
+    budget = scenario.nodes - 1
+    while budget > 0 and len(levels) <= scenario.depth:
+        level: list[list[int]] = []
+        for children in levels[-1]:
+            for _ in range(min(branching, budget)):
+                children.append(len(level))
+                level.append([])
+                budget -= 1
+        levels.append(level)
+
+    leaves = 0
+    elements: list[AnyElement | Component] = []
+    for depth, level in reversed(list(enumerate(levels))):
+        built: list[AnyElement | Component] = []
+        for children in level:
+            if children:
+                bordered = rng.random() < scenario.borders
+                built.append(
+                    Div(
+                        style=(row if depth % 2 else col)
+                        | grow(1)
+                        | (border_light | border_collapse if bordered else Style()),
+                        children=[elements[child] for child in children],
+                    )
+                )
+            else:
+                churned = rng.random() < scenario.churn
+                built.append(leaf(leaves, _words(rng, scenario.text), scenario.wrap, frame if churned else 0))
+                leaves += 1
+        elements = built
+
+    root = elements[0]
+    return root if isinstance(root, Div) else Div(style=grow(1), children=[root])
+
+
+def _screen(scenario: Scenario, frame: int) -> Div:
+    return Div(
+        style=Style(
+            layout=waxy.Style(
+                display=waxy.Display.Grid,
+                size_width=waxy.Length(scenario.width),
+                size_height=waxy.Length(scenario.height),
+            )
+        ),
+        children=(synthetic(scenario, frame),),
+    )
+
+
+def measure(scenario: Scenario, frames: int, warmup: int = 5) -> PhaseTimings:
+    """Render `warmup + frames` frames of the scenario, like the application's render cycle does, timing the last `frames`."""
+    timings = PhaseTimings()
+    available = waxy.AvailableSize(width=waxy.Definite(scenario.width), height=waxy.Definite(scenario.height))
+    border_healer = BorderHealer()
+
+    shadow: ShadowNode | None = None
+    current_paint: Paint = {Position(x, y): BLANK for x in range(scenario.width) for y in range(scenario.height)}
+    unhealed_paint = current_paint.copy()
+    for frame in range(warmup + frames):
+        phases: dict[str, int] = {}
+
+        start = perf_counter_ns()
+        shadow, _ = update_shadow(_screen(scenario, frame), shadow)
+        phases["shadow"] = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        elements_and_layouts = compute_layout(shadow, available)
+        phases["layout"] = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        new_paint, hints = paint_layout(elements_and_layouts)
+        phases["paint"] = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        unhealed_diff = diff_paint(new_paint, unhealed_paint)
+        unhealed_paint |= unhealed_diff
+        phases["diff"] = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        changes = unhealed_diff | border_healer.heal(unhealed_paint, hints, unhealed_diff)
+        phases["heal_borders"] = perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        diff = diff_changes(changes, current_paint)
+        current_paint |= diff
+        phases["diff"] += perf_counter_ns() - start
+
+        start = perf_counter_ns()
+        paint_to_instructions(diff)
+        phases["instructions"] = perf_counter_ns() - start
+
+        phases["total"] = sum(phases.values())
+        if frame >= warmup:
+            timings.add_frame(phases)
+
+    return timings
+
+
+def compare(
+    results: dict[str, dict[str, PhaseStats]],
+    baseline: dict[str, dict[str, PhaseStats]],
+    threshold: float,
+) -> list[str]:
+    """Print the change in each phase's median from the baseline, and return the phases that regressed."""
+    regressions = []
+    print(f"{'scenario':<24}{'phase':<14}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, phases in results.items():
+        for phase, stats in phases.items():
+            if (before := baseline.get(name, {}).get(phase)) is None:
+                continue
+
+            change = stats.p50_ns / before.p50_ns - 1 if before.p50_ns else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{name}/{phase}")
+            print(f"{name:<24}{phase:<14}{before.p50_ns / 1e6:>10.3f}{stats.p50_ns / 1e6:>10.3f}{change:>+9.1%}{flag}")
+
+    return regressions
+
+
+def _load(path: Path) -> dict[str, dict[str, PhaseStats]]:
+    data = json.loads(path.read_text())
+    return {
+        name: {phase: PhaseStats(**stats) for phase, stats in scenario["phases"].items()}
+        for name, scenario in data["scenarios"].items()
+    }
+
+
+def main(
+    scenarios: list[str] = Argument(
+        default=None, help=f"Scenarios to run, by name ({', '.join(SCENARIOS)}) or as key=value pairs. Default: all."
+    ),
+    frames: int = Option(default=20, help="The number of frames to time in each scenario."),
+    output: Path | None = Option(default=None, help="Write the results to this JSON file."),
+    baseline: Path | None = Option(default=None, help="Compare the results to this JSON file of earlier results."),
+    threshold: float = Option(
+        default=0.2, help="Fail if a phase's median is slower than the baseline's by more than this fraction."
+    ),
+) -> None:
+    chosen = {spec: Scenario.parse(spec) for spec in scenarios or SCENARIOS}
+
+    results: dict[str, dict[str, PhaseStats]] = {}
+    for name, scenario in chosen.items():
+        timings = measure(scenario, frames=frames)
+        results[name] = timings.summary()
+        print(f"{name}: {scenario}")
+        print(timings.report())
+        print()
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps(
+                {
+                    "counterweight": __version__,
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "frames": frames,
+                    "scenarios": {
+                        name: {
+                            "scenario": asdict(chosen[name]),
+                            "phases": {phase: asdict(stats) for phase, stats in phases.items()},
+                        }
+                        for name, phases in results.items()
+                    },
+                },
+                indent=2,
+            )
+        )
+
+    if baseline is not None:
+        if regressions := compare(results, _load(baseline), threshold):
+            print(f"\n{len(regressions)} phases regressed by more than {threshold:.0%}: {', '.join(regressions)}")
+            raise Exit(code=1)
+
+
+if __name__ == "__main__":
+    run(main)
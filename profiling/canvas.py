@@ -6,11 +6,11 @@ from itertools import product
 
 from counterweight.app import app
 from counterweight.components import component
-from counterweight.elements import Chunk, Div, Text
+from counterweight.elements import Canvas, Chunk, Div, Text
 from counterweight.hooks import use_effect, use_state
 from counterweight.styles.styles import COLORS_BY_NAME
 from counterweight.styles.utilities import *
-from counterweight.utils import canvas, clamp
+from counterweight.utils import clamp
 
 _frame_times: deque[float] = deque(maxlen=300)
 
@@ -94,7 +94,7 @@ n = 30
 
 
 @component
-def random_walkers() -> Text:
+def random_walkers() -> Canvas:
     # We don't update the colors, but we want to generate a unique set of colors in each instance of the component,
     # so we use a state hook to generate them once and then never update them
     colors, _set_colors = use_state(lambda: random.sample(list(COLORS_BY_NAME.values()), k=n))
@@ -119,12 +119,10 @@ def random_walkers() -> Text:
 
     use_effect(tick, deps=())
 
-    return Text(
-        content=canvas(
-            width=w,
-            height=h,
-            cells=dict(zip(walkers, colors)),
-        ),
+    return Canvas.from_colors(
+        width=w,
+        height=h,
+        colors=dict(zip(walkers, colors)),
         style=border_heavy | border_color("slate", 400),
     )
 
@@ -0,0 +1,152 @@
+"""
+Packing of canvas pixels into sub-cell glyphs (sextants and Braille patterns).
+
+Each cell of a sub-cell canvas shows a block of `CELL_SIZES[mode]` pixels as a single glyph,
+where each pixel is either lit (any non-zero channel) or unlit.
+The pixels are packed into one bitmask per cell with whole-row integer operations
+(or with NumPy, if it is installed), instead of visiting each pixel from Python.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Literal
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+type SubCellMode = Literal["sextant", "braille"]
+
+# Both kinds of glyph are two pixels wide, which _pack_python relies on.
+CELL_SIZES: dict[SubCellMode, tuple[int, int]] = {
+    "sextant": (2, 3),
+    "braille": (2, 4),
+}
+
+# The bit that each (x, y) pixel within a cell sets in the cell's mask.
+_BITS: dict[SubCellMode, tuple[tuple[int, ...], ...]] = {
+    # Sextant bits go left-to-right, top-to-bottom, matching the order of the Unicode sextant characters.
+    "sextant": ((0x01, 0x02), (0x04, 0x08), (0x10, 0x20)),
+    # Braille dots 1-2-3 run down the left column, 4-5-6 down the right, then 7 and 8 along the bottom.
+    "braille": ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80)),
+}
+
+
+def _sextant_glyph(mask: int) -> str:
+    # The "Symbols for Legacy Computing" block has every sextant except the four
+    # that already exist as block elements: empty, left half, right half, and full.
+    match mask:
+        case 0:
+            return " "
+        case 0b010101:
+            return "▌"
+        case 0b101010:
+            return "▐"
+        case 0b111111:
+            return "█"
+        case _:
+            return chr(0x1FB00 + mask - 1 - (mask > 0b010101) - (mask > 0b101010))
+
+
+GLYPHS: dict[SubCellMode, tuple[str, ...]] = {
+    "sextant": tuple(_sextant_glyph(mask) for mask in range(2**6)),
+    "braille": (" ", *(chr(0x2800 + mask) for mask in range(1, 2**8))),
+}
+
+_NO_COLOR = bytes(3)
+
+# Maps each byte to 0xFF if it is non-zero, so that a channel becomes a lit/unlit mask that can be ANDed with bits.
+_LIT = bytes([0x00] + [0xFF] * 255)
+
+
+def _lit(row: bytes) -> int:
+    """Return the row's pixels as a big integer with one byte per pixel: 0xFF if it is lit, 0x00 if not."""
+    return (
+        int.from_bytes(row[0::3].translate(_LIT))
+        | int.from_bytes(row[1::3].translate(_LIT))
+        | int.from_bytes(row[2::3].translate(_LIT))
+    )
+
+
+@lru_cache(maxsize=2**6)
+def _row_bits(mode: SubCellMode, dy: int, width: int) -> int:
+    """Return a big integer with one byte per pixel in a row, holding the bit that pixel sets in its cell's mask."""
+    cell_width = CELL_SIZES[mode][0]
+    return int.from_bytes(bytes(_BITS[mode][dy]) * (width // cell_width))
+
+
+def pack(pixels: bytes, width: int, height: int, mode: SubCellMode) -> list[tuple[bytes, bytes]]:
+    """
+    Pack RGB `pixels` into one `(masks, colors)` pair per row of cells,
+    where `masks` has one byte per cell (the bits of its lit pixels)
+    and `colors` has three bytes per cell (the color of its first lit pixel, in reading order).
+    """
+    if HAS_NUMPY:
+        return _pack_numpy(pixels, width, height, mode)
+    return _pack_python(pixels, width, height, mode)
+
+
+def _pack_python(pixels: bytes, width: int, height: int, mode: SubCellMode) -> list[tuple[bytes, bytes]]:
+    cell_width, cell_height = CELL_SIZES[mode]
+    columns = width // cell_width
+    row_bytes = 3 * width
+
+    rows = []
+    for top in range(0, height, cell_height):
+        # Each pixel's byte holds its bit if it is lit; since the bits within a cell are disjoint, ORing
+        # the sub-rows together and then the pixels of each cell together gives each cell's mask.
+        bits = 0
+        for dy in range(cell_height):
+            row = pixels[(top + dy) * row_bytes : (top + dy + 1) * row_bytes]
+            bits |= _lit(row) & _row_bits(mode, dy, width)
+
+        by_pixel = bits.to_bytes(width)
+        masks = (int.from_bytes(by_pixel[0::2]) | int.from_bytes(by_pixel[1::2])).to_bytes(columns)
+
+        colors = bytearray(3 * columns)
+        for column, mask in enumerate(masks):
+            if mask:
+                colors[3 * column : 3 * column + 3] = _first_lit_color(
+                    pixels, row_bytes, top, cell_width * column, cell_width, cell_height
+                )
+
+        rows.append((masks, bytes(colors)))
+
+    return rows
+
+
+def _first_lit_color(pixels: bytes, row_bytes: int, top: int, left: int, cell_width: int, cell_height: int) -> bytes:
+    for y in range(top, top + cell_height):
+        for x in range(left, left + cell_width):
+            offset = y * row_bytes + 3 * x
+            color = pixels[offset : offset + 3]
+            if color != _NO_COLOR:
+                return color
+    return _NO_COLOR
+
+
+def _pack_numpy(pixels: bytes, width: int, height: int, mode: SubCellMode) -> list[tuple[bytes, bytes]]:
+    cell_width, cell_height = CELL_SIZES[mode]
+    rows, columns = height // cell_height, width // cell_width
+
+    # (rows, columns, pixels per cell in reading order, channels)
+    cells = (
+        np.frombuffer(pixels, dtype=np.uint8)
+        .reshape(rows, cell_height, columns, cell_width, 3)
+        .transpose(0, 2, 1, 3, 4)
+        .reshape(rows, columns, cell_height * cell_width, 3)
+    )
+    lit = cells.any(axis=3)
+
+    bits = np.array([bit for row in _BITS[mode] for bit in row], dtype=np.uint8)
+    masks = np.bitwise_or.reduce(np.where(lit, bits, 0), axis=2).astype(np.uint8)
+
+    first = lit.argmax(axis=2)
+    colors = np.take_along_axis(cells, first[:, :, None, None], axis=2)[:, :, 0, :]
+    colors = np.where(masks[:, :, None] != 0, colors, 0).astype(np.uint8)
+
+    return [(masks[row].tobytes(), colors[row].tobytes()) for row in range(rows)]
@@ -0,0 +1,226 @@
+"""
+Decoding of text containing ANSI escape sequences (e.g., the colorized output of a subprocess) into styled chunks.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import replace
+from functools import lru_cache
+
+from counterweight.elements import Chunk
+from counterweight.styles.styles import _DEFAULT_CELL_STYLE, CellStyle, Color
+
+# CSI sequences (whose final byte is "m" for SGR sequences), OSC sequences, and two-byte escape sequences.
+_ESCAPE = re.compile(r"\x1b(?:\[([0-?]*)[ -/]*([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])")
+# A prefix of an escape sequence that may be completed by the next piece of a stream.
+_INCOMPLETE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?)?\Z")
+
+# The xterm defaults for the 16 standard colors.
+_STANDARD_COLORS = tuple(
+    Color(*rgb)
+    for rgb in (
+        (0, 0, 0),
+        (205, 0, 0),
+        (0, 205, 0),
+        (205, 205, 0),
+        (0, 0, 238),
+        (205, 0, 205),
+        (0, 205, 205),
+        (229, 229, 229),
+        (127, 127, 127),
+        (255, 0, 0),
+        (0, 255, 0),
+        (255, 255, 0),
+        (92, 92, 255),
+        (255, 0, 255),
+        (0, 255, 255),
+        (255, 255, 255),
+    )
+)
+
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+PALETTE_256: tuple[Color, ...] = (
+    *_STANDARD_COLORS,
+    *(Color(_CUBE_LEVELS[r], _CUBE_LEVELS[g], _CUBE_LEVELS[b]) for r in range(6) for g in range(6) for b in range(6)),
+    *(Color(level, level, level) for level in range(8, 248, 10)),
+)
+"""The RGB values of the 256 indexed colors, as displayed by xterm."""
+
+
+def _extended_color(params: list[int], i: int) -> tuple[Color | None, int]:
+    """Parse the color after a 38 or 48 at `params[i]`, returning the color and the index of the next parameter."""
+    match params[i + 1 : i + 2]:
+        case [5]:
+            index = params[i + 2] if i + 2 < len(params) else 0
+            return (PALETTE_256[index] if 0 <= index < 256 else None), i + 3
+        case [2]:
+            rgb = params[i + 2 : i + 5]
+            if len(rgb) == 3 and all(0 <= c < 256 for c in rgb):
+                return Color(*rgb), i + 5
+            return None, i + 5
+        case _:
+            return None, i + 2
+
+
+@lru_cache(maxsize=2**12)
+def _apply_sgr(style: CellStyle, params: str, base: CellStyle) -> CellStyle:
+    """Return the style that results from applying the SGR parameters `params` to `style`."""
+    codes = [int(code) if code.isdigit() else 0 for code in params.replace(":", ";").split(";")]
+
+    changes: dict[str, object] = {}
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        i += 1
+        if code == 0:
+            style = base
+            changes.clear()
+        elif code == 1:
+            changes["bold"] = True
+        elif code == 2:
+            changes["dim"] = True
+        elif code == 3:
+            changes["italic"] = True
+        elif code == 4:
+            changes["underline"] = True
+        elif code == 9:
+            changes["strikethrough"] = True
+        elif code == 22:
+            changes["bold"] = changes["dim"] = False
+        elif code == 23:
+            changes["italic"] = False
+        elif code == 24:
+            changes["underline"] = False
+        elif code == 29:
+            changes["strikethrough"] = False
+        elif 30 <= code <= 37:
+            changes["foreground"] = _STANDARD_COLORS[code - 30]
+        elif 90 <= code <= 97:
+            changes["foreground"] = _STANDARD_COLORS[code - 90 + 8]
+        elif code == 39:
+            changes["foreground"] = base.foreground
+        elif 40 <= code <= 47:
+            changes["background"] = _STANDARD_COLORS[code - 40]
+        elif 100 <= code <= 107:
+            changes["background"] = _STANDARD_COLORS[code - 100 + 8]
+        elif code == 49:
+            changes["background"] = base.background
+        elif code in (38, 48):
+            color, i = _extended_color(codes, i - 1)
+            if color is not None:
+                changes["foreground" if code == 38 else "background"] = color
+        # Everything else (blinking, reverse video, fonts, ...) has no equivalent in CellStyle and is ignored.
+
+    return replace(style, **changes) if changes else style  # type: ignore[arg-type]
+
+
+@lru_cache(maxsize=2**12)
+def _parse(text: str, style: CellStyle, base: CellStyle) -> tuple[tuple[Chunk, ...], CellStyle]:
+    """
+    Split `text` into chunks, starting in `style`, and return them along with the style in effect at the end of `text`.
+
+    The text between two escape sequences becomes a single chunk,
+    so the cost is per escape sequence rather than per character.
+    """
+    chunks: list[Chunk] = []
+    pending = ""
+    position = 0
+    for match in _ESCAPE.finditer(text):
+        if match.start() > position:
+            pending += text[position : match.start()]
+        if match.group(2) == "m":
+            new_style = _apply_sgr(style, match.group(1), base)
+            if new_style is not style and pending:
+                chunks.append(Chunk(content=pending, style=style))
+                pending = ""
+            style = new_style
+        position = match.end()
+
+    pending += text[position:]
+    if pending:
+        chunks.append(Chunk(content=pending, style=style))
+
+    return tuple(chunks), style
+
+
+def parse_ansi(text: str, style: CellStyle = _DEFAULT_CELL_STYLE) -> tuple[Chunk, ...]:
+    """
+    Parse text containing ANSI escape sequences into [`Chunk`][counterweight.elements.Chunk]s.
+
+    SGR sequences (colors and text attributes) set the style of the chunks that follow them;
+    all other escape sequences are dropped.
+    Results are cached, so parsing the same text (e.g., a repeated log line) again is cheap.
+
+    Parameters:
+        text: The text to parse.
+        style: The style of text before the first SGR sequence, and after a reset (`ESC[0m`).
+    """
+    return _parse(text, style, style)[0]
+
+
+class AnsiDecoder:
+    """
+    A streaming decoder for text containing ANSI escape sequences,
+    which keeps the current style (and any incomplete escape sequence) from one piece of text to the next,
+    so that it can be fed the output of a subprocess as it arrives.
+    """
+
+    __slots__ = ("_line", "_pending", "_style", "base")
+
+    def __init__(self, style: CellStyle = _DEFAULT_CELL_STYLE) -> None:
+        self.base = style
+        self._style = style
+        self._pending = ""
+        self._line: list[Chunk] = []
+
+    @property
+    def style(self) -> CellStyle:
+        """The style that will be applied to the next text that is decoded."""
+        return self._style
+
+    def _complete(self, data: str) -> str:
+        data = self._pending + data
+        last = data.rfind("\x1b")
+        # A trailing ESC might be the start of an OSC sequence's terminator, rather than of a new sequence.
+        starts = (data.rfind("\x1b", 0, last), last) if last == len(data) - 1 else (last,)
+        for start in starts:
+            if start >= 0 and _INCOMPLETE.match(data, start):
+                self._pending = data[start:]
+                return data[:start]
+        self._pending = ""
+        return data
+
+    def feed(self, data: str) -> tuple[Chunk, ...]:
+        """Decode the next piece of the stream into chunks."""
+        chunks, self._style = _parse(self._complete(data), self._style, self.base)
+        return chunks
+
+    def feed_lines(self, data: str) -> list[tuple[Chunk, ...]]:
+        """
+        Decode the next piece of the stream, returning the chunks of each line that it completes.
+        The start of an unfinished line is held until the rest of the line arrives.
+
+        Each line is parsed (and cached) on its own, so repeated lines are only parsed once.
+        """
+        *lines, rest = self._complete(data).split("\n")
+
+        completed = []
+        for line in lines:
+            chunks, self._style = _parse(line, self._style, self.base)
+            completed.append((*self._line, *chunks))
+            self._line = []
+
+        if rest:
+            chunks, self._style = _parse(rest, self._style, self.base)
+            self._line.extend(chunks)
+
+        return completed
+
+    def flush(self) -> tuple[Chunk, ...]:
+        """Return the chunks of the unfinished line (if any), and reset the decoder's line buffer."""
+        line = tuple(self._line)
+        self._line = []
+        self._pending = ""
+        return line
@@ -6,7 +6,6 @@ import sys
 from asyncio import CancelledError, Queue, QueueEmpty, Task, TaskGroup, get_running_loop
 from collections import deque
 from collections.abc import Callable
-from itertools import chain, repeat
 from signal import SIG_DFL, SIGWINCH, signal
 from threading import Event, Thread
 from time import perf_counter_ns
@@ -18,7 +17,8 @@ from structlog import get_logger
 
 from counterweight._context_vars import current_event_queue, current_use_mouse_listeners
 from counterweight._utils import cancel, drain_queue, maybe_await
-from counterweight.border_healing import heal_borders
+from counterweight.border_healing import BorderHealer
+from counterweight.clock import VirtualClock
 from counterweight.components import Component, component
 from counterweight.controls import (
     AnyControl,
@@ -28,6 +28,7 @@ from counterweight.controls import (
     Screenshot,
     Suspend,
     ToggleBorderHealing,
+    Wait,
     _Control,
 )
 from counterweight.elements import AnyElement, Div
@@ -41,15 +42,18 @@ from counterweight.events import (
     MouseScrolledUp,
     MouseUp,
     StateSet,
+    StoreChanged,
     TerminalResized,
 )
 from counterweight.geometry import Position
 from counterweight.hooks import Mouse
 from counterweight.input import read_keys, start_input_control, stop_input_control
-from counterweight.layout import ResolvedLayout, compute_layout
+from counterweight.layout import WRAP_CACHE, ResolvedLayout, compute_layout, reuse_layout
 from counterweight.logging import configure_logging
 from counterweight.output import (
     CLEAR_SCREEN,
+    ColorDepth,
+    detect_color_depth,
     paint_to_instructions,
     paint_to_str,
     start_mouse_tracking,
@@ -57,8 +61,9 @@ from counterweight.output import (
     stop_mouse_tracking,
     stop_output_control,
 )
-from counterweight.paint import BLANK, Paint, paint_layout, svg
-from counterweight.shadow import ShadowNode, update_shadow
+from counterweight.paint import BLANK, Paint, paint_layout, svg, write_svg
+from counterweight.recording import AsciicastRecorder, InputRecorder, PhaseTimings
+from counterweight.shadow import ShadowChange, ShadowNode, classify_change, update_dirty_shadow, update_shadow
 from counterweight.styles import Style
 
 logger = get_logger()
@@ -79,6 +84,11 @@ async def app(
     headless: bool = False,
     dimensions: tuple[int, int] | None = None,
     autopilot: Iterable[AnyEvent | AnyControl] = (),
+    color_depth: ColorDepth | None = None,
+    recorder: AsciicastRecorder | None = None,
+    input_recorder: InputRecorder | None = None,
+    timings: PhaseTimings | None = None,
+    clock: VirtualClock | None = None,
 ) -> None:
     """
     Parameters:
@@ -93,9 +103,32 @@ async def app(
             This is primarily useful for testing or generating screenshots programmatically.
             Note that the autopilot will not be processed until after the initial render cycle,
             and that using the autopilot does not automatically cause the application to quit!
+        color_depth: The number of colors the terminal supports:
+            `"truecolor"` (24-bit color), `"256"`, or `"16"`.
+            Colors are approximated by the nearest color in the terminal's palette.
+            If `None`, the color depth is detected from the environment
+            (see [`detect_color_depth`][counterweight.output.detect_color_depth]).
+        recorder: If given, every frame that the application draws is recorded by this
+            [`AsciicastRecorder`][counterweight.recording.AsciicastRecorder] (even when running headless).
+            The recording is finished when the application stops.
+        input_recorder: If given, every input event that the application receives (including terminal resizes)
+            is recorded by this [`InputRecorder`][counterweight.recording.InputRecorder],
+            so that the session can be replayed later.
+        timings: If given, the duration of each phase of each render cycle is collected in this
+            [`PhaseTimings`][counterweight.recording.PhaseTimings].
+        clock: If given, the application runs on this [`VirtualClock`][counterweight.clock.VirtualClock]
+            instead of in real time, so that timers (and `Wait` controls in the autopilot)
+            are skipped over as soon as the application is idle.
+            Only allowed when running headless.
     """
+    if clock is not None and not headless:
+        raise ValueError("A virtual clock can only be used when running headless")
+
     configure_logging()
 
+    if color_depth is None:
+        color_depth = detect_color_depth()
+
     def handle_screen_size_change(override: tuple[int, int] | None = None) -> tuple[Style, Paint, int, int]:
         w, h = override or dimensions or shutil.get_terminal_size()
 
@@ -109,8 +142,16 @@ async def app(
 
         cp = {Position(x, y): BLANK for x in range(w) for y in range(h)}
 
-        if not headless:
-            output_stream.write(CLEAR_SCREEN + paint_to_instructions(paint=cp))
+        if not headless or recorder is not None:
+            clear = CLEAR_SCREEN + paint_to_instructions(paint=cp, color_depth=color_depth)
+            if not headless:
+                output_stream.write(clear)
+            if recorder is not None:
+                recorder.resize(w, h)
+                recorder.output(clear)
+
+        if input_recorder is not None:
+            input_recorder.resize(w, h)
 
         return ss, cp, w, h
 
@@ -127,6 +168,8 @@ async def app(
     current_use_mouse_listeners.set(use_mouse_listeners)
 
     loop = get_running_loop()
+    if clock is not None:
+        clock.attach(loop)
 
     def put_event(event: AnyEvent) -> None:
         loop.call_soon_threadsafe(event_queue.put_nowait, event)
@@ -158,11 +201,14 @@ async def app(
             key_thread.start()
 
         screen_style, current_paint, w, h = handle_screen_size_change()
+        unhealed_paint = current_paint.copy()  # what is on the screen, minus the healed borders
 
         should_render = True
+        should_render_dirty = False  # only re-render components marked dirty by a store update
         shadow: ShadowNode | None = None
         active_effects: set[Task[None]] = set()
         elements_and_layouts: list[tuple[AnyElement, ResolvedLayout]] = []
+        laid_out_shadow: ShadowNode | None = None  # the shadow tree that elements_and_layouts was computed from
 
         should_quit = False
         should_bell = False
@@ -171,6 +217,11 @@ async def app(
         should_suspend: Suspend | None = None
 
         do_heal_borders = True
+        border_healer = BorderHealer()
+        border_healing_toggled = False
+
+        autopilot_iter = iter(autopilot)
+        autopilot_paused = False  # while a Wait control is pending
 
         # Warmup: render and lay out once without painting so that use_rects()
         # returns real dimensions on the first visible render.
@@ -188,6 +239,9 @@ async def app(
             nonlocal should_suspend
 
             nonlocal do_heal_borders
+            nonlocal border_healer
+            nonlocal border_healing_toggled
+            nonlocal autopilot_paused
 
             match control:
                 case None:
@@ -205,12 +259,24 @@ async def app(
                     should_render = True
                 case ToggleBorderHealing():
                     do_heal_borders = not do_heal_borders
+                    border_healer = BorderHealer()
+                    border_healing_toggled = True
                     should_render = True
+                case Wait(seconds=seconds):
+                    autopilot_paused = True
+                    loop.call_later(seconds, resume_autopilot)
+
+        def resume_autopilot() -> None:
+            nonlocal autopilot_paused
+            autopilot_paused = False
+            event_queue.put_nowait(Dummy())
 
         mouse_position = Position(x=-1, y=-1)
 
         async with TaskGroup() as tg:
-            for ap in chain(autopilot, repeat(None)):
+            while True:
+                ap = None if autopilot_paused else next(autopilot_iter, None)
+
                 if should_quit:
                     logger.info("Quitting application...")
                     raise KeyboardInterrupt
@@ -219,6 +285,8 @@ async def app(
                     if not headless:
                         output_stream.write("\a")
                         output_stream.flush()
+                    if recorder is not None:
+                        recorder.output("\a")
                     should_bell = False
 
                 if should_print_paint:
@@ -229,7 +297,12 @@ async def app(
                 if should_screenshot:
                     try:
                         start_screenshot = perf_counter_ns()
-                        await maybe_await(should_screenshot.handler(svg(current_paint)))
+                        if should_screenshot.path is not None:
+                            should_screenshot.path.parent.mkdir(parents=True, exist_ok=True)
+                            with should_screenshot.path.open("w") as f:
+                                write_svg(current_paint, f, indent=should_screenshot.indent)
+                        else:
+                            await maybe_await(should_screenshot.handler(svg(current_paint)))
                         logger.debug(
                             "Took screenshot",
                             handler=should_screenshot.handler,
@@ -281,6 +354,7 @@ async def app(
                         allow_key_thread.set()
 
                     screen_style, current_paint, w, h = handle_screen_size_change()
+                    unhealed_paint, border_healer = current_paint.copy(), BorderHealer()
 
                     logger.debug(
                         "Resuming application",
@@ -290,81 +364,126 @@ async def app(
 
                     should_suspend = None
 
-                if should_render:
+                if should_render or should_render_dirty:
+                    phases: dict[str, int] = {}
+
                     start_render = perf_counter_ns()
-                    shadow, user_code_ns = update_shadow(screen(), shadow)
+                    if should_render or shadow is None:
+                        shadow, user_code_ns = update_shadow(screen(), shadow)
+                    else:
+                        shadow, user_code_ns = update_dirty_shadow(shadow)
+                    phases["shadow"] = perf_counter_ns() - start_render
                     logger.debug(
                         "Updated shadow tree",
-                        elapsed_ns=f"{perf_counter_ns() - start_render:_}",
+                        elapsed_ns=f"{phases['shadow']:_}",
                         user_code_ns=f"{user_code_ns:_}",
+                        partial=not should_render,
                     )
 
                     start_layout = perf_counter_ns()
-                    available = waxy.AvailableSize(
-                        width=waxy.Definite(w),
-                        height=waxy.Definite(h),
+                    change = (
+                        classify_change(shadow, laid_out_shadow)
+                        if laid_out_shadow is not None
+                        else ShadowChange.STRUCTURE
                     )
-                    elements_and_layouts = compute_layout(shadow, available)
+                    if change <= ShadowChange.PAINT:
+                        # Nothing that affects layout changed, so the previous layout is still correct
+                        elements_and_layouts = reuse_layout(shadow, elements_and_layouts)
+                    else:
+                        available = waxy.AvailableSize(
+                            width=waxy.Definite(w),
+                            height=waxy.Definite(h),
+                        )
+                        elements_and_layouts = compute_layout(shadow, available)
+                    laid_out_shadow = shadow
+                    phases["layout"] = perf_counter_ns() - start_layout
                     logger.debug(
                         "Calculated layout",
-                        elapsed_ns=f"{perf_counter_ns() - start_layout:_}",
+                        elapsed_ns=f"{phases['layout']:_}",
+                        change=change.name,
                     )
 
                     start_paint = perf_counter_ns()
                     new_paint, border_healing_hints = paint_layout(elements_and_layouts)
+                    phases["paint"] = perf_counter_ns() - start_paint
+                    wrap_cache_info = WRAP_CACHE.info()
                     logger.debug(
                         "Generated new paint",
-                        elapsed_ns=f"{perf_counter_ns() - start_paint:_}",
+                        elapsed_ns=f"{phases['paint']:_}",
+                        wrap_cache_hits=wrap_cache_info.hits,
+                        wrap_cache_misses=wrap_cache_info.misses,
                     )
 
+                    start_diff = perf_counter_ns()
+                    unhealed_diff = diff_paint(new_paint, unhealed_paint)
+                    unhealed_paint |= unhealed_diff
+                    phases["diff"] = perf_counter_ns() - start_diff
+
+                    # Turning healing on or off changes every healed cell, not just the ones near damaged cells.
+                    changes = unhealed_paint.copy() if border_healing_toggled else unhealed_diff
+                    border_healing_toggled = False
+
                     if do_heal_borders:
                         start_border_heal = perf_counter_ns()
-                        healing_diff = heal_borders(new_paint, border_healing_hints)
-                        new_paint |= healing_diff
+                        healing_changes = border_healer.heal(unhealed_paint, border_healing_hints, unhealed_diff)
+                        changes = changes | healing_changes
+                        phases["heal_borders"] = perf_counter_ns() - start_border_heal
                         logger.debug(
                             "Healed borders in new paint",
-                            elapsed_ns=f"{perf_counter_ns() - start_border_heal:_}",
+                            elapsed_ns=f"{phases['heal_borders']:_}",
                             hint_cells=len(border_healing_hints),
-                            diff_cells=len(healing_diff),
+                            changed_cells=len(healing_changes),
                         )
 
                     start_diff = perf_counter_ns()
-                    diff = diff_paint(new_paint, current_paint)
+                    diff = diff_changes(changes, current_paint)
                     current_paint |= diff
+                    phases["diff"] += perf_counter_ns() - start_diff
                     logger.debug(
                         "Diffed new paint from current paint",
-                        elapsed_ns=f"{perf_counter_ns() - start_diff:_}",
+                        elapsed_ns=f"{phases['diff']:_}",
                         diff_cells=len(diff),
                     )
 
                     start_instructions = perf_counter_ns()
-                    instructions = paint_to_instructions(diff)
+                    instructions = paint_to_instructions(diff, color_depth=color_depth)
+                    phases["instructions"] = perf_counter_ns() - start_instructions
                     logger.debug(
                         "Generated instructions from paint diff",
-                        elapsed_ns=f"{perf_counter_ns() - start_instructions:_}",
+                        elapsed_ns=f"{phases['instructions']:_}",
                     )
 
                     if not headless:
                         start_write = perf_counter_ns()
                         output_stream.write(instructions)
                         output_stream.flush()
+                        phases["write"] = perf_counter_ns() - start_write
                         logger.debug(
                             "Wrote and flushed instructions to output stream",
-                            elapsed_ns=f"{perf_counter_ns() - start_write:_}",
+                            elapsed_ns=f"{phases['write']:_}",
                             bytes=f"{len(instructions):_}",
                         )
 
+                    if recorder is not None:
+                        recorder.output(instructions)
+
                     start_effects = perf_counter_ns()
                     active_effects = await handle_effects(shadow, active_effects=active_effects, task_group=tg)
+                    phases["effects"] = perf_counter_ns() - start_effects
                     logger.debug(
                         "Reconciled effects",
-                        elapsed_ns=f"{perf_counter_ns() - start_effects:_}",
+                        elapsed_ns=f"{phases['effects']:_}",
                         num_active_effects=len(active_effects),
                     )
 
                     should_render = False
+                    should_render_dirty = False
 
-                    logger.debug("Completed render cycle", elapsed_ns=f"{perf_counter_ns() - start_render:_}")
+                    phases["total"] = perf_counter_ns() - start_render
+                    if timings is not None:
+                        timings.add_frame(phases)
+
+                    logger.debug("Completed render cycle", elapsed_ns=f"{phases['total']:_}")
 
                 if ap is not None:
                     if isinstance(ap, _Control):
@@ -391,12 +510,21 @@ async def app(
 
                     event = events.popleft()
 
+                    if input_recorder is not None and isinstance(
+                        event, (KeyPressed, MouseMoved, MouseDown, MouseUp, MouseScrolledDown, MouseScrolledUp)
+                    ):
+                        input_recorder.record(event)
+
                     match event:
                         case StateSet():
                             should_render = True
+                        case StoreChanged(store=store):
+                            if store.notify():
+                                should_render_dirty = True
                         case TerminalResized(dimensions=override):
                             should_render = True
                             screen_style, current_paint, w, h = handle_screen_size_change(override)
+                            unhealed_paint, border_healer = current_paint.copy(), BorderHealer()
                         case KeyPressed():
                             for element, _ in reversed(elements_and_layouts):
                                 if element.on_key:
@@ -454,6 +582,14 @@ async def app(
             stop_input_control(stream=input_stream, original=original)
             stop_handling_resize_signal()
 
+        if recorder is not None:
+            recorder.close()
+        if input_recorder is not None:
+            input_recorder.close()
+
+        if clock is not None:
+            clock.detach()
+
         logger.info("Application stopped")
 
 
@@ -493,9 +629,28 @@ def diff_paint(new_paint: Paint, current_paint: Paint) -> Paint:
     for pos, current_cell in current_paint.items():
         new_cell = new_paint.get(pos, BLANK)
 
-        # This looks duplicative, but each of these checks is faster than the next,
-        # but less precise, so we can short-circuit earlier on cheaper operations.
-        if new_cell is not current_cell and new_cell != current_cell:
+        # Only the character and the style are drawn, and equal styles (almost always) have equal ids,
+        # so comparing those is enough (and much cheaper than comparing the cells).
+        if new_cell is not current_cell and (
+            new_cell.char != current_cell.char or new_cell.style.id != current_cell.style.id
+        ):
+            diff[pos] = new_cell
+
+    return diff
+
+
+def diff_changes(changes: Paint, current_paint: Paint) -> Paint:
+    """Like `diff_paint`, but only for the cells in `changes`: every other cell is known to be unchanged."""
+    diff = {}
+
+    for pos, new_cell in changes.items():
+        # Cells outside the screen (e.g., healed borders just past its edge) are never drawn.
+        if (current_cell := current_paint.get(pos)) is None:
+            continue
+
+        if new_cell is not current_cell and (
+            new_cell.char != current_cell.char or new_cell.style.id != current_cell.style.id
+        ):
             diff[pos] = new_cell
 
     return diff
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from functools import lru_cache
 
 from more_itertools import flatten
 from structlog import get_logger
 
 from counterweight.geometry import Position
-from counterweight.paint import BorderHealingHints, P, Paint
-from counterweight.styles.styles import JoinedBorderKind, JoinedBorderParts
+from counterweight.paint import BLANK, BorderHealingHints, P, Paint
+from counterweight.styles.styles import (
+    _CONNECTS_BOTTOM,
+    _CONNECTS_LEFT,
+    _CONNECTS_RIGHT,
+    _CONNECTS_TOP,
+    JoinedBorderKind,
+    JoinedBorderParts,
+)
 
 logger = get_logger()
 
@@ -21,20 +29,27 @@ def get_replacement_char(
     above: str | None,
     below: str | None,
 ) -> str | None:
-    if (
-        c := parts.select(
-            top=center in parts.connects_top or above in parts.connects_bottom,
-            bottom=center in parts.connects_bottom or below in parts.connects_top,
-            left=center in parts.connects_left or left in parts.connects_right,
-            right=center in parts.connects_right or right in parts.connects_left,
-        )
-    ) != center:
+    table = parts.table
+    masks = table.masks
+
+    mask = masks.get(center, 0)
+    if above is not None and masks.get(above, 0) & _CONNECTS_BOTTOM:
+        mask |= _CONNECTS_TOP
+    if below is not None and masks.get(below, 0) & _CONNECTS_TOP:
+        mask |= _CONNECTS_BOTTOM
+    if left is not None and masks.get(left, 0) & _CONNECTS_RIGHT:
+        mask |= _CONNECTS_LEFT
+    if right is not None and masks.get(right, 0) & _CONNECTS_LEFT:
+        mask |= _CONNECTS_RIGHT
+
+    if (c := table.glyphs[mask]) != center:
         return c
     else:
         return None
 
 
-@lru_cache(maxsize=2**12)
+# Large enough to hold every hint on a big screen full of borders, so that it doesn't thrash from frame to frame.
+@lru_cache(maxsize=2**16)
 def dither(position: Position) -> tuple[Position, Position, Position, Position]:
     return (
         Position(position.x - 1, position.y),  # left
@@ -47,28 +62,97 @@ def dither(position: Position) -> tuple[Position, Position, Position, Position]:
 ALL_JOINED_BORDER_KIND_CHARS = set(flatten(k.value for k in JoinedBorderKind))
 
 
-def heal_borders(paint: Paint, hints: BorderHealingHints) -> Paint:
-    overlay: Paint = {}
-    for center_position, parts in hints.items():
-        center = paint[center_position]
+def _heal_cell(
+    parts: JoinedBorderParts,
+    center: P | None,
+    left: P | None,
+    right: P | None,
+    above: P | None,
+    below: P | None,
+) -> P | None:
+    if center is None or center.char not in ALL_JOINED_BORDER_KIND_CHARS:
+        # Even if we got a hint, that cell may have been overwritten by another
+        # element (e.g., putting a title over a border using absolute positioning).
+        return None
 
-        if center.char not in ALL_JOINED_BORDER_KIND_CHARS:
-            # Even if we got a hint, that cell may have been overwritten by another
-            # element (e.g., putting a title over a border using absolute positioning).
-            continue
+    # TODO: cell styles and z-levels must match too (i.e., colors)
 
-        left, right, above, below = map(paint.get, dither(center_position))
+    if replaced_char := get_replacement_char(
+        parts=parts,
+        center=center.char,
+        left=left.char if left else None,
+        right=right.char if right else None,
+        above=above.char if above else None,
+        below=below.char if below else None,
+    ):
+        return P(char=replaced_char, style=center.style, z=center.z)
 
-        # TODO: cell styles and z-levels must match too (i.e., colors)
+    return None
 
-        if replaced_char := get_replacement_char(
-            parts=parts,
-            center=center.char,
-            left=left.char if left else None,
-            right=right.char if right else None,
-            above=above.char if above else None,
-            below=below.char if below else None,
-        ):
-            overlay[center_position] = P(char=replaced_char, style=center.style, z=center.z)
+
+def heal_borders(paint: Paint, hints: BorderHealingHints) -> Paint:
+    overlay: Paint = {}
+    for center_position, parts in hints.items():
+        if (
+            healed := _heal_cell(parts, paint.get(center_position), *map(paint.get, dither(center_position)))
+        ) is not None:
+            overlay[center_position] = healed
 
     return overlay
+
+
+class BorderHealer:
+    """
+    Heals the borders of successive paints, re-healing only the hints near the cells that changed.
+
+    A hint's healed cell only depends on its parts and on the five cells around it (including itself),
+    so given the positions of the cells that changed since the previous paint,
+    only the hints at or next to those positions (and the hints that appeared or changed parts) are healed again,
+    and every other hint keeps its healed cell from the previous paint.
+    """
+
+    __slots__ = ("_hints", "_neighborhoods", "_overlay")
+
+    def __init__(self) -> None:
+        self._hints: BorderHealingHints = {}
+        self._neighborhoods: set[Position] = set()  # every position that some hint's healed cell depends on
+        self._overlay: Paint = {}
+
+    def heal(self, paint: Paint, hints: BorderHealingHints, damage: Iterable[Position]) -> Paint:
+        """
+        Parameters:
+            paint: The whole (unhealed) paint.
+            hints: The border healing hints for `paint`.
+            damage: The positions of the cells of `paint` that changed since the previous call.
+
+        Returns:
+            The cells of the healed paint that may have changed since the previous call:
+            the healed cell of each hint that was healed again,
+            and the cell from `paint` of each position that no longer needs healing.
+        """
+        overlay = self._overlay
+
+        # Positions are flyweights, so when the hints are unchanged (as they usually are), comparing them is cheap.
+        dirty: set[Position] = set()
+        if hints != self._hints:
+            dirty.update(position for position, _ in hints.items() ^ self._hints.items())
+            self._neighborhoods = {neighbor for position in hints for neighbor in (position, *dither(position))}
+            self._hints = hints
+
+        # Damage away from the borders (e.g., changed text) doesn't need any healing.
+        for position in self._neighborhoods.intersection(damage):
+            dirty.add(position)
+            dirty.update(dither(position))
+
+        changes: Paint = {}
+        for position in dirty:
+            parts = hints.get(position)
+            if (
+                parts is not None
+                and (healed := _heal_cell(parts, paint.get(position), *map(paint.get, dither(position)))) is not None
+            ):
+                overlay[position] = changes[position] = healed
+            elif overlay.pop(position, None) is not None:
+                changes[position] = paint.get(position, BLANK)
+
+        return changes
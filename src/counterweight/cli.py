@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import sys
 from asyncio import Queue, get_running_loop, run
+from pathlib import Path
 from textwrap import dedent
 from threading import Event, Thread
+from time import perf_counter
 
-from typer import Option, Typer
+from typer import Argument, Option, Typer
 
 from counterweight._context_vars import current_event_queue
+from counterweight.clock import VirtualClock
 from counterweight.constants import PACKAGE_NAME, __version__
 from counterweight.events import AnyEvent
 from counterweight.input import read_keys, start_input_control, stop_input_control
 from counterweight.logging import last_devlog, tail_devlog
 from counterweight.output import start_mouse_tracking, stop_mouse_tracking
+from counterweight.recording import InputRecording
+from counterweight.replay import replay as _replay
+from counterweight.screenshots import resolve_root, run_scripts
 
 cli = Typer(
     name=PACKAGE_NAME,
@@ -45,6 +51,49 @@ def devlog(
         tail_devlog(json=json)
 
 
+@cli.command()
+def screenshots(
+    scripts: list[Path] = Argument(help="The scripts to run, e.g. docs/examples/*.py.", exists=True, dir_okay=False),
+    processes: int | None = Option(default=None, help="The number of worker processes (default: one per core)."),
+) -> None:
+    """
+    Run scripts that take screenshots of headless applications (like the documentation examples)
+    in parallel, in a pool of worker processes.
+    """
+    start = perf_counter()
+    elapsed = run_scripts(scripts, processes=processes)
+    for script, seconds in zip(scripts, elapsed, strict=True):
+        print(f"{seconds:6.2f}s  {script}")
+    print(f"Ran {len(scripts)} scripts in {perf_counter() - start:.2f}s")
+
+
+@cli.command()
+def replay(
+    root: str = Argument(
+        help='The root component to replay against, as "module:attribute" or "path/to/file.py:attribute".'
+    ),
+    recording: Path = Argument(help="The input recording to replay.", exists=True, dir_okay=False),
+    realtime: bool = Option(default=True, help="Replay the events with their recorded timing."),
+    virtual_time: bool = Option(
+        default=False, help="Skip over the recorded time between events instead of waiting it out."
+    ),
+) -> None:
+    """
+    Replay a recorded input session against an application, headlessly,
+    and report how long each phase of its render cycles took.
+    """
+    timings = run(
+        _replay(
+            resolve_root(root),
+            InputRecording.load(recording),
+            realtime=realtime,
+            clock=VirtualClock() if virtual_time else None,
+        )
+    )
+    print(f"{len(timings.frames)} frames")
+    print(timings.report())
+
+
 @cli.command()
 def check_input(mouse: bool = Option(default=False, help="Also capture mouse inputs and show mouse events.")) -> None:
     """
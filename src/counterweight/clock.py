@@ -0,0 +1,88 @@
+"""
+Virtual time for headless applications, so that timer-driven applications run faster than real time.
+"""
+
+from __future__ import annotations
+
+from asyncio import AbstractEventLoop, BaseEventLoop
+from collections.abc import Callable
+from selectors import BaseSelector, SelectorKey
+
+
+class VirtualClock:
+    """
+    A clock for headless applications (e.g., in tests and benchmarks) that advances instantly when the application is idle.
+
+    While an application runs with a virtual clock (see the `clock` parameter of [`app`][counterweight.app.app]),
+    the event loop keeps time by this clock instead of the system's clock.
+    Whenever every task is waiting for a timer (e.g., an effect in `asyncio.sleep`,
+    or a [`Wait`][counterweight.controls.Wait] in the autopilot),
+    the clock jumps straight to the next timer instead of waiting for it,
+    so a stopwatch that ticks once a second for a minute finishes as soon as its sixty renders are done.
+    Virtual time only passes by jumping: time spent actually running code (rendering, effects, ...) takes no virtual time,
+    so timer-driven behavior is the same from run to run, no matter how fast the machine is.
+
+    Only timers scheduled on the event loop run on virtual time:
+    code that reads the system's clock (e.g., `time.monotonic`) still sees real time,
+    so use `asyncio.get_running_loop().time()` to measure elapsed time in an application that should run on a virtual clock.
+    Waiting on real I/O (e.g., a subprocess or a thread) doesn't count as idle if no timer is pending,
+    but while a timer is pending, the clock jumps to it rather than waiting for the I/O.
+    """
+
+    __slots__ = ("_base", "_loop", "_select", "elapsed")
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+        """The total virtual time (in seconds) that the clock has skipped forward."""
+
+        self._base = 0.0
+        self._loop: BaseEventLoop | None = None
+        self._select: Callable[[float | None], list[tuple[SelectorKey, int]]] | None = None
+
+    def time(self) -> float:
+        """The current virtual time, on the event loop's time scale."""
+        return self._base + self.elapsed
+
+    def attach(self, loop: AbstractEventLoop) -> None:
+        """
+        Make `loop` keep time by this clock, until `detach` is called.
+        Virtual time starts from the loop's current time, so timers that are already scheduled stay in order.
+        """
+        selector: BaseSelector | None = getattr(loop, "_selector", None)
+        if not isinstance(loop, BaseEventLoop) or selector is None:
+            raise TypeError(f"A virtual clock needs a selector-based event loop, not {loop!r}")
+        if self._loop is not None:
+            raise RuntimeError("This virtual clock is already attached to an event loop")
+
+        self._base = loop.time() - self.elapsed
+        self._loop = loop
+        self._select = selector.select
+
+        # The loop reads its own time and waits for its next timer through these two methods,
+        # so shadowing them on the instances is enough to move the whole loop onto virtual time.
+        loop.time = self.time  # type: ignore[method-assign]
+        selector.select = self._virtual_select  # type: ignore[method-assign]
+
+    def detach(self) -> None:
+        """Return the event loop to the system's clock."""
+        if self._loop is None:
+            return
+
+        del self._loop.time
+        del self._loop._selector.select  # type: ignore[attr-defined]
+        self._loop = None
+        self._select = None
+
+    def _virtual_select(self, timeout: float | None = None) -> list[tuple[SelectorKey, int]]:
+        assert self._select is not None
+
+        ready = self._select(0)
+        if ready or (timeout is not None and timeout <= 0):
+            return ready
+        elif timeout is None:
+            # No timer is scheduled at all, so only real I/O can wake the loop up.
+            return self._select(None)
+
+        # Every task is idle until the loop's next timer, so skip ahead to it.
+        self.elapsed += timeout
+        return []
@@ -3,6 +3,7 @@ from __future__ import annotations
 import sys
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import TextIO, Union
 from xml.etree.ElementTree import ElementTree
@@ -49,9 +50,15 @@ class Screenshot(_Control):
     so all other events that are due to be processed in the current cycle
     will be processed before the screenshot is taken
     (but the screenshot will still be of the UI from *before* the next render occurs!).
+
+    If `path` is set, the SVG is streamed straight to that file
+    (see [`write_svg`][counterweight.paint.write_svg]) without ever building the XML tree,
+    and `handler` is not called.
     """
 
     handler: Callable[[ElementTree], Awaitable[None] | None]
+    path: Path | None = None
+    indent: int | None = None
 
     @classmethod
     def to_file(cls, path: Path, indent: int | None = None) -> Screenshot:
@@ -66,16 +73,19 @@ class Screenshot(_Control):
                 If `None`, the SVG will not be indented.
         """
 
-        def handler(et: ElementTree) -> None:
-            if indent:
-                indent_svg(et, space=" " * indent)
+        # A partial of a module-level function (rather than a closure) can be pickled,
+        # so these screenshots can be sent to other processes (e.g., by render_screenshots).
+        return cls(handler=partial(_write_screenshot, path, indent), path=path, indent=indent)
+
 
-            path.parent.mkdir(parents=True, exist_ok=True)
+def _write_screenshot(path: Path, indent: int | None, et: ElementTree) -> None:
+    if indent:
+        indent_svg(et, space=" " * indent)
 
-            with path.open("w") as f:
-                et.write(f, encoding="unicode")
+    path.parent.mkdir(parents=True, exist_ok=True)
 
-        return cls(handler=handler)
+    with path.open("w") as f:
+        et.write(f, encoding="unicode")
 
 
 @dataclass(frozen=True, slots=True)
@@ -118,6 +128,19 @@ class ToggleBorderHealing(_Control):
     """
 
 
+@dataclass(frozen=True, slots=True)
+class Wait(_Control):
+    """
+    Pause the autopilot for the given number of seconds.
+
+    The application keeps running while the autopilot is paused
+    (e.g., timers fire, effects run, and the UI is re-rendered),
+    so this can be used to replay a recorded session with its original timing.
+    """
+
+    seconds: float
+
+
 AnyControl = Union[
     Quit,
     Bell,
@@ -125,4 +148,5 @@ AnyControl = Union[
     PrintPaint,
     Suspend,
     ToggleBorderHealing,
+    Wait,
 ]
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections.abc import Hashable, Iterator, Mapping
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Callable, Sequence, Union
+from typing import TYPE_CHECKING, Callable, Literal, Protocol, Sequence, Union
 
 from counterweight._utils import flyweight
 from counterweight.controls import AnyControl
 from counterweight.events import KeyPressed, MouseEvent
 from counterweight.styles import CellStyle, Style
-from counterweight.styles.styles import _DEFAULT_CELL_STYLE
+from counterweight.styles.styles import _DEFAULT_CELL_STYLE, Color
+
+if TYPE_CHECKING:
+    from counterweight.log_buffer import LogBuffer
+    from counterweight.text_buffer import TextBuffer
 
 _DEFAULT_STYLE = Style()
+_BLACK = Color.from_name("black")
+_WHITE = Color.from_name("white")
 
 
 @dataclass(frozen=True, slots=True, kw_only=True)
@@ -49,11 +57,75 @@ def _chunk_cells(content: str, style: CellStyle) -> tuple[CellPaint, ...]:
 
 
 @lru_cache(maxsize=2**12)
-def _text_cells(content: str | tuple[Chunk, ...], text_style: CellStyle) -> tuple[CellPaint, ...]:
-    if isinstance(content, str):
-        return tuple(CellPaint(char=char, style=text_style) for char in content)
-    else:
-        return tuple(cell for chunk in content for cell in chunk.cells)
+def _text_cells(styled: StyledText) -> tuple[CellPaint, ...]:
+    return tuple(CellPaint(char=char, style=style) for chunk, style in styled.runs() for char in chunk)
+
+
+@lru_cache(maxsize=2**12)
+def _styled_text(content: str | tuple[Chunk, ...], text_style: CellStyle) -> StyledText:
+    return StyledText.from_content(content, text_style)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class StyledText:
+    """
+    The content of a [`Text`][counterweight.elements.Text] as a single string,
+    plus the runs of that string that share a [`CellStyle`][counterweight.styles.CellStyle].
+
+    Wrapping and measurement only need the string,
+    and painting walks the runs,
+    so there is no need to create an object per character.
+    """
+
+    text: str
+    run_starts: tuple[int, ...]
+    """The offset in `text` at which each run starts. The first run always starts at `0`."""
+    run_styles: tuple[CellStyle, ...]
+    """The style of each run."""
+
+    @classmethod
+    def from_content(cls, content: str | Sequence[Chunk], text_style: CellStyle = _DEFAULT_CELL_STYLE) -> StyledText:
+        """Build the styled text for some `Text` `content`, where plain strings are styled with `text_style`."""
+        if isinstance(content, str):
+            return cls(text=content, run_starts=(0,), run_styles=(text_style,))
+
+        run_starts: list[int] = []
+        run_styles: list[CellStyle] = []
+        offset = 0
+        for chunk in content:
+            if not chunk.content:
+                continue
+            # Adjacent chunks with the same style become a single run.
+            if not run_styles or chunk.style != run_styles[-1]:
+                run_starts.append(offset)
+                run_styles.append(chunk.style)
+            offset += len(chunk.content)
+
+        return cls(
+            text="".join(chunk.content for chunk in content),
+            run_starts=tuple(run_starts) or (0,),
+            run_styles=tuple(run_styles) or (text_style,),
+        )
+
+    def style_at(self, offset: int) -> CellStyle:
+        return self.run_styles[bisect_right(self.run_starts, offset) - 1]
+
+    def runs(self, start: int = 0, end: int | None = None) -> Iterator[tuple[str, CellStyle]]:
+        """Yield the `(string, style)` runs that make up `text[start:end]`."""
+        if end is None:
+            end = len(self.text)
+
+        run_starts = self.run_starts
+        run_styles = self.run_styles
+        last = len(run_starts) - 1
+
+        run = bisect_right(run_starts, start) - 1
+        while start < end:
+            run_end = run_starts[run + 1] if run < last else end
+            stop = min(run_end, end)
+            yield self.text[start:stop], run_styles[run]
+            start = stop
+            run += 1
 
 
 @dataclass(frozen=True, slots=True, kw_only=True)
@@ -68,14 +140,254 @@ class Text:
         return ()
 
     @property
-    def cells(self) -> tuple[CellPaint, ...]:
+    def styled(self) -> StyledText:
         content = self.content if isinstance(self.content, str) else tuple(self.content)
-        return _text_cells(content, self.style.text_style)
+        return _styled_text(content, self.style.text_style)
+
+    @property
+    def cells(self) -> tuple[CellPaint, ...]:
+        return _text_cells(self.styled)
+
+
+type CanvasMode = Literal["half_block", "sextant", "braille"]
+
+CANVAS_CELL_SIZES: dict[CanvasMode, tuple[int, int]] = {
+    "half_block": (1, 2),
+    "sextant": (2, 3),
+    "braille": (2, 4),
+}
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Canvas:
+    """
+    A grid of pixels, painted directly onto the screen without going through text layout.
+
+    In `half_block` mode, each character cell shows two vertically-stacked pixels using `▀`:
+    the upper pixel is the cell's foreground color and the lower pixel is its background color.
+
+    In `sextant` (2x3 pixels per cell) and `braille` (2x4 pixels per cell) mode,
+    each pixel is either lit (any non-zero channel) or unlit (black),
+    and each cell shows its lit pixels in the color of the first lit pixel (in reading order)
+    on the element's `content_color`.
+    These modes trade color resolution for spatial resolution, which suits line plots and charts.
+    If [NumPy](https://numpy.org) is installed, it is used to pack the pixels into glyphs.
+    """
+
+    width: int
+    """The width of the canvas, in pixels. Must be a multiple of the mode's cell width."""
+    height: int
+    """The height of the canvas, in pixels. Must be a multiple of the mode's cell height."""
+    pixels: bytes
+    """
+    The colors of the pixels, as `width * height` consecutive `(red, green, blue)` byte triples,
+    row by row from the top-left corner.
+    """
+    mode: CanvasMode = "half_block"
+    style: Style = _DEFAULT_STYLE
+    on_key: Callable[[KeyPressed], AnyControl | None] | None = None
+    on_mouse: Callable[[MouseEvent], AnyControl | None] | None = None
+
+    def __post_init__(self) -> None:
+        cell_width, cell_height = CANVAS_CELL_SIZES[self.mode]
+        if self.width % cell_width != 0:
+            raise ValueError(f"Canvas width must be a multiple of {cell_width} in {self.mode} mode, got {self.width}")
+        if self.height % cell_height != 0:
+            raise ValueError(
+                f"Canvas height must be a multiple of {cell_height} in {self.mode} mode, got {self.height}"
+            )
+        if len(self.pixels) != 3 * self.width * self.height:
+            raise ValueError(
+                f"Canvas pixels must have 3 * width * height = {3 * self.width * self.height} bytes, got {len(self.pixels)}"
+            )
+
+    @property
+    def cell_size(self) -> tuple[int, int]:
+        """The width and height of the canvas, in cells."""
+        cell_width, cell_height = CANVAS_CELL_SIZES[self.mode]
+        return self.width // cell_width, self.height // cell_height
+
+    @property
+    def children(self) -> tuple[Component | AnyElement, ...]:
+        return ()
+
+    @classmethod
+    def from_colors(
+        cls,
+        width: int,
+        height: int,
+        colors: Mapping[tuple[int, int], Color],
+        default: Color = _BLACK,
+        mode: CanvasMode = "half_block",
+        style: Style = _DEFAULT_STYLE,
+    ) -> Canvas:
+        """
+        Build a canvas from a sparse mapping of `(x, y)` pixel coordinates to colors;
+        unmapped pixels are the `default` color.
+        """
+        pixels = bytearray(bytes(default) * (width * height))
+        for (x, y), color in colors.items():
+            if 0 <= x < width and 0 <= y < height:
+                offset = 3 * (y * width + x)
+                pixels[offset : offset + 3] = bytes(color)
+        return cls(width=width, height=height, pixels=bytes(pixels), mode=mode, style=style)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LogView:
+    """
+    A scrolling view of the lines in a [`LogBuffer`][counterweight.hooks.LogBuffer].
+
+    Unlike a `Text`, a `LogView` does not size itself to its content:
+    it fills whatever space its style gives it (e.g., with `full` or `grow`),
+    and only the lines that fit in that space are wrapped and painted.
+    Lines are wrapped and justified according to the `text_wrap` and `text_justify` of its style.
+    """
+
+    buffer: LogBuffer
+    follow: bool = True
+    """If `True`, the view shows the newest lines in the buffer, and follows new lines as they are appended."""
+    offset: int = 0
+    """If `follow` is `False`, the index of the line in the buffer to show at the top of the view."""
+    style: Style = _DEFAULT_STYLE
+    on_key: Callable[[KeyPressed], AnyControl | None] | None = None
+    on_mouse: Callable[[MouseEvent], AnyControl | None] | None = None
+
+    @property
+    def children(self) -> tuple[Component | AnyElement, ...]:
+        return ()
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class TextArea:
+    """
+    An editable view of the text in a [`TextBuffer`][counterweight.hooks.TextBuffer].
+
+    Like a [`LogView`][counterweight.elements.LogView], a `TextArea` fills whatever space its style gives it,
+    and only the paragraphs that fit in that space are wrapped and painted.
+    The view scrolls to keep the cursor visible.
+    A `TextArea` for a single-line buffer (i.e., a text input) is one row tall unless its style says otherwise.
+
+    Edit the buffer by passing key presses to [`TextBuffer.handle_key`][counterweight.hooks.TextBuffer.handle_key]
+    from the `on_key` handler of the `TextArea` (or of one of its ancestors).
+    """
+
+    buffer: TextBuffer
+    cursor: bool = True
+    """Whether to show the cursor (e.g., only while the `TextArea` has focus)."""
+    style: Style = _DEFAULT_STYLE
+    on_key: Callable[[KeyPressed], AnyControl | None] | None = None
+    on_mouse: Callable[[MouseEvent], AnyControl | None] | None = None
+
+    @property
+    def children(self) -> tuple[Component | AnyElement, ...]:
+        return ()
+
+
+class TableSource(Hashable, Protocol):
+    """
+    The rows of a [`Table`][counterweight.elements.Table].
+
+    See [`RowSource`][counterweight.table.RowSource] and [`ColumnSource`][counterweight.table.ColumnSource]
+    for sources backed by row-major and column-major data.
+    """
+
+    def __len__(self) -> int: ...
+
+    def cell(self, row: int, column: int) -> object: ...
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Column:
+    header: str
+    width: int | None = None
+    """
+    The width of the column, in cells.
+    If `None`, the width is the widest of the header and the cells in the first `Table.sample` rows.
+    """
+    justify: Literal["left", "right", "center"] = "left"
+    format: Callable[[object], str] = str
+    """How to turn the column's values into text."""
+    style: CellStyle = _DEFAULT_CELL_STYLE
+
+
+@lru_cache(maxsize=2**6)
+def _column_widths(source: TableSource, rows: int, columns: tuple[Column, ...], sample: int) -> tuple[int, ...]:
+    # The number of rows is part of the cache key so that the widths are re-measured when a short source grows.
+    sampled = range(min(sample, rows))
+    return tuple(
+        column.width
+        if column.width is not None
+        else max(len(column.header), max((len(column.format(source.cell(row, idx))) for row in sampled), default=0))
+        for idx, column in enumerate(columns)
+    )
+
+
+_HEADER_STYLE = CellStyle(bold=True)
+_SELECTED_STYLE = CellStyle(foreground=_BLACK, background=_WHITE)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Table:
+    """
+    A table of rows of data, painted directly onto the screen,
+    rather than built out of an element per cell.
+
+    Only the rows that fit in the table's space are formatted and painted,
+    so the source can have any number of rows.
+    Sorting and filtering are done by passing a different `order`
+    (e.g., from [`sort_rows`][counterweight.table.sort_rows] or [`filter_rows`][counterweight.table.filter_rows]),
+    which doesn't change the source or the element tree.
+    """
+
+    columns: Sequence[Column]
+    source: TableSource
+    order: Sequence[int] | None = None
+    """The indexes of the source rows to show, in the order to show them. If `None`, all rows are shown in order."""
+    offset: int = 0
+    """The position in `order` of the first row to show (i.e., how far the table is scrolled)."""
+    selected: int | None = None
+    """
+    The position in `order` of the selected row, which is highlighted with `selected_style`
+    and always scrolled into view.
+    """
+    sample: int = 100
+    """How many rows to measure when calculating the widths of columns that don't have a fixed `width`."""
+    gap: int = 1
+    """The number of cells between columns."""
+    header_style: CellStyle = _HEADER_STYLE
+    selected_style: CellStyle = _SELECTED_STYLE
+    style: Style = _DEFAULT_STYLE
+    on_key: Callable[[KeyPressed], AnyControl | None] | None = None
+    on_mouse: Callable[[MouseEvent], AnyControl | None] | None = None
+
+    @property
+    def children(self) -> tuple[Component | AnyElement, ...]:
+        return ()
+
+    @property
+    def widths(self) -> tuple[int, ...]:
+        """The width of each column, which is only calculated once per source and set of columns."""
+        return _column_widths(self.source, min(len(self.source), self.sample), tuple(self.columns), self.sample)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.order) if self.order is not None else len(self.source)
+
+    @property
+    def cell_size(self) -> tuple[int, int]:
+        """The natural width and height of the table (with every row showing), in cells."""
+        widths = self.widths
+        return sum(widths) + self.gap * max(len(widths) - 1, 0), 1 + self.row_count
 
 
 AnyElement = Union[
     Div,
     Text,
+    Canvas,
+    LogView,
+    TextArea,
+    Table,
 ]
 
 from counterweight.components import Component  # noqa: E402, deferred to avoid circular import
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Union
+from typing import TYPE_CHECKING, Any, Union
 
 from counterweight.geometry import Position
 
+if TYPE_CHECKING:
+    from counterweight.store import Store
+
 
 @dataclass(frozen=True, slots=True)
 class _Event:
@@ -71,6 +74,11 @@ class StateSet(_Event):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class StoreChanged(_Event):
+    store: Store[Any]
+
+
 @dataclass(frozen=True, slots=True)
 class Dummy(_Event):
     pass
@@ -88,6 +96,7 @@ AnyEvent = Union[
     TerminalResized,
     KeyPressed,
     StateSet,
+    StoreChanged,
     MouseMoved,
     MouseDown,
     MouseUp,
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import mmap
+from array import array
+from asyncio import sleep
+from bisect import bisect_left
+from itertools import accumulate, islice
+from pathlib import Path
+from threading import Event, Thread
+
+from cachetools import LRUCache
+
+from counterweight._utils import forever
+from counterweight.components import component
+from counterweight.elements import Text
+from counterweight.hooks import Ref, use_effect, use_rects, use_ref, use_state
+from counterweight.styles import Style
+
+_BLOCK_SIZE = 2**16
+_LINE_STEP = 32
+_ASCII = "".join(map(chr, range(128)))
+
+
+def _is_ascii_compatible(encoding: str) -> bool:
+    try:
+        return _ASCII.encode(encoding) == _ASCII.encode("ascii")
+    except UnicodeError:
+        return False
+
+
+class FileIndex:
+    """
+    A lazily-built index of the lines of a (potentially very large) file,
+    which is memory-mapped rather than read into memory.
+
+    The index is sparse: instead of the offset of every line,
+    it holds the number of newlines before the start of each 64 KiB block of the file,
+    which is cheap to build (one `bytes.count` per block)
+    and lets the offset of any line be found with a binary search over the blocks
+    followed by a short scan inside one block.
+
+    The first time a line is read from a block, the offset of every 32nd line in that block is recorded too,
+    so reading lines from a block that has been read from before only scans a few lines.
+
+    The index is built in a background thread started by `start`;
+    lines can be read (and searched for) while it is being built,
+    but only the part of the file that has been indexed so far is visible.
+
+    Lines are found by searching for newline bytes, so the file's `encoding` must be ASCII-compatible
+    (e.g., UTF-8 or Latin-1, but not UTF-16).
+    """
+
+    def __init__(self, path: Path | str, encoding: str = "utf-8") -> None:
+        if not _is_ascii_compatible(encoding):
+            raise ValueError(f"A file index needs an ASCII-compatible encoding, not {encoding!r}")
+
+        self.path = Path(path)
+        self.encoding = encoding
+
+        with self.path.open("rb") as f:
+            size = f.seek(0, 2)
+            # Empty files can't be memory-mapped.
+            self._mm: mmap.mmap | bytes = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        self.size = size
+
+        # _block_newlines[b] is the number of newlines in the file before offset b * _BLOCK_SIZE.
+        self._block_newlines = array("Q", [0])
+        # _block_line_starts[b] holds the offsets at which the scan for a line in block b can start:
+        # the start of the block, then the start of every _LINE_STEP-th line after it.
+        self._block_line_starts: LRUCache[int, array[int]] = LRUCache(maxsize=2**10)
+        self._indexed = 0
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """Start building the index in a background thread."""
+        if self._thread is None:
+            self._thread = Thread(target=self._build, name=f"index {self.path}", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop building the index and unmap the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def _build(self) -> None:
+        mm = self._mm
+        newlines = 0
+        for start in range(0, self.size, _BLOCK_SIZE):
+            if self._stop.is_set():
+                return
+            end = min(start + _BLOCK_SIZE, self.size)
+            newlines += mm[start:end].count(b"\n")
+            if end < self.size:
+                self._block_newlines.append(newlines)
+            # Only publish the new extent once the block's entry is in place.
+            self._indexed = end
+
+    @property
+    def complete(self) -> bool:
+        """Whether the whole file has been indexed."""
+        return self._indexed == self.size
+
+    @property
+    def line_count(self) -> int:
+        """The number of lines in the part of the file that has been indexed so far."""
+        indexed = self._indexed
+        if not indexed:
+            return 0
+
+        last_block = (indexed - 1) // _BLOCK_SIZE
+        newlines = self._block_newlines[last_block] + self._mm[last_block * _BLOCK_SIZE : indexed].count(b"\n")
+        # The last line doesn't need a trailing newline, but a trailing newline doesn't start a new line.
+        return newlines + (self._mm[indexed - 1 : indexed] != b"\n")
+
+    def _line_start(self, line: int) -> int | None:
+        """The offset of the start of a line, or `None` if the line isn't in the indexed part of the file."""
+        if line == 0:
+            return 0
+
+        # Find the block containing the newline that ends the previous line, then scan for it inside that block.
+        block = bisect_left(self._block_newlines, line) - 1
+        if block < 0:
+            return None
+
+        newlines = line - self._block_newlines[block]
+        starts = self._line_starts_in(block)
+        step = min(newlines // _LINE_STEP, len(starts) - 1)
+        offset = starts[step]
+        for _ in range(newlines - step * _LINE_STEP):
+            offset = self._mm.find(b"\n", offset, self._indexed) + 1
+            if offset == 0:
+                return None
+
+        return offset if offset < self._indexed else None
+
+    def _line_starts_in(self, block: int) -> array[int]:
+        if (starts := self._block_line_starts.get(block)) is not None:
+            return starts
+
+        start = block * _BLOCK_SIZE
+        end = min(start + _BLOCK_SIZE, self.size)
+        if end > self._indexed:
+            # The block is still being indexed, so it may still grow; scan it from its start.
+            return array("Q", [start])
+
+        # Splitting and summing the line lengths happens in C, so this is much faster than finding each newline.
+        lengths = map(len, self._mm[start:end].split(b"\n")[:-1])
+        starts = array("Q", islice(accumulate(map((1).__add__, lengths), initial=start), 0, None, _LINE_STEP))
+        self._block_line_starts[block] = starts
+        return starts
+
+    def lines(self, first: int, count: int) -> list[str]:
+        """
+        Read and decode up to `count` lines, starting with line number `first` (counting from zero).
+        """
+        start = self._line_start(first)
+        if start is None:
+            return []
+
+        lines = []
+        for _ in range(count):
+            if start >= self._indexed:
+                break
+            end = self._mm.find(b"\n", start, self._indexed)
+            if end == -1:
+                end = self._indexed
+            lines.append(self._mm[start:end].decode(self.encoding, errors="replace").rstrip("\r"))
+            start = end + 1
+
+        return lines
+
+    def line_of_offset(self, offset: int) -> int:
+        """The number of the line that contains the byte at `offset`."""
+        block = min(offset // _BLOCK_SIZE, len(self._block_newlines) - 1)
+        block_start = block * _BLOCK_SIZE
+        return self._block_newlines[block] + self._mm[block_start:offset].count(b"\n")
+
+    def find(self, text: str, start_line: int = 0) -> int | None:
+        """
+        Returns:
+            The number of the first line at or after `start_line` that contains `text`,
+            or `None` if there is no such line in the indexed part of the file.
+        """
+        start = self._line_start(start_line)
+        if start is None:
+            return None
+
+        offset = self._mm.find(text.encode(self.encoding), start, self._indexed)
+        if offset == -1:
+            return None
+
+        return self.line_of_offset(offset)
+
+
+def use_file_index(path: Path | str, encoding: str = "utf-8", poll_interval: float = 0.1) -> FileIndex:
+    """
+    Parameters:
+        path: The path to the file to index.
+        encoding: The encoding to decode the file's lines with.
+        poll_interval: How often (in seconds) to check on the progress of the index while it is being built.
+
+    Returns:
+        A [`FileIndex`][counterweight.file_view.FileIndex] for the file,
+            which is built in a background thread when the calling component is first mounted,
+            and closed when the calling component is unmounted.
+            If `path` (or `encoding`) changes, the old index is closed and a new one is built.
+
+        The calling component is re-rendered as the index grows,
+        so that it can display the newly-indexed lines.
+    """
+    index_ref: Ref[FileIndex] = use_ref(lambda: FileIndex(path, encoding=encoding))
+    if index_ref.current.path != Path(path) or index_ref.current.encoding != encoding:
+        # The old index is closed by its effect, which is cleaned up because the new index replaces it in the deps.
+        index_ref.current = FileIndex(path, encoding=encoding)
+    index = index_ref.current
+
+    # The progress includes the index, so that a new index's progress is a change even if it has as many lines.
+    _, set_progress = use_state((index, 0))
+
+    async def build() -> None:
+        index.start()
+        try:
+            while not index.complete:
+                await sleep(poll_interval)
+                set_progress((index, index.line_count))
+            set_progress((index, index.line_count))
+            await forever()
+        finally:
+            index.close()
+
+    use_effect(build, deps=(index,))
+
+    return index
+
+
+@component
+def file_view(index: FileIndex, top: int = 0, style: Style | None = None) -> Text:
+    """
+    Display the lines of a file, starting with line number `top` (counting from zero).
+
+    Only the lines that fit in the component's space are read and decoded,
+    so the component should be given a definite size by its `style` (e.g., with `full` or `grow`).
+
+    Parameters:
+        index: The [`FileIndex`][counterweight.file_view.FileIndex] of the file to display,
+            e.g., from [`use_file_index`][counterweight.file_view.use_file_index].
+        top: The number of the line to display at the top of the view.
+        style: The style of the `Text` element that displays the lines.
+    """
+    rects = use_rects()
+    height = max(int(rects.content.height) + 1, 1)
+
+    return Text(content="\n".join(index.lines(top, height)), style=style or Style())
@@ -1,29 +1,51 @@
 from counterweight.hooks.hooks import (
+    AsyncIterMode,
+    AsyncIterState,
     Hovered,
     Mouse,
     Rects,
+    Subprocess,
+    use_async_iter,
     use_effect,
     use_hovered,
+    use_log_buffer,
     use_mouse,
     use_rects,
     use_ref,
     use_state,
+    use_store,
+    use_subprocess,
+    use_text_buffer,
 )
 from counterweight.hooks.types import Deps, Getter, Ref, Setter, Setup
+from counterweight.log_buffer import LogBuffer
+from counterweight.store import Store
+from counterweight.text_buffer import TextBuffer
 
 __all__ = [
+    "AsyncIterMode",
+    "AsyncIterState",
     "Deps",
     "Getter",
     "Hovered",
+    "LogBuffer",
     "Mouse",
     "Rects",
     "Ref",
     "Setter",
     "Setup",
+    "Store",
+    "Subprocess",
+    "TextBuffer",
+    "use_async_iter",
     "use_effect",
     "use_hovered",
+    "use_log_buffer",
     "use_mouse",
     "use_rects",
     "use_ref",
     "use_state",
+    "use_store",
+    "use_subprocess",
+    "use_text_buffer",
 ]
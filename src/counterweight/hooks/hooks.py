@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from asyncio import TimerHandle, create_subprocess_exec, get_running_loop
+from asyncio.subprocess import DEVNULL, PIPE, STDOUT
+from codecs import getincrementaldecoder
+from collections import deque
+from collections.abc import AsyncIterable, Callable, Mapping, Sequence
+from contextlib import suppress
 from dataclasses import dataclass
-from typing import overload
+from os import PathLike
+from typing import Literal, overload
 
 import waxy
 from structlog import get_logger
 
 from counterweight._context_vars import current_hook_state, current_use_mouse_listeners
 from counterweight._utils import forever
+from counterweight.ansi import AnsiDecoder
 from counterweight.geometry import Position
 from counterweight.hooks.types import Deps, Getter, Ref, Setter, Setup
+from counterweight.log_buffer import LogBuffer
+from counterweight.store import Store
+from counterweight.text_buffer import TextBuffer
 
 logger = get_logger()
 
@@ -159,3 +170,343 @@ def use_hovered() -> Hovered:
         border=rects.border.contains(pos),
         margin=rects.margin.contains(pos),
     )
+
+
+def use_store[T, S](store: Store[T], selector: Callable[[T], S]) -> S:
+    """
+    Parameters:
+        store: The [`Store`][counterweight.hooks.Store] to read from.
+        selector: A function that picks out the part of the store's value that the calling component depends on.
+
+    Returns:
+        The selected part of the store's current value.
+
+        When the store is updated, the `selector` is run on the new value.
+        If the selected value is not equal to the one from the calling component's last render,
+        the calling component (and its descendants) will be re-rendered;
+        other components are not re-rendered.
+    """
+    hooks = current_hook_state.get()
+
+    selected = selector(store.value)
+
+    # The listener from the first render stays subscribed, so it reads the selector and the
+    # last-rendered selection through a ref that is refreshed on every render.
+    latest = use_ref((selector, selected))
+    latest.current = (selector, selected)
+
+    def listener(value: T) -> bool:
+        select, rendered = latest.current
+        if select(value) != rendered:
+            hooks.dirty = True
+            return True
+        return False
+
+    first_listener: Ref[Callable[[T], bool]] = use_ref(lambda: listener)
+    subscribed = first_listener.current
+
+    # Subscribe during render (rather than in the effect) so that no updates
+    # can be missed between this render and the effect starting.
+    store.subscribe(subscribed)
+
+    async def setup() -> None:
+        try:
+            await forever()
+        finally:
+            store.unsubscribe(subscribed)
+
+    use_effect(setup=setup, deps=(store,))
+
+    return selected
+
+
+def use_log_buffer(max_lines: int) -> LogBuffer:
+    """
+    Parameters:
+        max_lines: The maximum number of lines the buffer will hold.
+            Once it is full, appending a line drops the oldest line.
+
+    Returns:
+        A [`LogBuffer`][counterweight.hooks.LogBuffer] that lasts for the lifetime of the calling component,
+            to be displayed with a [`LogView`][counterweight.elements.LogView].
+
+        Whenever lines are appended to the buffer, the calling component will be re-rendered
+        (at most once per frame, no matter how many lines are appended).
+    """
+    buffer_ref: Ref[LogBuffer] = use_ref(lambda: LogBuffer(max_lines=max_lines))
+    buffer = buffer_ref.current
+
+    use_store(buffer.version, lambda version: version)
+
+    return buffer
+
+
+def use_text_buffer(initial_text: str = "", multiline: bool = True) -> TextBuffer:
+    """
+    Parameters:
+        initial_text: The initial text of the buffer.
+        multiline: Whether the buffer can hold more than one line of text.
+            If `False`, newlines are replaced with spaces, and the buffer behaves like a text input.
+
+    Returns:
+        A [`TextBuffer`][counterweight.hooks.TextBuffer] that lasts for the lifetime of the calling component,
+            to be displayed and edited with a [`TextArea`][counterweight.elements.TextArea].
+
+        Whenever the buffer is edited (or its cursor moves), the calling component will be re-rendered
+        (at most once per frame, no matter how many edits are made).
+    """
+    buffer_ref: Ref[TextBuffer] = use_ref(lambda: TextBuffer(initial_text, multiline=multiline))
+    buffer = buffer_ref.current
+
+    use_store(buffer.version, lambda version: version)
+
+    return buffer
+
+
+@dataclass(frozen=True, slots=True)
+class Subprocess:
+    output: LogBuffer
+    """The most recent lines of the process's output (its `stdout` and `stderr`, interleaved)."""
+
+    returncode: int | None
+    """The exit code of the process, or `None` if it is still running."""
+
+
+def use_subprocess(
+    cmd: Sequence[str],
+    max_lines: int = 1_000,
+    cwd: str | PathLike[str] | None = None,
+    env: Mapping[str, str] | None = None,
+    max_rate: float | None = 60,
+) -> Subprocess:
+    """
+    Parameters:
+        cmd: The program to run and its arguments.
+            If `cmd` changes, the old process is killed and the new one is started.
+        max_lines: The maximum number of lines of output to keep.
+        cwd: The working directory to run the process in.
+        env: The environment variables to run the process with.
+            If `None`, the process inherits the application's environment.
+        max_rate: The maximum number of times per second that the calling component is re-rendered
+            because of new output.
+            If `None`, it is re-rendered at most once per render cycle, which,
+            since the render loop runs whenever there are events to handle, may be once per read.
+
+    Returns:
+        A [`Subprocess`][counterweight.hooks.Subprocess] holding the process's output,
+            which can be displayed with a [`LogView`][counterweight.elements.LogView].
+            ANSI color codes in the output are turned into styled text.
+
+        The process is started when the calling component is first mounted, and killed if it is unmounted.
+        However much output the process produces,
+        the calling component is re-rendered at most `max_rate` times per second (and once more when the process exits).
+    """
+    # The buffer's own store is not subscribed to, so appending to it doesn't re-render the component;
+    # instead, this store is bumped (at most max_rate times per second) once new output is in the buffer.
+    output_ref: Ref[LogBuffer] = use_ref(lambda: LogBuffer(max_lines=max_lines))
+    output = output_ref.current
+    output_version_ref: Ref[Store[int]] = use_ref(lambda: Store(0))
+    output_version = output_version_ref.current
+
+    use_store(output_version, lambda version: version)
+
+    returncode: int | None
+    set_returncode: Setter[int | None]
+    returncode, set_returncode = use_state(None)
+
+    async def run() -> None:
+        throttle = _Throttle(lambda: output_version.set(lambda version: version + 1), max_rate)
+
+        if len(output):
+            output.clear()
+            throttle()
+        set_returncode(None)
+
+        process = await create_subprocess_exec(*cmd, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT, cwd=cwd, env=env)
+        assert process.stdout is not None
+
+        decoder = getincrementaldecoder("utf-8")(errors="replace")
+        ansi = AnsiDecoder()
+        carriage_return = ""
+        try:
+            while data := await process.stdout.read(2**16):
+                # A "\r\n" may be split across two reads, so hold a trailing "\r" back until the next read.
+                text = carriage_return + decoder.decode(data)
+                carriage_return = "\r" if text.endswith("\r") else ""
+                if lines := ansi.feed_lines(text.removesuffix("\r").replace("\r\n", "\n")):
+                    output.extend(lines)
+                    throttle()
+
+            ansi.feed(carriage_return + decoder.decode(b"", final=True))
+            if last := ansi.flush():
+                output.append(last)
+
+            throttle.flush()
+            set_returncode(await process.wait())
+        finally:
+            throttle.cancel()
+            if process.returncode is None:
+                with suppress(ProcessLookupError):
+                    process.kill()
+                await process.wait()
+
+    use_effect(run, deps=(tuple(cmd), cwd, env))
+
+    return Subprocess(output=output, returncode=returncode)
+
+
+class _Throttle:
+    """Calls `publish` at most `max_rate` times per second, delaying (and coalescing) calls that come too soon."""
+
+    __slots__ = ("_interval", "_last", "_loop", "_publish", "_scheduled")
+
+    def __init__(self, publish: Callable[[], None], max_rate: float | None) -> None:
+        self._loop = get_running_loop()
+        self._publish = publish
+        self._interval = 1 / max_rate if max_rate else 0.0
+        self._last = float("-inf")
+        self._scheduled: TimerHandle | None = None
+
+    def __call__(self) -> None:
+        if self._scheduled is not None:
+            return
+
+        wait = self._last + self._interval - self._loop.time()
+        if wait <= 0:
+            self.flush()
+        else:
+            self._scheduled = self._loop.call_later(wait, self.flush)
+
+    def flush(self) -> None:
+        """Publish now, instead of waiting for a delayed call."""
+        self.cancel()
+        self._last = self._loop.time()
+        self._publish()
+
+    def cancel(self) -> None:
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+
+
+type AsyncIterMode = Literal["latest", "buffer"]
+
+
+@dataclass(frozen=True, slots=True)
+class AsyncIterState[T]:
+    latest: T | None
+    """The most recent item from the iterator, or `None` if it hasn't produced any yet."""
+
+    items: tuple[T, ...]
+    """In `"buffer"` mode, the most recent (up to `max_buffer`) items from the iterator, oldest first. Otherwise empty."""
+
+    received: int
+    """The number of items the iterator has produced so far."""
+
+    dropped: int
+    """
+    The number of items that were never shown to the calling component:
+    in `"latest"` mode, items that were replaced by a newer item before a render,
+    and in `"buffer"` mode, items that fell out of the full buffer.
+    """
+
+    done: bool
+    """Whether the iterator is exhausted."""
+
+
+class _AsyncIterCollector[T]:
+    __slots__ = ("done", "dropped", "items", "latest", "mode", "received", "unseen", "version")
+
+    def __init__(self, mode: AsyncIterMode, max_buffer: int) -> None:
+        self.mode = mode
+        self.items: deque[T] = deque(maxlen=max_buffer)
+        self.latest: T | None = None
+        self.received = 0
+        self.dropped = 0
+        self.unseen = 0
+        self.done = False
+        self.version: Store[int] = Store(0)
+
+    def push(self, item: T) -> None:
+        self.received += 1
+        self.latest = item
+        if self.mode == "buffer":
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+        else:
+            self.unseen += 1
+
+    def publish(self) -> None:
+        self.version.set(lambda version: version + 1)
+
+    def snapshot(self) -> AsyncIterState[T]:
+        # Items that arrived since the last render but were replaced before this one were never seen.
+        if self.unseen > 1:
+            self.dropped += self.unseen - 1
+        self.unseen = 0
+
+        return AsyncIterState(
+            latest=self.latest,
+            items=tuple(self.items),
+            received=self.received,
+            dropped=self.dropped,
+            done=self.done,
+        )
+
+
+def use_async_iter[T](
+    source: AsyncIterable[T],
+    mode: AsyncIterMode = "latest",
+    max_rate: float | None = 60,
+    max_buffer: int = 1_000,
+) -> AsyncIterState[T]:
+    """
+    Parameters:
+        source: The async iterable to consume (e.g., an async generator reading from a socket or a queue).
+            It should be the same object on every render (e.g., created with [`use_ref`][counterweight.hooks.use_ref]);
+            if it changes, the old one is abandoned and the new one is consumed from the start.
+            Changing the source, `mode`, or `max_buffer` resets the state, including `received` and `dropped`;
+            changing `mode` or `max_buffer` also restarts the iteration of `source`.
+        mode: `"latest"` to only keep the most recent item,
+            or `"buffer"` to keep (up to `max_buffer` of) the most recent items.
+        max_rate: The maximum number of times per second that the calling component is re-rendered
+            because of new items.
+            If `None`, it is re-rendered at most once per render cycle, which,
+            since the render loop runs whenever there are events to handle, may be once per item.
+        max_buffer: The maximum number of items to keep in `"buffer"` mode.
+
+    Returns:
+        An [`AsyncIterState`][counterweight.hooks.AsyncIterState] describing the items produced so far.
+
+        The iterator is consumed as fast as it produces items, but however fast that is,
+        the calling component is re-rendered at most `max_rate` times per second,
+        and only the most recent items are kept.
+    """
+    collector_ref: Ref[_AsyncIterCollector[T]] = use_ref(lambda: _AsyncIterCollector(mode, max_buffer))
+    key = (source, mode, max_buffer)
+    key_ref = use_ref(key)
+    if key_ref.current != key:
+        # Replace the collector during the render, rather than in the effect,
+        # so that this render already shows the new source's (empty) state instead of the old one's.
+        key_ref.current = key
+        collector_ref.current = _AsyncIterCollector(mode, max_buffer)
+    collector = collector_ref.current
+
+    use_store(collector.version, lambda version: version)
+
+    async def consume() -> None:
+        throttle = _Throttle(collector.publish, max_rate)
+        try:
+            async for item in source:
+                collector.push(item)
+                throttle()
+
+            collector.done = True
+            throttle.flush()
+        finally:
+            throttle.cancel()
+
+    use_effect(consume, deps=key)
+
+    return collector.snapshot()
@@ -36,6 +36,7 @@ class InconsistentHookExecution(Exception):
 class Hooks:
     data: list[UseState | UseRef | UseEffect] = field(default_factory=list)
     dims: ResolvedLayout = field(default=INITIAL_RESOLVED_LAYOUT)
+    dirty: bool = False  # set when the component must be re-rendered even if nothing above it is
 
     @property
     def effects(self) -> Iterator[UseEffect]:
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import math
-from collections.abc import Iterable
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, assert_never
+from itertools import chain, islice, pairwise
+from typing import TYPE_CHECKING, NamedTuple, assert_never
 
 import waxy
+from cachetools import LRUCache
 
-from counterweight.elements import AnyElement, CellPaint, Div, Text
+from counterweight.elements import AnyElement, Canvas, CellPaint, Div, LogView, Table, Text, TextArea
 from counterweight.styles.styles import TextWrap
 
 if TYPE_CHECKING:
@@ -43,12 +47,12 @@ def compute_layout(
     Build a waxy tree from the shadow tree, compute layout, and return
     a flat list of (element, resolved_layout) pairs.
     """
-    tree: waxy.TaffyTree[Text] = waxy.TaffyTree()
+    tree: waxy.TaffyTree[Text | Canvas | LogView | TextArea | Table] = waxy.TaffyTree()
     node_map: dict[waxy.NodeId, ShadowNode] = {}
 
     root_id = _build_node(tree, shadow, node_map)
 
-    tree.compute_layout(root_id, available, measure=_measure_text)
+    tree.compute_layout(root_id, available, measure=_measure)
 
     results: list[tuple[AnyElement, ResolvedLayout]] = []
     _extract_layout(tree, root_id, node_map, abs_x=0.0, abs_y=0.0, results=results)
@@ -56,15 +60,48 @@ def compute_layout(
     return results
 
 
+def reuse_layout(
+    shadow: ShadowNode,
+    previous: list[tuple[AnyElement, ResolvedLayout]],
+) -> list[tuple[AnyElement, ResolvedLayout]]:
+    """
+    Pair the elements of `shadow` with the resolved layouts from `previous`,
+    the result of [`compute_layout`][counterweight.layout.compute_layout] on a tree that lays out identically
+    (i.e., differs from `shadow` by at most a paint-only change), without laying out again.
+
+    Like `compute_layout`, this updates the dimensions that each node's hooks report (e.g., for `use_rects`),
+    since a node may be new even if its layout isn't (e.g., a component that was swapped for another one).
+    """
+    nodes: list[ShadowNode] = []
+    _collect_laid_out_nodes(shadow, nodes)
+
+    reused = []
+    for node, (_, resolved) in zip(nodes, previous, strict=True):
+        node.hooks.dims = resolved
+        reused.append((node.element, resolved))
+    return reused
+
+
+def _collect_laid_out_nodes(shadow: ShadowNode, nodes: list[ShadowNode]) -> None:
+    # Must visit nodes in the same order as _extract_layout
+    if shadow.element.style.layout.display == waxy.Display.Nil:
+        return
+
+    nodes.append(shadow)
+
+    for child in shadow.children:
+        _collect_laid_out_nodes(child, nodes)
+
+
 def _build_node(
-    tree: waxy.TaffyTree[Text],
+    tree: waxy.TaffyTree[Text | Canvas | LogView | TextArea | Table],
     shadow: ShadowNode,
     node_map: dict[waxy.NodeId, ShadowNode],
 ) -> waxy.NodeId:
     element = shadow.element
 
     match element:
-        case Text():
+        case Text() | Canvas() | LogView() | TextArea() | Table():
             node_id = tree.new_leaf_with_context(element.style.layout, element)
         case Div():
             child_ids = [_build_node(tree, child_shadow, node_map) for child_shadow in shadow.children]
@@ -76,29 +113,91 @@ def _build_node(
     return node_id
 
 
+def _measure(
+    known: waxy.KnownSize,
+    available: waxy.AvailableSize,
+    context: Text | Canvas | LogView | TextArea | Table,
+) -> waxy.Size:
+    match context:
+        case Text():
+            return _measure_text(known, available, context)
+        case Canvas():
+            return _measure_canvas(known, context)
+        case LogView():
+            return _measure_log_view(known, available)
+        case TextArea():
+            return _measure_text_area(known, available, context)
+        case Table():
+            return _measure_table(known, available, context)
+        case _:
+            assert_never(context)
+
+
+def _measure_canvas(known: waxy.KnownSize, context: Canvas) -> waxy.Size:
+    width, height = context.cell_size
+    return waxy.Size(
+        width=known.width if known.width is not None else float(width),
+        height=known.height if known.height is not None else float(height),
+    )
+
+
+def _measure_log_view(known: waxy.KnownSize, available: waxy.AvailableSize) -> waxy.Size:
+    # A log view doesn't size itself to its content (which would mean wrapping every line in the buffer);
+    # it takes whatever space it is given.
+    width = known.width
+    if width is None:
+        width = available.width.value if isinstance(available.width, waxy.Definite) else 0.0
+    height = known.height
+    if height is None:
+        height = available.height.value if isinstance(available.height, waxy.Definite) else 0.0
+    return waxy.Size(width=width, height=height)
+
+
+def _measure_text_area(known: waxy.KnownSize, available: waxy.AvailableSize, context: TextArea) -> waxy.Size:
+    if context.buffer.multiline:
+        return _measure_log_view(known, available)
+    return _measure_log_view(
+        waxy.KnownSize(width=known.width, height=1.0 if known.height is None else known.height), available
+    )
+
+
+def _measure_table(known: waxy.KnownSize, available: waxy.AvailableSize, context: Table) -> waxy.Size:
+    width, height = context.cell_size
+    # A table with many rows is scrolled rather than laid out at its full height.
+    if isinstance(available.height, waxy.Definite):
+        height = min(height, int(available.height.value))
+    return waxy.Size(
+        width=known.width if known.width is not None else float(width),
+        height=known.height if known.height is not None else float(height),
+    )
+
+
 def _measure_text(
     known: waxy.KnownSize,
     available: waxy.AvailableSize,
     context: Text,
 ) -> waxy.Size:
+    if known.width is not None and known.height is not None:
+        return waxy.Size(width=known.width, height=known.height)
+
     width: float | None = known.width
     if width is None and isinstance(available.width, waxy.Definite):
         width = available.width.value
 
-    lines = wrap_cells(
-        context.cells,
+    lines = WRAP_CACHE.wrap(
+        context.styled.text,
         context.style.text_wrap,
         int(width) if width is not None else None,
     )
 
     return waxy.Size(
-        width=known.width if known.width is not None else float(max((len(l) for l in lines), default=0)),
+        width=known.width if known.width is not None else float(max((l.length for l in lines), default=0)),
         height=known.height if known.height is not None else float(len(lines)),
     )
 
 
 def _extract_layout(
-    tree: waxy.TaffyTree[Text],
+    tree: waxy.TaffyTree[Text | Canvas | LogView | TextArea | Table],
     node_id: waxy.NodeId,
     node_map: dict[waxy.NodeId, ShadowNode],
     abs_x: float,
@@ -170,289 +269,346 @@ def _extract_layout(
         _extract_layout(tree, child_node_id, node_map, border_abs_x, border_abs_y, results)
 
 
-def _split_paragraphs(cells: Iterable[CellPaint]) -> list[list[CellPaint]]:
-    paragraphs: list[list[CellPaint]] = []
-    current: list[CellPaint] = []
-    for cell in cells:
-        if cell.char == "\n":
-            paragraphs.append(current)
-            current = []
-        else:
-            current.append(cell)
-    paragraphs.append(current)
-    return paragraphs
+class Line(NamedTuple):
+    """
+    One wrapped line of a string: the characters in `[start, end)`,
+    followed by a hyphen if the line breaks a word that is too long to fit on one line.
+    """
 
+    start: int
+    end: int
+    hyphen: bool = False
 
-def _extract_words_and_spaces(
-    paragraph: list[CellPaint],
-) -> tuple[list[list[CellPaint]], list[list[CellPaint]]]:
-    """Split a paragraph into (words, spaces).
+    @property
+    def length(self) -> int:
+        return self.end - self.start + self.hyphen
 
-    words[i] is a non-space run; spaces[i] is the space run between words[i] and words[i+1].
-    Leading and trailing spaces are discarded.
-    len(spaces) == len(words) - 1.
-    """
-    words: list[list[CellPaint]] = []
-    spaces: list[list[CellPaint]] = []
-    current_word: list[CellPaint] = []
-    current_space: list[CellPaint] = []
-
-    for cell in paragraph:
-        if cell.char == " ":
-            if current_word:
-                # We are in a word — start collecting the trailing space run.
-                current_space.append(cell)
-        else:
-            if current_space:
-                # We just finished a space run between two words.
-                words.append(current_word)
-                spaces.append(current_space)
-                current_word = [cell]
-                current_space = []
-            elif current_word:
-                current_word.append(cell)
-            else:
-                # Start of the first word (leading spaces already dropped).
-                current_word = [cell]
 
-    if current_word:
-        words.append(current_word)
-    # Trailing spaces in current_space are discarded.
+_WORD = re.compile(r"[^ ]+")
 
-    return words, spaces
 
+def _iter_paragraphs(text: str) -> Iterator[tuple[int, int]]:
+    start = 0
+    while (end := text.find("\n", start)) != -1:
+        yield start, end
+        start = end + 1
+    yield start, len(text)
 
-def _flatten_long_words(
-    words: list[list[CellPaint]],
-    spaces: list[list[CellPaint]],
-    width: int,
-) -> tuple[list[list[CellPaint]], list[list[CellPaint]]]:
-    """Break any word longer than width into width-sized chunks.
 
-    Space runs between chunks of the same word become [] (no space between hyphenated chunks).
-    Returns (flat_words, flat_spaces) with len(flat_spaces) == len(flat_words) - 1.
+def _flatten_words(text: str, start: int, end: int, width: int) -> tuple[list[int], list[int], list[bool]]:
     """
-    flat_words: list[list[CellPaint]] = []
-    flat_spaces: list[list[CellPaint]] = []
+    Find the words in `text[start:end]`, breaking any word longer than `width` into width-sized chunks,
+    hyphenating all but the last chunk.
 
-    for i, word in enumerate(words):
-        if len(word) > width:
-            chunks = _break_long_word(word, width)
-        else:
-            chunks = [word]
-
-        for j, chunk in enumerate(chunks):
-            if flat_words:
-                # Insert a space before this chunk:
-                # - [] (no space) between hyphenated sub-chunks of the same word
-                # - the real inter-word space run between different words
-                flat_spaces.append([] if j > 0 else spaces[i - 1] if i > 0 else [])
-            flat_words.append(chunk)
-
-    return flat_words, flat_spaces
-
-
-def _break_long_word(word: list[CellPaint], width: int) -> list[list[CellPaint]]:
-    """Break a word that is longer than width into width-sized chunks, hyphenating all but the last."""
-    if width <= 1:
-        return [word[i : i + width] for i in range(0, len(word), width)]
-    chunks: list[list[CellPaint]] = []
-    i = 0
-    while i < len(word):
-        if i + width < len(word):
-            hyphen = CellPaint(char="-", style=word[i + width - 2].style)
-            chunks.append([*word[i : i + width - 1], hyphen])
-            i += width - 1
-        else:
-            chunks.append(word[i : i + width])
-            break
-    return chunks
+    Returns the start offsets, end offsets, and hyphenation of each word or chunk.
+    Leading and trailing spaces are discarded,
+    and each run of spaces between two words is whatever lies between the end of one and the start of the next
+    (which is nothing between the chunks of a broken word).
 
+    A hyphenated chunk is always exactly `width` wide, so it will always be on a line by itself.
+    """
+    starts: list[int] = []
+    ends: list[int] = []
+    hyphens: list[bool] = []
+
+    for match in _WORD.finditer(text, start, end):
+        word_start, word_end = match.span()
+        if word_end - word_start > width:
+            # Each hyphenated chunk holds width - 1 characters plus the hyphen,
+            # unless the width is too narrow to fit anything but the hyphen.
+            step = width - 1 if width > 1 else width
+            hyphen = width > 1
+            while word_start + width < word_end:
+                starts.append(word_start)
+                ends.append(word_start + step)
+                hyphens.append(hyphen)
+                word_start += step
+        starts.append(word_start)
+        ends.append(word_end)
+        hyphens.append(False)
+
+    return starts, ends, hyphens
+
+
+def _greedy_breaks(starts: list[int], ends: list[int], hyphens: list[bool], width: int) -> list[int]:
+    """Return the index of the first word on each line when greedily filling lines up to `width`."""
+    breaks = [0]
+    first = starts[0]
+    for k in range(1, len(starts)):
+        if ends[k] + hyphens[k] - first > width:
+            breaks.append(k)
+            first = starts[k]
+    return breaks
+
+
+def _lines_from_breaks(starts: list[int], ends: list[int], hyphens: list[bool], breaks: list[int]) -> list[Line]:
+    return [Line(starts[i], ends[j - 1], hyphens[j - 1]) for i, j in pairwise(chain(breaks, (len(starts),)))]
+
+
+def _wrap_greedy(text: str, start: int, end: int, width: int) -> list[Line]:
+    starts, ends, hyphens = _flatten_words(text, start, end, width)
+    if not starts:
+        return [Line(start, start)]
+
+    return _lines_from_breaks(starts, ends, hyphens, _greedy_breaks(starts, ends, hyphens, width))
+
+
+def _wrap_balance(text: str, start: int, end: int, width: int) -> list[Line]:
+    starts, ends, hyphens = _flatten_words(text, start, end, width)
+    if not starts:
+        return [Line(start, start)]
+
+    breaks = _greedy_breaks(starts, ends, hyphens, width)
+    k = len(breaks)
+
+    if k > 1:
+        # Binary search for the narrowest target that still yields k lines.
+        # Words are only ever broken at the full width, never at the target.
+        lo, hi = 1, width
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if len(_greedy_breaks(starts, ends, hyphens, mid)) <= k:
+                hi = mid
+            else:
+                lo = mid + 1
 
-def _wrap_greedy(paragraph: list[CellPaint], width: int) -> list[list[CellPaint]]:
-    words, spaces = _extract_words_and_spaces(paragraph)
-    flat_words, flat_spaces = _flatten_long_words(words, spaces, width)
+        breaks = _greedy_breaks(starts, ends, hyphens, lo)
 
-    lines: list[list[CellPaint]] = []
-    current: list[CellPaint] = []
-    pending_space: list[CellPaint] = []
+    return _lines_from_breaks(starts, ends, hyphens, breaks)
 
-    for i, word in enumerate(flat_words):
-        if not current:
-            current = list(word)
-        elif len(current) + len(pending_space) + len(word) <= width:
-            current.extend(pending_space)
-            current.extend(word)
-        else:
-            lines.append(current)
-            current = list(word)
-        if i < len(flat_spaces):
-            pending_space = flat_spaces[i]
-
-    lines.append(current)
-    return lines
-
-
-def _greedy_line_count(flat_words: list[list[CellPaint]], flat_spaces: list[list[CellPaint]], width: int) -> int:
-    count = 1
-    length = 0
-    pending_space_len = 0
-
-    for i, word in enumerate(flat_words):
-        wlen = len(word)
-        if not length:
-            length = wlen
-        elif length + pending_space_len + wlen <= width:
-            length += pending_space_len + wlen
-        else:
-            count += 1
-            length = wlen
-        pending_space_len = len(flat_spaces[i]) if i < len(flat_spaces) else 0
 
-    return count
+def _wrap_pretty(text: str, start: int, end: int, width: int) -> list[Line]:
+    """
+    Optimal line-breaking minimizing the sum of squared slack on non-last lines, in linear time.
 
+    With A[j] = the end offset of word j - 1 and B[i] = the start offset of word i
+    (both measured as if the paragraph were on one line), a line holding words i..j-1
+    has length A[j] - B[i], so the cost of ending a line at j after breaking at i is
 
-def _wrap_at_target(
-    flat_words: list[list[CellPaint]],
-    flat_spaces: list[list[CellPaint]],
-    width: int,
-    target: int,
-) -> list[list[CellPaint]]:
-    """Greedy wrap with long-word breaking, targeting `target` width for line breaks."""
-    lines: list[list[CellPaint]] = []
-    current: list[CellPaint] = []
-    pending_space: list[CellPaint] = []
-
-    for i, word in enumerate(flat_words):
-        if not current:
-            current = list(word)
-        elif len(current) + len(pending_space) + len(word) <= target:
-            current.extend(pending_space)
-            current.extend(word)
-        else:
-            lines.append(current)
-            current = list(word)
-        if i < len(flat_spaces):
-            pending_space = flat_spaces[i]
+        g[j] = min over i of g[i] + (width - A[j] + B[i])^2
+
+    As the break j moves right, A[j] only grows, and once a later break candidate b
+    is at least as good as an earlier candidate a, it stays at least as good
+    (a only gets worse, and eventually can't fit on one line with j at all).
+    The point where b takes over from a can be computed in closed form,
+    so a deque of the candidates that can still be optimal gives each g[j] in amortized O(1)
+    (the "convex hull trick" for concave least-weight subsequence problems).
+    """
+    word_starts, word_ends, hyphens = _flatten_words(text, start, end, width)
+    if not word_starts:
+        return [Line(start, start)]
 
-    lines.append(current)
-    return lines
+    n = len(word_starts)
 
+    # starts[i] = B[i], ends[j] = A[j]; ends[0] is never used because a line must hold at least one word.
+    # Hyphens take up a cell on the line but not in the text, so they shift the offsets of everything after them.
+    starts: list[int] = [0] * n
+    ends: list[int] = [0] * (n + 1)
+    shift = -word_starts[0]
+    for idx in range(n):
+        starts[idx] = word_starts[idx] + shift
+        shift += hyphens[idx]
+        ends[idx + 1] = word_ends[idx] + shift
+
+    # g[j] = min cost of the lines before a break at j, bp[j] = the previous break for that cost.
+    g: list[int] = [0] * n
+    bp: list[int] = [0] * n
+
+    def takeover(a: int, b: int) -> int:
+        """The smallest end offset at which break candidate b (> a) is at least as good as a."""
+        d = starts[b] - starts[a]  # > 0, since every word is at least one cell wide
+        num = g[b] - g[a] + d * (2 * width + starts[a] + starts[b])
+        cheaper = -(-num // (2 * d))
+        doesnt_fit = width + starts[a] + 1
+        return min(cheaper, doesnt_fit)
+
+    candidates = deque([0])
+    for j in range(1, n):
+        end_offset = ends[j]
+        while len(candidates) >= 2 and takeover(candidates[0], candidates[1]) <= end_offset:
+            candidates.popleft()
+
+        i = candidates[0]
+        slack = width - end_offset + starts[i]
+        g[j] = g[i] + slack * slack
+        bp[j] = i
+
+        while len(candidates) >= 2 and takeover(candidates[-2], candidates[-1]) >= takeover(candidates[-1], j):
+            candidates.pop()
+        candidates.append(j)
+
+    # The last line costs nothing, so pick the cheapest break among those that leave a last line that fits.
+    # There is always at least one, because _flatten_words ensures every word fits within width.
+    last = n - 1
+    for i in range(n - 2, -1, -1):
+        if ends[n] - starts[i] > width:
+            break
+        if g[i] <= g[last]:
+            last = i
+
+    breaks = []
+    i = last
+    while i > 0:
+        breaks.append(i)
+        i = bp[i]
+    breaks.append(0)
+    breaks.reverse()
 
-def _wrap_balance(paragraph: list[CellPaint], width: int) -> list[list[CellPaint]]:
-    words, spaces = _extract_words_and_spaces(paragraph)
-    if not words:
-        return [[]]
+    return _lines_from_breaks(word_starts, word_ends, hyphens, breaks)
 
-    flat_words, flat_spaces = _flatten_long_words(words, spaces, width)
 
-    k = _greedy_line_count(flat_words, flat_spaces, width)
+def iter_wrap_text(text: str, wrap: TextWrap, width: int | None) -> Iterator[Line]:
+    """
+    Lazily wrap `text` into lines.
 
-    if k <= 1:
-        return _wrap_at_target(flat_words, flat_spaces, width, width)
+    Each paragraph (i.e., the text between two newlines) is only wrapped
+    when the first of its lines is requested, so callers that only need the first few lines
+    (e.g., to fill a box of known height) don't pay for wrapping the rest of the content.
+    """
+    if width is not None and width <= 0:
+        return
 
-    # Binary search for the narrowest target that still yields k lines.
-    lo, hi = 1, width
-    while lo < hi:
-        mid = (lo + hi) // 2
-        if _greedy_line_count(flat_words, flat_spaces, mid) <= k:
-            hi = mid
+    for start, end in _iter_paragraphs(text):
+        if wrap == "none" or width is None:
+            yield Line(start, end)
+        elif wrap == "stable":
+            yield from _wrap_greedy(text, start, end, width)
+        elif wrap == "balance":
+            yield from _wrap_balance(text, start, end, width)
+        elif wrap == "pretty":
+            yield from _wrap_pretty(text, start, end, width)
         else:
-            lo = mid + 1
+            assert_never(wrap)
 
-    return _wrap_at_target(flat_words, flat_spaces, width, lo)
 
+def _line_cells(cells: Sequence[CellPaint], line: Line) -> list[CellPaint]:
+    line_cells = list(cells[line.start : line.end])
+    if line.hyphen:
+        line_cells.append(CellPaint(char="-", style=cells[line.end - 1].style))
+    return line_cells
 
-def _wrap_pretty(paragraph: list[CellPaint], width: int) -> list[list[CellPaint]]:
-    """DP optimal line-breaking minimizing sum of squared slack on non-last lines."""
-    words, spaces = _extract_words_and_spaces(paragraph)
-    if not words:
-        return [[]]
 
-    flat_words, flat_spaces = _flatten_long_words(words, spaces, width)
+def iter_wrap_cells(
+    cells: Iterable[CellPaint],
+    wrap: TextWrap,
+    width: int | None,
+) -> Iterator[list[CellPaint]]:
+    """
+    Lazily wrap `cells` into lines of cells.
 
-    n = len(flat_words)
-    INF = float("inf")
+    This is a per-cell view of [`iter_wrap_text`][counterweight.layout.iter_wrap_text];
+    like it, paragraphs are only consumed from `cells` as their lines are requested.
+    """
+    if width is not None and width <= 0:
+        return
 
-    # Precompute prefix sums of word lengths so line_length is O(1).
-    # prefix[i] = sum of len(flat_words[0]) .. len(flat_words[i-1])
-    prefix: list[int] = [0] * (n + 1)
-    for idx in range(n):
-        prefix[idx + 1] = prefix[idx] + len(flat_words[idx])
-
-    # Precompute prefix sums of space lengths between words.
-    # space_prefix[k] = sum of len(flat_spaces[0]) .. len(flat_spaces[k-1])
-    # (size n, space_prefix[0] = 0)
-    space_prefix: list[int] = [0] * n
-    for idx in range(1, n):
-        space_prefix[idx] = space_prefix[idx - 1] + len(flat_spaces[idx - 1])
-
-    def line_length(i: int, j: int) -> int:
-        word_len = prefix[j] - prefix[i]
-        space_len = space_prefix[j - 1] - space_prefix[i] if j > i + 1 else 0
-        return word_len + space_len
-
-    # dp[i] = min cost to break flat_words[i..n-1], bp[i] = best j for first break after i.
-    # bp[i] is always set to j > i before use because _flatten_long_words ensures every word fits
-    # within width, so each word can at minimum occupy its own line.
-    dp: list[float] = [INF] * (n + 1)
-    bp: list[int] = [0] * (n + 1)
-    dp[n] = 0.0
-
-    for i in range(n - 1, -1, -1):
-        for j in range(i + 1, n + 1):
-            ll = line_length(i, j)
-            if ll > width:
-                break
-            slack = width - ll
-            if j == n:
-                cost = 0.0
-            else:
-                cost = float(slack) ** 2
-            total = cost + dp[j]
-            if total < dp[i]:
-                dp[i] = total
-                bp[i] = j
-
-    # Reconstruct lines.
-    lines: list[list[CellPaint]] = []
-    i = 0
-    while i < n:
-        j = bp[i]
-        line: list[CellPaint] = []
-        for k in range(i, j):
-            if k > i:
-                # Insert the actual space run between flat_words[k-1] and flat_words[k].
-                if k - 1 < len(flat_spaces):
-                    line.extend(flat_spaces[k - 1])
-            line.extend(flat_words[k])
-        lines.append(line)
-        i = j
-
-    return lines if lines else [[]]
+    paragraph: list[CellPaint] = []
+    for cell in chain(cells, (None,)):
+        if cell is not None and cell.char != "\n":
+            paragraph.append(cell)
+            continue
+
+        text = "".join(c.char for c in paragraph)
+        for line in iter_wrap_text(text, wrap, width):
+            yield _line_cells(paragraph, line)
+        paragraph = []
 
 
 def wrap_cells(
     cells: Iterable[CellPaint],
     wrap: TextWrap,
     width: int | None,
+    limit: int | None = None,
 ) -> list[list[CellPaint]]:
-    if width is not None and width <= 0:
-        return []
+    """
+    Wrap `cells` into lines.
 
-    paragraphs = _split_paragraphs(cells)
+    If `limit` is given, wrapping stops once that many lines have been produced.
+    """
+    return list(islice(iter_wrap_cells(cells, wrap, width), limit))
 
-    if wrap == "none" or width is None:
-        return paragraphs
 
-    result: list[list[CellPaint]] = []
-    for paragraph in paragraphs:
-        if wrap == "stable":
-            result.extend(_wrap_greedy(paragraph, width))
-        elif wrap == "balance":
-            result.extend(_wrap_balance(paragraph, width))
-        elif wrap == "pretty":
-            result.extend(_wrap_pretty(paragraph, width))
+@dataclass(slots=True)
+class _WrapCacheEntry:
+    lines: list[Line]
+    rest: Iterator[Line] | None
+
+
+class WrapCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class WrapCache:
+    """
+    A bounded LRU cache of the results of [`iter_wrap_text`][counterweight.layout.iter_wrap_text],
+    shared by text measurement (which may wrap the same text at several widths during one layout)
+    and text painting (which wraps it again at the final width).
+
+    Wrapping only depends on the characters, not their styles,
+    so texts with the same characters share entries.
+    The returned lines are shared between callers and must not be mutated.
+    """
+
+    __slots__ = ("_cache", "hits", "misses")
+
+    def __init__(self, maxsize: int) -> None:
+        # If only some of the lines have been needed so far, the entry also holds the iterator
+        # that will produce the rest of them; it is None once all the lines have been produced.
+        self._cache: LRUCache[tuple[str, TextWrap, int | None], _WrapCacheEntry] = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(
+        self,
+        text: str,
+        wrap: TextWrap,
+        width: int | None,
+        limit: int | None = None,
+    ) -> list[Line]:
+        """
+        Return the lines that `text` wraps into, or only the first `limit` of them.
+
+        Asking for more lines than an earlier call did resumes wrapping where that call stopped.
+        """
+        key = (text, wrap, width)
+
+        entry = self._cache.get(key)
+        if entry is None:
+            entry = self._cache[key] = _WrapCacheEntry(lines=[], rest=iter_wrap_text(text, wrap, width))
+
+        if entry.rest is None or (limit is not None and len(entry.lines) >= limit):
+            self.hits += 1
         else:
-            assert_never(wrap)
-    return result
+            self.misses += 1
+            if limit is None:
+                entry.lines.extend(entry.rest)
+                entry.rest = None
+            else:
+                entry.lines.extend(islice(entry.rest, limit - len(entry.lines)))
+                if len(entry.lines) < limit:
+                    entry.rest = None
+
+        if limit is None or (entry.rest is None and len(entry.lines) <= limit):
+            return entry.lines
+
+        # Never hand out the shared list while it can still grow.
+        return entry.lines[:limit]
+
+    def info(self) -> WrapCacheInfo:
+        return WrapCacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=int(self._cache.maxsize),
+            currsize=int(self._cache.currsize),
+        )
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+WRAP_CACHE = WrapCache(maxsize=2**10)
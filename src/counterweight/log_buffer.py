@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Sequence
+from itertools import islice
+
+from counterweight.elements import Chunk, StyledText
+from counterweight.layout import Line, iter_wrap_text
+from counterweight.store import Store
+from counterweight.styles.styles import TextWrap
+
+
+class _LogLine:
+    __slots__ = ("lines", "styled", "width", "wrap")
+
+    def __init__(self, styled: StyledText) -> None:
+        self.styled = styled
+        # The most recent wrapping of this line; a log view almost always wraps every line at the same width,
+        # so there's no need to remember more than one.
+        self.wrap: TextWrap | None = None
+        self.width: int | None = None
+        self.lines: list[Line] = []
+
+    def wrapped(self, wrap: TextWrap, width: int) -> list[Line]:
+        if wrap != self.wrap or width != self.width:
+            self.lines = list(iter_wrap_text(self.styled.text, wrap, width))
+            self.wrap = wrap
+            self.width = width
+        return self.lines
+
+
+class LogBuffer:
+    """
+    A bounded ring buffer of log lines, displayed by a [`LogView`][counterweight.elements.LogView].
+
+    Once the buffer holds `max_lines` lines, appending a line drops the oldest one.
+    Each line is wrapped on its own, the first time it is displayed, and its wrapping is reused after that,
+    so appending lines never re-wraps the lines that were already in the buffer.
+
+    Every change to the buffer increments the [`Store`][counterweight.hooks.Store] `version`,
+    so components that display the buffer can subscribe to it
+    (e.g., with [`use_log_buffer`][counterweight.hooks.use_log_buffer]),
+    and any number of appends between two frames cause a single re-render.
+    """
+
+    __slots__ = ("_lines", "version")
+
+    def __init__(self, max_lines: int) -> None:
+        self._lines: deque[_LogLine] = deque(maxlen=max_lines)
+        self.version: Store[int] = Store(0)
+
+    @property
+    def max_lines(self) -> int:
+        return self._lines.maxlen or 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, line: str | Sequence[Chunk]) -> None:
+        """
+        Append a line to the buffer.
+
+        This must be called from inside the application's event loop (e.g., from an effect or an event handler).
+        """
+        self.extend((line,))
+
+    def extend(self, lines: Iterable[str | Sequence[Chunk]]) -> None:
+        """
+        Append lines to the buffer.
+
+        This must be called from inside the application's event loop (e.g., from an effect or an event handler).
+        """
+        self._lines.extend(_LogLine(StyledText.from_content(line)) for line in lines)
+        self.version.set(lambda version: version + 1)
+
+    def clear(self) -> None:
+        """
+        Remove all lines from the buffer.
+
+        This must be called from inside the application's event loop (e.g., from an effect or an event handler).
+        """
+        self._lines.clear()
+        self.version.set(lambda version: version + 1)
+
+    def window(
+        self,
+        wrap: TextWrap,
+        width: int,
+        height: int,
+        start: int | None,
+    ) -> list[tuple[StyledText, Line]]:
+        """
+        Return the (at most `height`) wrapped lines that are visible in a `width` by `height` window.
+
+        If `start` is `None`, the window shows the end of the buffer;
+        otherwise it shows the wrapped lines starting with the `start`-th line in the buffer.
+        Only the lines inside the window are wrapped.
+        """
+        if width <= 0 or height <= 0:
+            return []
+
+        window: list[tuple[StyledText, Line]] = []
+
+        if start is None:
+            for log_line in reversed(self._lines):
+                wrapped = log_line.wrapped(wrap, width)
+                window.extend((log_line.styled, line) for line in reversed(wrapped))
+                if len(window) >= height:
+                    break
+            window = window[:height]
+            window.reverse()
+        else:
+            for log_line in islice(self._lines, max(start, 0), None):
+                window.extend((log_line.styled, line) for line in log_line.wrapped(wrap, width))
+                if len(window) >= height:
+                    break
+            window = window[:height]
+
+        return window
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, TextIO
+import os
+import unicodedata
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import TYPE_CHECKING, Literal, TextIO
 
 from structlog import get_logger
 
+from counterweight.ansi import PALETTE_256
 from counterweight.geometry import Position
 from counterweight.paint import Paint
-from counterweight.styles.styles import CellStyle
+from counterweight.styles.styles import CellStyle, Color
 
 if TYPE_CHECKING:
     pass
@@ -26,6 +31,8 @@ UNSET_ANY_EVENT_MOUSE_SGR_FORMAT = "\x1b[?1003l\x1b[?1006l"
 
 CLEAR_SCREEN = "\x1b[2J"
 
+RESET = "\x1b[0m"
+
 BELL = "\x07"
 
 logger = get_logger()
@@ -62,11 +69,108 @@ def move_to(position: Position) -> str:
     return f"\x1b[{position.y + 1};{position.x + 1}f"
 
 
-def sgr_from_cell_style(style: CellStyle) -> str:
-    fg_r, fg_g, fg_b = style.foreground
-    bg_r, bg_g, bg_b = style.background
+type ColorDepth = Literal["truecolor", "256", "16"]
+
+
+def detect_color_depth(environ: Mapping[str, str] = os.environ) -> ColorDepth:
+    """
+    Guess how many colors the terminal supports from the `COLORTERM` and `TERM` environment variables.
+
+    Terminals that support 24-bit color usually say so with `COLORTERM=truecolor` (or `24bit`),
+    and terminals that support 256 colors usually have `256color` in their `TERM`.
+    If `TERM` isn't set at all, we're probably not talking to a real terminal, so we assume 24-bit color.
+    """
+    colorterm = environ.get("COLORTERM", "").lower()
+    term = environ.get("TERM")
+
+    if colorterm in ("truecolor", "24bit") or term is None or term.endswith("-direct"):
+        return "truecolor"
+    elif "256" in term:
+        return "256"
+    else:
+        return "16"
+
+
+# The levels of each channel in the 6x6x6 color cube of the 256-color palette.
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+
+def _distance(a: Color, b: Color) -> int:
+    return (a.red - b.red) ** 2 + (a.green - b.green) ** 2 + (a.blue - b.blue) ** 2
+
+
+def _cube_index(value: int) -> int:
+    return 0 if value < 48 else 1 if value < 115 else (value - 35) // 40
+
+
+@lru_cache(maxsize=2**14)
+def quantize_256(color: Color) -> int:
+    """
+    The index of the color in the 256-color palette that is closest to `color`.
+
+    Only the color cube and the grayscale ramp are considered,
+    since the first 16 colors are often changed by terminal themes.
+    """
+    r, g, b = (_cube_index(c) for c in color)
+    cube = 16 + 36 * r + 6 * g + b
+
+    gray_index = min(max((sum(color) // 3 - 3) // 10, 0), 23)
+    gray = 232 + gray_index
+
+    return cube if _distance(color, PALETTE_256[cube]) <= _distance(color, PALETTE_256[gray]) else gray
+
+
+@lru_cache(maxsize=2**14)
+def quantize_16(color: Color) -> int:
+    """The index of the color in the 16-color palette (at its xterm default values) that is closest to `color`."""
+    return min(range(16), key=lambda index: _distance(color, PALETTE_256[index]))
+
 
-    sgr = f"\x1b[38;2;{fg_r};{fg_g};{fg_b}m\x1b[48;2;{bg_r};{bg_g};{bg_b}m"
+def _foreground(color: Color, depth: ColorDepth) -> str:
+    match depth:
+        case "truecolor":
+            return "38;2;{};{};{}".format(*color)
+        case "256":
+            return f"38;5;{quantize_256(color)}"
+        case "16":
+            index = quantize_16(color)
+            return str(30 + index if index < 8 else 90 + index - 8)
+
+
+def _background(color: Color, depth: ColorDepth) -> str:
+    match depth:
+        case "truecolor":
+            return "48;2;{};{};{}".format(*color)
+        case "256":
+            return f"48;5;{quantize_256(color)}"
+        case "16":
+            index = quantize_16(color)
+            return str(40 + index if index < 8 else 100 + index - 8)
+
+
+def sgr_from_cell_style(style: CellStyle, color_depth: ColorDepth = "truecolor") -> str:
+    key = (style.id, color_depth)
+    try:
+        return _SGR_BY_ID[key]
+    except KeyError:
+        if len(_SGR_BY_ID) >= _MAX_CACHED_SGRS:
+            _SGR_BY_ID.clear()
+        sgr = _SGR_BY_ID[key] = _sgr_from_cell_style(style, color_depth)
+        return sgr
+
+
+# The full SGR string for each style (by id) at each color depth,
+# and the SGR string for each transition between two styles (by id) at each color depth.
+# These are plain dicts rather than lru_caches, since they are keyed by ids but computed from the styles themselves.
+# Applications that generate styles (e.g., a gradient on a canvas) create new ids all the time,
+# so the caches are emptied whenever they fill up, rather than growing without limit.
+_SGR_BY_ID: dict[tuple[int, ColorDepth], str] = {}
+_SGR_DELTA_BY_IDS: dict[tuple[int, int, ColorDepth], str] = {}
+_MAX_CACHED_SGRS = 2**14
+
+
+def _sgr_from_cell_style(style: CellStyle, color_depth: ColorDepth) -> str:
+    sgr = f"\x1b[{_foreground(style.foreground, color_depth)}m\x1b[{_background(style.background, color_depth)}m"
 
     if style.bold:
         sgr += "\x1b[1m"
@@ -86,8 +190,105 @@ def sgr_from_cell_style(style: CellStyle) -> str:
     return sgr
 
 
-def paint_to_instructions(paint: Paint) -> str:
-    return "".join(f"{move_to(pos)}{sgr_from_cell_style(cell.style)}{cell.char}\x1b[0m" for pos, cell in paint.items())
+def sgr_delta(old: CellStyle, new: CellStyle, color_depth: ColorDepth = "truecolor") -> str:
+    """
+    The SGR string that changes the terminal from the `old` style to the `new` one,
+    setting only the attributes that differ.
+    """
+    key = (old.id, new.id, color_depth)
+    try:
+        return _SGR_DELTA_BY_IDS[key]
+    except KeyError:
+        if len(_SGR_DELTA_BY_IDS) >= _MAX_CACHED_SGRS:
+            _SGR_DELTA_BY_IDS.clear()
+        sgr = _SGR_DELTA_BY_IDS[key] = _sgr_delta(old, new, color_depth)
+        return sgr
+
+
+def _sgr_delta(old: CellStyle, new: CellStyle, color_depth: ColorDepth) -> str:
+    codes = []
+
+    # Colors are compared after quantization, since different colors may be displayed the same way.
+    foreground = _foreground(new.foreground, color_depth)
+    if foreground != _foreground(old.foreground, color_depth):
+        codes.append(foreground)
+    background = _background(new.background, color_depth)
+    if background != _background(old.background, color_depth):
+        codes.append(background)
+
+    # Bold and dim are both turned off by the same code.
+    if (old.bold and not new.bold) or (old.dim and not new.dim):
+        codes.append("22")
+        if new.bold:
+            codes.append("1")
+        if new.dim:
+            codes.append("2")
+    else:
+        if new.bold and not old.bold:
+            codes.append("1")
+        if new.dim and not old.dim:
+            codes.append("2")
+
+    for attribute, on, off in (("italic", "3", "23"), ("underline", "4", "24"), ("strikethrough", "9", "29")):
+        was, now = getattr(old, attribute), getattr(new, attribute)
+        if now != was:
+            codes.append(on if now else off)
+
+    return f"\x1b[{';'.join(codes)}m" if codes else ""
+
+
+def paint_to_instructions(paint: Paint, color_depth: ColorDepth = "truecolor") -> str:
+    """
+    Render a Paint as the instructions to draw it on the terminal.
+
+    The cursor is only moved when the next cell isn't immediately to the right of the previous one
+    (or when the previous cell's character doesn't move the cursor exactly one column, like a wide character),
+    and only the parts of the style that differ from the previous cell's style are emitted.
+    Control characters (e.g., tabs) are drawn as spaces, since the terminal would act on them instead.
+    """
+    if not paint:
+        return ""
+
+    parts = []
+    x = y = -1
+    style: CellStyle | None = None
+    for pos, cell in paint.items():
+        if pos.y != y or pos.x != x + 1:
+            parts.append(move_to(pos))
+        x, y = pos.x, pos.y
+
+        next_style = cell.style
+        if style is None:
+            parts.append(sgr_from_cell_style(next_style, color_depth))
+        elif next_style.id != style.id:
+            parts.append(sgr_delta(style, next_style, color_depth))
+        style = next_style
+
+        char = cell.char
+        if len(char) != 1 or not " " <= char <= "~":
+            char, single_width = _terminal_char(char)
+            if not single_width:
+                # The cursor didn't land on the next cell, so the next cell must move it there explicitly.
+                x = -2
+        parts.append(char)
+
+    parts.append(RESET)
+
+    return "".join(parts)
+
+
+@lru_cache(maxsize=2**12)
+def _terminal_char(char: str) -> tuple[str, bool]:
+    """The text to write for a (non-ASCII-printable) cell's character, and whether it advances the cursor by one column."""
+    if len(char) != 1:
+        return char, False
+
+    category = unicodedata.category(char)
+    if category.startswith("C"):  # control, format, private use, surrogate, and unassigned characters
+        return (" ", True) if category == "Cc" else (char, category == "Co")
+    if category in ("Mn", "Me") or unicodedata.east_asian_width(char) in ("W", "F"):
+        return char, False
+    return char, True
 
 
 def paint_to_str(paint: Paint, *, ansi: bool = True) -> str:
@@ -109,7 +310,7 @@ def paint_to_str(paint: Paint, *, ansi: bool = True) -> str:
         for x in range(min_x, max_x + 1):
             cell = paint.get(Position(x, y))
             if cell:
-                row += f"{sgr_from_cell_style(cell.style)}{cell.char}\x1b[0m" if ansi else cell.char
+                row += f"{sgr_from_cell_style(cell.style)}{cell.char}{RESET}" if ansi else cell.char
             else:
                 row += " "
         rows.append(row)
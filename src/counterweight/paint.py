@@ -1,21 +1,23 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from functools import lru_cache
-from itertools import groupby, islice
-from textwrap import dedent
-from typing import Literal, assert_never
+from itertools import islice
+from typing import Literal, TextIO, assert_never
 from xml.etree.ElementTree import Element, ElementTree, SubElement
+from xml.sax.saxutils import escape as xml_escape
 
 import waxy
 from structlog import get_logger
 
+from counterweight._canvas import CELL_SIZES, GLYPHS, SubCellMode, pack
 from counterweight._utils import flyweight, halve_integer
-from counterweight.elements import AnyElement, CellPaint, Div, Text
+from counterweight.elements import AnyElement, Canvas, Div, LogView, StyledText, Table, Text, TextArea, _styled_text
 from counterweight.geometry import Position
-from counterweight.layout import ResolvedLayout, wrap_cells
+from counterweight.layout import WRAP_CACHE, Line, ResolvedLayout
 from counterweight.styles.styles import (
+    _DEFAULT_CELL_STYLE,
     CellStyle,
     Color,
     JoinedBorderKind,
@@ -102,6 +104,14 @@ def paint_element(element: AnyElement, resolved: ResolvedLayout) -> tuple[Paint,
             paint = box
         case Text() as e:
             paint = box | paint_text(e, resolved.content)
+        case Canvas() as e:
+            paint = box | paint_canvas(e, resolved.content)
+        case LogView() as e:
+            paint = box | paint_log_view(e, resolved.content)
+        case TextArea() as e:
+            paint = box | paint_text_area(e, resolved.content)
+        case Table() as e:
+            paint = box | paint_table(e, resolved.content)
         case _:
             assert_never(element)
 
@@ -113,24 +123,24 @@ def paint_element(element: AnyElement, resolved: ResolvedLayout) -> tuple[Paint,
     )
 
 
-def justify_line(line: list[CellPaint], width: int, justify: Literal["left", "right", "center"]) -> list[CellPaint]:
-    space = width - len(line)
+def justify_offset(length: int, width: int, justify: Literal["left", "right", "center"]) -> int:
+    """The number of blank cells to put before a line of `length` cells to justify it within `width` cells."""
+    space = width - length
     if space <= 0:
-        return line
+        return 0
     elif justify == "left":
-        return line + [CellPaint(char=" ")] * space
+        return 0
     elif justify == "right":
-        return [CellPaint(char=" ")] * space + line
+        return space
     elif justify == "center":
-        left, right = halve_integer(space)
-        return [CellPaint(char=" ")] * left + line + [CellPaint(char=" ")] * right
+        return halve_integer(space)[0]
     else:
         assert_never(justify)
 
 
 @lru_cache(maxsize=2**10)
 def _paint_text(
-    cells: tuple[CellPaint, ...],
+    styled: StyledText,
     wrap: TextWrap,
     justify: Literal["left", "right", "center"],
     text_style: CellStyle,
@@ -141,36 +151,281 @@ def _paint_text(
     # number of cells).  Adding 1 converts to cell count for slicing and iteration.
     width = int(rect.width) + 1
     height = int(rect.height) + 1
+    left = int(rect.left)
 
-    paint = {}
-    lines = wrap_cells(cells=cells, wrap=wrap, width=width)
+    paint: Paint = {}
+    # Only the lines that fit in the rect are visible, so there is no need to wrap any further than that.
+    lines = WRAP_CACHE.wrap(styled.text, wrap, width, limit=height)
 
-    previous_cell_style = None
+    # Justification fills the rest of each line with unstyled spaces.
+    blank = P(char=" ", style=text_style | _DEFAULT_CELL_STYLE, z=z)
 
-    for y, line in enumerate(lines[:height], start=int(rect.top)):
-        justified_line = justify_line(line, width, justify)
-        for x, cell in enumerate(justified_line[:width], start=int(rect.left)):
-            cell_style = cell.style
+    for y, line in enumerate(lines, start=int(rect.top)):
+        _paint_line(paint, styled, line, left, y, width, justify, text_style, blank, z)
 
-            if cell_style is not previous_cell_style:
-                merged_style = text_style | cell_style
-                previous_cell_style = cell_style
+    return paint
 
-            paint[Position(x, y)] = P(
-                char=cell.char,
-                style=merged_style,  # merged_style will never be unassigned here, since we know previous_cell_style starts as None
-                z=z,
-            )
 
-    return paint
+def _paint_line(
+    paint: Paint,
+    styled: StyledText,
+    line: Line,
+    left: int,
+    y: int,
+    width: int,
+    justify: Literal["left", "right", "center"],
+    text_style: CellStyle,
+    blank: P,
+    z: int,
+) -> None:
+    right = left + width
+
+    x = left
+    for _ in range(justify_offset(line.length, width, justify)):
+        paint[Position(x, y)] = blank
+        x += 1
+
+    merged_style = text_style
+    for chunk, cell_style in styled.runs(line.start, line.end):
+        merged_style = text_style | cell_style
+        for char in chunk[: right - x]:
+            paint[Position(x, y)] = P(char=char, style=merged_style, z=z)
+            x += 1
+
+    if line.hyphen and x < right:
+        paint[Position(x, y)] = P(char="-", style=merged_style, z=z)
+        x += 1
+
+    while x < right:
+        paint[Position(x, y)] = blank
+        x += 1
 
 
 def paint_text(text: Text, rect: waxy.Rect) -> Paint:
     return _paint_text(
-        text.cells, text.style.text_wrap, text.style.text_justify, text.style.text_style, text.style.z, rect
+        text.styled, text.style.text_wrap, text.style.text_justify, text.style.text_style, text.style.z, rect
     )
 
 
+@lru_cache(maxsize=2**14)
+def _half_block(top: bytes, bottom: bytes, z: int) -> P:
+    return P(char="▀", style=CellStyle(foreground=Color(*top), background=Color(*bottom)), z=z)
+
+
+@lru_cache(maxsize=2**6)
+def _paint_canvas(pixels: bytes, pixel_width: int, pixel_height: int, z: int, rect: waxy.Rect) -> Paint:
+    # Only the part of the canvas that fits inside the rect is painted.
+    width = min(int(rect.width) + 1, pixel_width)
+    height = min(int(rect.height) + 1, pixel_height // 2)
+    left = int(rect.left)
+    top = int(rect.top)
+
+    row_bytes = 3 * pixel_width
+    xs = range(left, left + width)
+    offsets = range(0, 3 * width, 3)
+
+    paint = {}
+    for y in range(height):
+        top_row = pixels[2 * y * row_bytes : (2 * y + 1) * row_bytes]
+        bottom_row = pixels[(2 * y + 1) * row_bytes : (2 * y + 2) * row_bytes]
+        row = top + y
+        for x, offset in zip(xs, offsets):
+            paint[Position(x, row)] = _half_block(top_row[offset : offset + 3], bottom_row[offset : offset + 3], z)
+
+    return paint
+
+
+@lru_cache(maxsize=2**14)
+def _sub_cell(char: str, foreground: bytes, background: Color, z: int) -> P:
+    return P(char=char, style=CellStyle(foreground=Color(*foreground), background=background), z=z)
+
+
+@lru_cache(maxsize=2**6)
+def _paint_sub_cell_canvas(
+    pixels: bytes,
+    pixel_width: int,
+    pixel_height: int,
+    mode: SubCellMode,
+    background: Color,
+    z: int,
+    rect: waxy.Rect,
+) -> Paint:
+    glyphs = GLYPHS[mode]
+    rows = pack(pixels, pixel_width, pixel_height, mode)
+
+    # Only the part of the canvas that fits inside the rect is painted.
+    width = min(int(rect.width) + 1, pixel_width // CELL_SIZES[mode][0])
+    left = int(rect.left)
+    xs = range(left, left + width)
+
+    paint = {}
+    for y, (masks, colors) in enumerate(rows[: int(rect.height) + 1], start=int(rect.top)):
+        for x, mask, offset in zip(xs, masks, range(0, 3 * width, 3)):
+            paint[Position(x, y)] = _sub_cell(glyphs[mask], colors[offset : offset + 3], background, z)
+
+    return paint
+
+
+def paint_canvas(canvas: Canvas, rect: waxy.Rect) -> Paint:
+    if canvas.mode == "half_block":
+        return _paint_canvas(canvas.pixels, canvas.width, canvas.height, canvas.style.z, rect)
+    else:
+        return _paint_sub_cell_canvas(
+            canvas.pixels,
+            canvas.width,
+            canvas.height,
+            canvas.mode,
+            canvas.style.content_color,
+            canvas.style.z,
+            rect,
+        )
+
+
+def paint_log_view(view: LogView, rect: waxy.Rect) -> Paint:
+    width = int(rect.width) + 1
+    height = int(rect.height) + 1
+    left = int(rect.left)
+    style = view.style
+    text_style = style.text_style
+
+    window = view.buffer.window(style.text_wrap, width, height, start=None if view.follow else view.offset)
+
+    paint: Paint = {}
+    blank = P(char=" ", style=text_style | _DEFAULT_CELL_STYLE, z=style.z)
+
+    for y, (styled, line) in enumerate(window, start=int(rect.top)):
+        _paint_line(paint, styled, line, left, y, width, style.text_justify, text_style, blank, style.z)
+
+    return paint
+
+
+@lru_cache(maxsize=2**10)
+def _paint_text_area_row(
+    text: str,
+    line: Line,
+    left: int,
+    y: int,
+    width: int,
+    justify: Literal["left", "right", "center"],
+    text_style: CellStyle,
+    z: int,
+) -> Paint:
+    paint: Paint = {}
+    blank = P(char=" ", style=text_style | _DEFAULT_CELL_STYLE, z=z)
+    _paint_line(paint, _styled_text(text, text_style), line, left, y, width, justify, text_style, blank, z)
+    return paint
+
+
+def paint_text_area(area: TextArea, rect: waxy.Rect) -> Paint:
+    width = int(rect.width) + 1
+    height = int(rect.height) + 1
+    left = int(rect.left)
+    top = int(rect.top)
+    style = area.style
+
+    rows, (cursor_x, cursor_y) = area.buffer.window(style.text_wrap, width, height)
+
+    # Each row is painted on its own (and cached), so an edit only paints the rows whose text or position changed.
+    paint: Paint = {}
+    for y, (text, line) in enumerate(rows, start=top):
+        paint |= _paint_text_area_row(text, line, left, y, width, style.text_justify, style.text_style, style.z)
+
+    if area.cursor and rows:
+        position = Position(left + cursor_x, top + cursor_y)
+        under = paint.get(position)
+        if under is not None:
+            paint[position] = P(
+                char=under.char,
+                style=replace(under.style, foreground=under.style.background, background=under.style.foreground),
+                z=under.z,
+            )
+
+    return paint
+
+
+def table_offset(table: Table, rows: int) -> int:
+    """The position (in the table's order) of the first row to show when `rows` rows fit, keeping `selected` in view."""
+    offset = table.offset
+    if table.selected is not None:
+        offset = min(max(offset, table.selected - rows + 1), table.selected)
+    return max(min(offset, table.row_count - rows), 0)
+
+
+def _paint_cell(
+    paint: Paint,
+    text: str,
+    left: int,
+    y: int,
+    width: int,
+    justify: Literal["left", "right", "center"],
+    style: CellStyle,
+    z: int,
+) -> None:
+    if len(text) > width:
+        text = text[: width - 1] + "…" if width > 0 else ""
+    x = left + justify_offset(len(text), width, justify)
+    for char in text:
+        paint[Position(x, y)] = P(char=char, style=style, z=z)
+        x += 1
+
+
+def paint_table(table: Table, rect: waxy.Rect) -> Paint:
+    width = int(rect.width) + 1
+    height = int(rect.height) + 1
+    left = int(rect.left)
+    top = int(rect.top)
+    style = table.style
+    z = style.z
+    text_style = style.text_style | _DEFAULT_CELL_STYLE
+    header_style = text_style | table.header_style
+    selected_style = text_style | table.selected_style
+
+    columns = table.columns
+    widths = table.widths
+    lefts = []
+    x = left
+    for column_width in widths:
+        lefts.append(x)
+        x += column_width + table.gap
+
+    paint: Paint = {}
+    blank = P(char=" ", style=text_style, z=z)
+    for y in range(top, top + height):
+        for x in range(left, left + width):
+            paint[Position(x, y)] = blank
+
+    # Cells are clipped to the table's width, since they are painted without going through the layout.
+    right = left + width
+    clipped = [
+        (idx, column, x, min(w, right - x))
+        for idx, (column, x, w) in enumerate(zip(columns, lefts, widths))
+        if x < right
+    ]
+
+    for idx, column, x, w in clipped:
+        _paint_cell(paint, column.header, x, top, w, column.justify, header_style | column.style, z)
+
+    # Only the rows that are visible are formatted and painted.
+    rows = height - 1
+    offset = table_offset(table, rows)
+    positions = range(offset, min(offset + rows, table.row_count))
+    order = table.order
+    source = table.source
+    for y, position in enumerate(positions, start=top + 1):
+        row = order[position] if order is not None else position
+        row_style = selected_style if position == table.selected else text_style
+        if position == table.selected:
+            selected_blank = P(char=" ", style=row_style, z=z)
+            for x in range(left, right):
+                paint[Position(x, y)] = selected_blank
+        for idx, column, x, w in clipped:
+            _paint_cell(
+                paint, column.format(source.cell(row, idx)), x, y, w, column.justify, row_style | column.style, z
+            )
+
+    return paint
+
+
 def paint_border(style: Style, resolved: ResolvedLayout) -> tuple[Paint, BorderHealingHints]:
     bk = style.border_kind
     if bk is None:
@@ -246,116 +501,304 @@ def paint_border(style: Style, resolved: ResolvedLayout) -> tuple[Paint, BorderH
     return chars, bhh
 
 
-def svg(paint: Paint) -> ElementTree:
-    max_pos = max(paint.keys())
-    w, h = max_pos.x, max_pos.y
+_SVG_X_MUL = 0.55  # x coordinates get cut roughly in half because monospace cells are twice as tall as they are wide
+_SVG_Y_MUL = 1.13  # seems to make border connect up just right
+
+_SVG_BLACK = Color.from_name("black")
+_SVG_WHITE = Color.from_name("white")
+
+_SVG_CSS = f"""\
+svg {{
+  dominant-baseline: hanging;
+  font-size: 1rem;
+}}
+text {{
+  font-family: monospace;
+  fill: {_SVG_WHITE.hex};
+}}
+"""
+
+
+def _svg_x(x: int) -> str:
+    return f"{x * _SVG_X_MUL:0.2f}em"
+
 
+def _svg_y(y: int) -> str:
+    return f"{y * _SVG_Y_MUL:0.2f}em"
+
+
+type _TextKey = tuple[Color, bool, bool, bool, bool]
+
+
+def _text_key(style: CellStyle) -> _TextKey:
+    return style.foreground, style.bold, style.italic, style.underline, style.strikethrough
+
+
+def _text_css(key: _TextKey) -> str:
+    foreground, bold, italic, underline, strikethrough = key
+    declarations = [f"fill: {foreground.hex}"]
+    if bold:
+        declarations.append("font-weight: bold")
+    if italic:
+        declarations.append("font-style: italic")
+    if underline or strikethrough:
+        declarations.append(
+            "text-decoration: "
+            + " ".join(d for d, on in (("underline", underline), ("line-through", strikethrough)) if on)
+        )
+    return "; ".join(declarations)
+
+
+_PLAIN_TEXT = _text_key(_DEFAULT_CELL_STYLE)
+
+
+@dataclass(slots=True)
+class _SvgRect:
+    x: int
+    y: int
+    width: int
+    height: int
+    color: Color
+
+
+@dataclass(slots=True)
+class _SvgLayout:
+    width: int
+    height: int
+    # The background rectangles that aren't black.
+    rects: list[_SvgRect]
+    # (x, y, text, key) of each run of text.
+    runs: list[tuple[int, int, str, _TextKey]]
+    # The CSS class of each background color and (non-default) text style.
+    background_classes: dict[Color, str]
+    text_classes: dict[_TextKey, str]
+
+
+def _svg_layout(paint: Paint) -> _SvgLayout:
+    """
+    Reduce a paint to the shapes of its SVG representation:
+    rectangles of the same background color, merged along rows and then across rows,
+    and runs of text in the same style along each row.
+    """
+    max_pos = max(paint.keys())
     # Measurements start from the top-left corner of each cell, so the width/height need be 1 unit larger for the actual content
-    w += 1
-    h += 1
+    layout = _SvgLayout(
+        width=max_pos.x + 1,
+        height=max_pos.y + 1,
+        rects=[],
+        runs=[],
+        background_classes={},
+        text_classes={},
+    )
+
+    rows: defaultdict[int, list[tuple[int, P]]] = defaultdict(list)
+    for pos, cell in paint.items():
+        rows[pos.y].append((pos.x, cell))
+
+    # The rectangles that reached the bottom of the previous row, by (x, width, color).
+    open_rects: dict[tuple[int, int, Color], _SvgRect] = {}
+
+    for y in sorted(rows):
+        cells = rows[y]
+        cells.sort(key=lambda x_cell: x_cell[0])
+
+        # Spans of the same background color along the row.
+        spans: list[tuple[int, int, Color]] = []
+        span_start, span_end, span_color = -1, -1, _SVG_BLACK
+
+        # The current run of text; spaces that might continue it are held back until the next character.
+        run_start, run_end, run_key = -1, -1, _PLAIN_TEXT
+        run_chars: list[str] = []
+        spaces = 0
+
+        for x, cell in cells:
+            style = cell.style
+
+            if x != span_end or style.background != span_color:
+                if span_end > span_start:
+                    spans.append((span_start, span_end, span_color))
+                span_start, span_color = x, style.background
+            span_end = x + 1
+
+            if x != run_end + spaces:
+                spaces = 0
+                if run_chars:
+                    layout.runs.append((run_start, y, "".join(run_chars), run_key))
+                    run_chars = []
+
+            char = cell.char
+            key = _text_key(style)
+            if char == " " and not (key[3] or key[4]):
+                # Undecorated spaces look the same in any style, so they can join any undecorated run.
+                if run_chars and not (run_key[3] or run_key[4]):
+                    spaces += 1
+                elif run_chars:
+                    layout.runs.append((run_start, y, "".join(run_chars), run_key))
+                    run_chars = []
+                continue
+
+            if run_chars and key == run_key:
+                run_chars.append(" " * spaces)
+                run_chars.append(char)
+            else:
+                if run_chars:
+                    layout.runs.append((run_start, y, "".join(run_chars), run_key))
+                run_start, run_key, run_chars = x, key, [char]
+                if key != _PLAIN_TEXT and key not in layout.text_classes:
+                    layout.text_classes[key] = f"t{len(layout.text_classes)}"
+            run_end = x + 1
+            spaces = 0
+
+        if span_end > span_start:
+            spans.append((span_start, span_end, span_color))
+        if run_chars:
+            layout.runs.append((run_start, y, "".join(run_chars), run_key))
+
+        next_open_rects: dict[tuple[int, int, Color], _SvgRect] = {}
+        for start, end, color in spans:
+            if color == _SVG_BLACK:
+                # The whole background is already black.
+                continue
+            span_key = (start, end - start, color)
+            if (rect := open_rects.get(span_key)) is not None and rect.y + rect.height == y:
+                rect.height += 1
+            else:
+                rect = _SvgRect(x=start, y=y, width=end - start, height=1, color=color)
+                layout.rects.append(rect)
+                if color not in layout.background_classes:
+                    layout.background_classes[color] = f"b{len(layout.background_classes)}"
+            next_open_rects[span_key] = rect
+        open_rects = next_open_rects
+
+    return layout
+
+
+def _svg_css(layout: _SvgLayout) -> str:
+    return (
+        _SVG_CSS
+        + "".join(f".{name} {{ fill: {color.hex}; }}\n" for color, name in layout.background_classes.items())
+        + "".join(f".{name} {{ {_text_css(key)}; }}\n" for key, name in layout.text_classes.items())
+    )
+
+
+def _svg_rect_attributes(layout: _SvgLayout, rect: _SvgRect) -> dict[str, str]:
+    return {
+        "class": layout.background_classes[rect.color],
+        "x": _svg_x(rect.x),
+        "y": _svg_y(rect.y),
+        "width": _svg_x(rect.width),
+        "height": _svg_y(rect.height),
+    }
+
+
+def _svg_run_attributes(layout: _SvgLayout, x: int, y: int, text: str, key: _TextKey) -> dict[str, str]:
+    attributes = {"x": _svg_x(x), "y": _svg_y(y), "textLength": _svg_x(len(text))}
+    if key != _PLAIN_TEXT:
+        attributes["class"] = layout.text_classes[key]
+    return attributes
+
 
-    x_mul = 0.55  # x coordinates get cut roughly in half because monospace cells are twice as tall as they are wide
-    y_mul = 1.13  # seems to make border connect up just right
+def svg(paint: Paint) -> ElementTree:
+    """
+    Returns:
+        An SVG representation of the paint, as an XML tree.
 
-    fmt = "0.2f"
-    unit = "em"
+        To write a screenshot to a file, prefer [`write_svg`][counterweight.paint.write_svg],
+        which never builds the tree.
+    """
+    layout = _svg_layout(paint)
 
     root = Element(
         "svg",
         {
             "xmlns": "http://www.w3.org/2000/svg",
-            "width": f"{w * x_mul:{fmt}}{unit}",
-            "height": f"{h * y_mul:{fmt}}{unit}",
+            "width": _svg_x(layout.width),
+            "height": _svg_y(layout.height),
         },
     )
 
-    style = SubElement(
-        root,
-        "style",
-        {},
-    )
-    style.text = dedent(
-        """\
-        svg {
-          dominant-baseline: hanging;
-          font-size: 1rem;
-        }
-        """
-    )
+    style = SubElement(root, "style", {})
+    style.text = _svg_css(layout)
 
-    background_root = SubElement(
-        root,
-        "g",
-        {
-            "shape-rendering": "crispEdges",
-        },
-    )
-    SubElement(  # default background color is black, so do a single black rectangle to cover the whole background as an optimization
+    background_root = SubElement(root, "g", {"shape-rendering": "crispEdges"})
+    # The default background color is black, so a single black rectangle covers most of the background.
+    SubElement(
         background_root,
         "rect",
         {
-            "x": f"{0 * x_mul:{fmt}}{unit}",
-            "y": f"{0 * y_mul:{fmt}}{unit}",
-            "width": f"{w * x_mul:{fmt}}{unit}",
-            "height": f"{h * y_mul:{fmt}}{unit}",
-            "fill": Color.from_name("black").hex,
+            "x": _svg_x(0),
+            "y": _svg_y(0),
+            "width": _svg_x(layout.width),
+            "height": _svg_y(layout.height),
+            "fill": _SVG_BLACK.hex,
         },
     )
+    for rect in layout.rects:
+        SubElement(background_root, "rect", _svg_rect_attributes(layout, rect))
 
-    text_root = SubElement(
-        root,
-        "text",
-        {
-            "fill": Color.from_name("white").hex,
-            "font-family": "monospace",
-        },
-    )
+    text_root = SubElement(root, "text", {"xml:space": "preserve"})
+    for x, y, text, key in layout.runs:
+        SubElement(text_root, "tspan", _svg_run_attributes(layout, x, y, text, key)).text = text
 
-    rows = defaultdict(list)
-    for pos, cell in sorted(paint.items()):
-        rows[pos.y].append((pos.x, cell))
+    return ElementTree(element=root)
 
-    for y, cells in sorted(rows.items()):
-        row_tspan_root = SubElement(
-            text_root,
-            "tspan",
-            {
-                "y": f"{y * y_mul:{fmt}}{unit}",
-            },
-        )
 
-        for bg_color, x_cells_group in groupby(cells, key=lambda x_cell: x_cell[1].style.background.hex):
-            # Optimization: write out long horizontal rectangles of the same background color as rectangles instead of individual cell-sized rectangles
-            x_cells = tuple(x_cells_group)
-            first_x, _first_cell = x_cells[0]
-
-            SubElement(
-                background_root,
-                "rect",
-                {
-                    "x": f"{first_x * x_mul:{fmt}}{unit}",
-                    "y": f"{y * y_mul:{fmt}}{unit}",
-                    "width": f"{len(x_cells) * x_mul:{fmt}}{unit}",
-                    "height": f"{1 * y_mul:{fmt}}{unit}",
-                    "fill": bg_color,
-                },
-            )
+def _svg_tag(name: str, attributes: dict[str, str]) -> str:
+    return f"<{name}" + "".join(f' {k}="{v}"' for k, v in attributes.items())
 
-            for x, cell in x_cells:
-                if cell.char == " ":  # optimization: don't write spaces
-                    continue
 
-                ts = SubElement(
-                    row_tspan_root,
-                    "tspan",
-                    {
-                        "x": f"{x * x_mul:{fmt}}{unit}",
-                    },
-                )
+def write_svg(paint: Paint, file: TextIO, indent: int | None = None) -> None:
+    """
+    Write an SVG representation of the paint (the same as [`svg`][counterweight.paint.svg]'s) to a text file,
+    streaming it out line by line rather than building an XML tree first.
 
-                # optimization: don't write white, it's the default
-                if cell.style.foreground != Color.from_name("white"):
-                    ts.attrib["fill"] = cell.style.foreground.hex
-                ts.text = cell.char
+    Parameters:
+        paint: The paint to write.
+        file: The file to write to.
+        indent: The number of spaces to indent nested elements by (for readability).
+            If `None`, elements are not indented.
+    """
+    layout = _svg_layout(paint)
+    pad = " " * (indent or 0)
 
-    return ElementTree(element=root)
+    write = file.write
+    write(
+        _svg_tag(
+            "svg",
+            {
+                "xmlns": "http://www.w3.org/2000/svg",
+                "width": _svg_x(layout.width),
+                "height": _svg_y(layout.height),
+            },
+        )
+        + ">\n"
+    )
+    write(f"{pad}<style>{xml_escape(_svg_css(layout))}</style>\n")
+
+    write(f'{pad}<g shape-rendering="crispEdges">\n')
+    write(
+        f"{pad}{pad}"
+        + _svg_tag(
+            "rect",
+            {
+                "x": _svg_x(0),
+                "y": _svg_y(0),
+                "width": _svg_x(layout.width),
+                "height": _svg_y(layout.height),
+                "fill": _SVG_BLACK.hex,
+            },
+        )
+        + " />\n"
+    )
+    for rect in layout.rects:
+        write(f"{pad}{pad}{_svg_tag('rect', _svg_rect_attributes(layout, rect))} />\n")
+    write(f"{pad}</g>\n")
+
+    write(f'{pad}<text xml:space="preserve">\n')
+    for x, y, text, key in layout.runs:
+        write(
+            f"{pad}{pad}{_svg_tag('tspan', _svg_run_attributes(layout, x, y, text, key))}>{xml_escape(text)}</tspan>\n"
+        )
+    write(f"{pad}</text>\n")
+
+    write("</svg>\n")
@@ -0,0 +1,327 @@
+"""
+Recording what an application does, for replaying it later.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from queue import SimpleQueue
+from statistics import quantiles
+from threading import Thread
+from time import perf_counter, time
+from typing import BinaryIO
+
+from counterweight.controls import AnyControl, Quit, Wait
+from counterweight.events import (
+    AnyEvent,
+    KeyPressed,
+    MouseDown,
+    MouseMoved,
+    MouseScrolledDown,
+    MouseScrolledUp,
+    MouseUp,
+    TerminalResized,
+)
+from counterweight.geometry import Position
+
+_ASCIICAST_ENV_VARS = ("TERM", "SHELL")
+
+
+class _JsonLinesRecorder:
+    """
+    A recording made of a JSON header line followed by one JSON line per event.
+
+    The events are serialized on the render loop, which is cheap,
+    and written to the file by a background thread, so that recording never blocks the render loop on the file.
+    """
+
+    __slots__ = ("_queue", "_start", "_thread", "path")
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+
+        self._queue: SimpleQueue[bytes | None] = SimpleQueue()
+        self._start: float | None = None
+        self._thread: Thread | None = None
+
+    @property
+    def recording(self) -> bool:
+        return self._thread is not None
+
+    def _begin(self, header: dict[str, object]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._start = perf_counter()
+        self._thread = Thread(target=self._write, args=(self.path.open("wb"),), name=f"record {self.path}", daemon=True)
+        self._thread.start()
+        self._put(header)
+
+    def _elapsed(self) -> float:
+        return perf_counter() - self._start if self._start is not None else 0.0
+
+    def _put(self, line: object) -> None:
+        self._queue.put((json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n").encode())
+
+    def close(self) -> None:
+        """Stop recording, and wait for the rest of the recording to be written."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _write(self, f: BinaryIO) -> None:
+        queue = self._queue
+        with f:
+            while (chunk := queue.get()) is not None:
+                f.write(chunk)
+
+                # Write whatever else is already waiting before flushing,
+                # so that a burst of events costs one flush rather than one per event.
+                if queue.empty():
+                    f.flush()
+
+
+class AsciicastRecorder(_JsonLinesRecorder):
+    """
+    Records the output of an application to a file in the
+    [asciicast v2 format](https://docs.asciinema.org/manual/asciicast/v2/),
+    which can be played back with `asciinema play` or the asciinema web player.
+
+    Pass a recorder to [`app`][counterweight.app.app] to record every frame that it draws
+    (and every time the terminal is resized).
+    The frames are written to the file by a background thread, so recording never waits on the file.
+
+    Parameters:
+        path: The path to write the recording to.
+            Parent directories will be created if they do not exist.
+        title: The title of the recording.
+        frame_markers: If `True`, each frame is followed by a marker event labelled with the number of bytes in the frame,
+            so that the size of each frame can be read back from the recording
+            (players show markers as navigation points).
+    """
+
+    __slots__ = ("frame_markers", "title")
+
+    def __init__(self, path: Path | str, title: str | None = None, frame_markers: bool = True) -> None:
+        super().__init__(path)
+        self.title = title
+        self.frame_markers = frame_markers
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Record that the terminal has been resized.
+        The first call starts the recording, with a terminal of the given size.
+        """
+        if self._thread is None:
+            header: dict[str, object] = {
+                "version": 2,
+                "width": width,
+                "height": height,
+                "timestamp": int(time()),
+                "env": {var: value for var in _ASCIICAST_ENV_VARS if (value := os.environ.get(var)) is not None},
+            }
+            if self.title is not None:
+                header["title"] = self.title
+            self._begin(header)
+        else:
+            self._put((self._elapsed(), "r", f"{width}x{height}"))
+
+    def output(self, data: str) -> None:
+        """Record a frame of output (i.e., everything the application wrote to the terminal at once)."""
+        if self._thread is None or not data:
+            return
+
+        elapsed = self._elapsed()
+        self._put((elapsed, "o", data))
+        if self.frame_markers:
+            self._put((elapsed, "m", f"{len(data.encode())} bytes"))
+
+
+type RecordedEvent = (
+    KeyPressed | MouseMoved | MouseDown | MouseUp | MouseScrolledDown | MouseScrolledUp | TerminalResized
+)
+
+
+def _encode_event(event: RecordedEvent) -> list[object]:
+    match event:
+        case KeyPressed(key=key):
+            return ["k", key]
+        case MouseMoved(absolute=p, button=button):
+            return ["mm", p.x, p.y, button]
+        case MouseDown(absolute=p, button=button):
+            return ["md", p.x, p.y, button]
+        case MouseUp(absolute=p, button=button):
+            return ["mu", p.x, p.y, button]
+        case MouseScrolledDown(absolute=p):
+            return ["sd", p.x, p.y]
+        case MouseScrolledUp(absolute=p):
+            return ["su", p.x, p.y]
+        case TerminalResized(dimensions=(width, height)):
+            return ["r", width, height]
+        case _:
+            raise ValueError(f"Can't record {event!r}")
+
+
+def _decode_event(fields: Sequence[object]) -> RecordedEvent:
+    match fields:
+        case ["k", str(key)]:
+            return KeyPressed(key=key)
+        case ["mm", int(x), int(y), int() | None as button]:
+            return MouseMoved(absolute=Position(x, y), button=button)
+        case ["md", int(x), int(y), int(button)]:
+            return MouseDown(absolute=Position(x, y), button=button)
+        case ["mu", int(x), int(y), int(button)]:
+            return MouseUp(absolute=Position(x, y), button=button)
+        case ["sd", int(x), int(y)]:
+            return MouseScrolledDown(absolute=Position(x, y))
+        case ["su", int(x), int(y)]:
+            return MouseScrolledUp(absolute=Position(x, y))
+        case ["r", int(width), int(height)]:
+            return TerminalResized(dimensions=(width, height))
+        case _:
+            raise ValueError(f"Not a recorded event: {fields!r}")
+
+
+class InputRecorder(_JsonLinesRecorder):
+    """
+    Records the input events that an application receives (key presses, mouse events, and terminal resizes),
+    along with the time between them, to a compact file that can be loaded as an
+    [`InputRecording`][counterweight.recording.InputRecording] and replayed.
+
+    Pass a recorder to [`app`][counterweight.app.app] to record a session,
+    e.g. to reproduce a user-reported slowdown exactly.
+    Like the [`AsciicastRecorder`][counterweight.recording.AsciicastRecorder],
+    the events are written to the file by a background thread.
+
+    Parameters:
+        path: The path to write the recording to.
+            Parent directories will be created if they do not exist.
+    """
+
+    __slots__ = ("_last",)
+
+    def __init__(self, path: Path | str) -> None:
+        super().__init__(path)
+        self._last = 0.0
+
+    def _gap(self) -> float:
+        elapsed = self._elapsed()
+        gap, self._last = elapsed - self._last, elapsed
+        return round(gap, 4)
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Record that the terminal has been resized.
+        The first call starts the recording, with a terminal of the given size.
+        """
+        if self._thread is None:
+            self._begin({"version": 1, "width": width, "height": height})
+            self._last = 0.0
+        else:
+            self.record(TerminalResized(dimensions=(width, height)))
+
+    def record(self, event: RecordedEvent) -> None:
+        """Record an input event. Terminal resizes must have their `dimensions` set."""
+        if self._thread is None:
+            return
+
+        self._put([self._gap(), *_encode_event(event)])
+
+
+@dataclass(frozen=True, slots=True)
+class InputRecording:
+    """A recording of the input events that an application received, made by an `InputRecorder`."""
+
+    width: int
+    height: int
+    events: tuple[tuple[float, RecordedEvent], ...]
+    """Each event, along with the time (in seconds) since the previous event."""
+
+    @classmethod
+    def load(cls, path: Path | str) -> InputRecording:
+        with Path(path).open(encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != 1:
+                raise ValueError(f"Unsupported input recording version: {header.get('version')!r}")
+
+            events = []
+            for line in f:
+                gap, *fields = json.loads(line)
+                events.append((float(gap), _decode_event(fields)))
+
+        return cls(width=header["width"], height=header["height"], events=tuple(events))
+
+    def autopilot(self, realtime: bool = True) -> Iterator[AnyEvent | AnyControl]:
+        """
+        Yield the recorded events as an autopilot for [`app`][counterweight.app.app], followed by a `Quit`.
+
+        Parameters:
+            realtime: If `True`, each event is preceded by a [`Wait`][counterweight.controls.Wait]
+                for the time between it and the previous event, so that timers, animations, and effects
+                run between events just as they did in the recorded session.
+                If `False`, the events are fed to the application as fast as it can handle them.
+        """
+        for gap, event in self.events:
+            if realtime and gap > 0:
+                yield Wait(seconds=gap)
+            yield event
+        yield Quit()
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseStats:
+    count: int
+    total_ns: int
+    mean_ns: float
+    p50_ns: float
+    p95_ns: float
+    max_ns: int
+
+
+class PhaseTimings:
+    """
+    Collects how long each phase of each render cycle took (updating the shadow tree, layout, painting, ...),
+    when passed to [`app`][counterweight.app.app].
+    """
+
+    __slots__ = ("frames",)
+
+    def __init__(self) -> None:
+        self.frames: list[dict[str, int]] = []
+        """The duration (in nanoseconds) of each phase of each frame, in the order the phases ran."""
+
+    def add_frame(self, phases: dict[str, int]) -> None:
+        self.frames.append(phases)
+
+    def summary(self) -> dict[str, PhaseStats]:
+        """Statistics for each phase, over every frame that ran it."""
+        by_phase: dict[str, list[int]] = {}
+        for frame in self.frames:
+            for phase, ns in frame.items():
+                by_phase.setdefault(phase, []).append(ns)
+
+        summary = {}
+        for phase, durations in by_phase.items():
+            percentiles = quantiles(durations, n=20, method="inclusive") if len(durations) > 1 else [durations[0]] * 19
+            summary[phase] = PhaseStats(
+                count=len(durations),
+                total_ns=sum(durations),
+                mean_ns=sum(durations) / len(durations),
+                p50_ns=percentiles[9],
+                p95_ns=percentiles[18],
+                max_ns=max(durations),
+            )
+        return summary
+
+    def report(self) -> str:
+        """A table of the `summary`, in milliseconds."""
+        lines = [f"{'phase':<14}{'count':>7}{'total':>11}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}"]
+        for phase, s in self.summary().items():
+            lines.append(
+                f"{phase:<14}{s.count:>7}{s.total_ns / 1e6:>11.3f}{s.mean_ns / 1e6:>10.3f}"
+                f"{s.p50_ns / 1e6:>10.3f}{s.p95_ns / 1e6:>10.3f}{s.max_ns / 1e6:>10.3f}"
+            )
+        return "\n".join(lines)
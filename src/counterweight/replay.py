@@ -0,0 +1,45 @@
+"""
+Replaying recorded input sessions against an application.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from counterweight.app import app
+from counterweight.clock import VirtualClock
+from counterweight.components import Component
+from counterweight.recording import InputRecording, PhaseTimings
+
+
+async def replay(
+    root: Callable[[], Component],
+    recording: InputRecording,
+    realtime: bool = True,
+    clock: VirtualClock | None = None,
+) -> PhaseTimings:
+    """
+    Replay a recorded session against an application, headlessly, and time each phase of each render cycle.
+
+    Parameters:
+        root: The root component of the application.
+        recording: The recording to replay.
+        realtime: Whether to replay the events with their recorded timing
+            (see [`InputRecording.autopilot`][counterweight.recording.InputRecording.autopilot]).
+        clock: If given, the replay runs on this [`VirtualClock`][counterweight.clock.VirtualClock],
+            so that the recorded time between events is skipped over rather than waited out
+            (while timers in the application still fire in the same order relative to the events).
+
+    Returns:
+        The timings of every render cycle during the replay.
+    """
+    timings = PhaseTimings()
+    await app(
+        root,
+        headless=True,
+        dimensions=(recording.width, recording.height),
+        autopilot=recording.autopilot(realtime=realtime),
+        timings=timings,
+        clock=clock,
+    )
+    return timings
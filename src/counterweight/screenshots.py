@@ -0,0 +1,106 @@
+"""
+Rendering many headless applications (e.g., to generate documentation screenshots) in parallel.
+"""
+
+from __future__ import annotations
+
+import runpy
+from asyncio import run
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib import import_module
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+
+from counterweight.app import app
+from counterweight.components import Component
+from counterweight.controls import AnyControl
+from counterweight.events import AnyEvent
+
+
+@dataclass(frozen=True, slots=True)
+class ScreenshotJob:
+    """
+    A headless run of an application, whose `autopilot` takes the screenshots
+    (e.g., with [`Screenshot.to_file`][counterweight.controls.Screenshot.to_file]) and then quits.
+
+    Jobs are sent to other processes, so they must be picklable:
+    `root` must be a module-level component (or a `"module:attribute"` or `"path/to/file.py:attribute"` reference to one),
+    and the autopilot's screenshot handlers must be module-level functions (or partials of them).
+    """
+
+    root: Callable[[], Component] | str
+    dimensions: tuple[int, int]
+    autopilot: Sequence[AnyEvent | AnyControl]
+
+
+def resolve_root(root: Callable[[], Component] | str) -> Callable[[], Component]:
+    """
+    Parameters:
+        root: A root component, or a `"module:attribute"` or `"path/to/file.py:attribute"` reference to one.
+
+    Returns:
+        The root component, imported (or run, for a path) if `root` is a reference.
+    """
+    if not isinstance(root, str):
+        return root
+
+    location, _, attribute = root.rpartition(":")
+    if location.endswith(".py"):
+        namespace = runpy.run_path(location)
+        resolved: Callable[[], Component] = namespace[attribute]
+        return resolved
+    else:
+        resolved = getattr(import_module(location), attribute)
+        return resolved
+
+
+def _render(job: ScreenshotJob) -> float:
+    start = perf_counter()
+    run(app(resolve_root(job.root), headless=True, dimensions=job.dimensions, autopilot=job.autopilot))
+    return perf_counter() - start
+
+
+def _run_script(path: Path) -> float:
+    start = perf_counter()
+    runpy.run_path(str(path), run_name="__main__")
+    return perf_counter() - start
+
+
+def _run_in_pool[T](fn: Callable[[T], float], items: Iterable[T], processes: int | None) -> list[float]:
+    # The worker processes live for the whole batch, so each one's caches
+    # (flyweights, style merges, text wrapping, ...) stay warm from one job to the next.
+    with ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn")) as executor:
+        return list(executor.map(fn, items))
+
+
+def render_screenshots(jobs: Iterable[ScreenshotJob], processes: int | None = None) -> list[float]:
+    """
+    Run headless applications in a pool of worker processes,
+    so that generating many screenshots scales with the number of cores.
+
+    Parameters:
+        jobs: The applications to run.
+        processes: The number of worker processes. If `None`, one per core.
+
+    Returns:
+        The time (in seconds) that each job took, in the order of `jobs`.
+    """
+    return _run_in_pool(_render, jobs, processes)
+
+
+def run_scripts(paths: Iterable[Path], processes: int | None = None) -> list[float]:
+    """
+    Run Python scripts (as `__main__`) in a pool of worker processes,
+    e.g. the documentation examples, each of which runs a headless application that takes screenshots.
+
+    Parameters:
+        paths: The scripts to run.
+        processes: The number of worker processes. If `None`, one per core.
+
+    Returns:
+        The time (in seconds) that each script took, in the order of `paths`.
+    """
+    return _run_in_pool(_run_script, paths, processes)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import re
 from collections.abc import Iterator
 from dataclasses import dataclass, field
+from enum import IntEnum
 from itertools import zip_longest
 from time import perf_counter_ns
 
@@ -9,11 +11,14 @@ from structlog import get_logger
 
 from counterweight._context_vars import current_hook_idx, current_hook_state
 from counterweight.components import Component
-from counterweight.elements import AnyElement
+from counterweight.elements import AnyElement, Canvas, Div, LogView, Table, Text, TextArea
 from counterweight.hooks.impls import Hooks
 
 logger = get_logger()
 
+# Everything except the characters that text wrapping can break lines at.
+_NOT_BREAKABLE = re.compile(r"[^ \n]")
+
 
 @dataclass(slots=True)
 class ShadowNode:
@@ -54,6 +59,8 @@ def update_shadow(next: Component | AnyElement, previous: ShadowNode | None) ->
             element = next_component.func(*next_args, **next_kwargs)
             user_ns += perf_counter_ns() - _start
 
+            previous_hooks.dirty = False
+
             children = []
             for new_child, previous_child in zip_longest(element.children, previous_children):
                 if new_child is None:
@@ -138,3 +145,119 @@ def update_shadow(next: Component | AnyElement, previous: ShadowNode | None) ->
             raise Exception("Unreachable!")
 
     return new, user_ns
+
+
+def update_dirty_shadow(previous: ShadowNode) -> tuple[ShadowNode, int]:
+    """
+    Re-render only the components whose hooks are marked dirty (and their descendants),
+    reusing the rest of the previous shadow tree as-is.
+
+    Components outside the dirty subtrees are not re-executed, so this is only valid when nothing
+    else could have changed their output (i.e., their ancestors were not re-rendered either).
+
+    Returns the updated shadow node and the nanoseconds spent in user component functions.
+    """
+    if previous.hooks.dirty and previous.component is not None:
+        return update_shadow(previous.component, previous)
+
+    user_ns = 0
+    changed = False
+    children = []
+    for previous_child in previous.children:
+        child_node, child_ns = update_dirty_shadow(previous_child)
+        children.append(child_node)
+        user_ns += child_ns
+        changed |= child_node is not previous_child
+
+    if not changed:
+        return previous, user_ns
+
+    return (
+        ShadowNode(
+            component=previous.component,
+            element=previous.element,
+            children=children,
+            hooks=previous.hooks,
+        ),
+        user_ns,
+    )
+
+
+class ShadowChange(IntEnum):
+    """
+    How much of the render pipeline a change between two shadow trees invalidates,
+    ordered from least to most severe.
+    """
+
+    NONE = 0
+    PAINT = 1  # only paint is affected (e.g., colors, or text content that wraps the same way)
+    LAYOUT = 2  # the tree has the same shape, but some element must be laid out again
+    STRUCTURE = 3  # elements were added, removed, or changed type
+
+
+def classify_change(new: ShadowNode, previous: ShadowNode) -> ShadowChange:
+    """
+    Classify the change from the `previous` shadow tree to the `new` one
+    as the most severe change to any element in the tree.
+    """
+    if new is previous:
+        return ShadowChange.NONE
+
+    change = _classify_element_change(new.element, previous.element)
+    if change is ShadowChange.STRUCTURE or len(new.children) != len(previous.children):
+        return ShadowChange.STRUCTURE
+
+    for new_child, previous_child in zip(new.children, previous.children):
+        change = max(change, classify_change(new_child, previous_child))
+        if change is ShadowChange.STRUCTURE:
+            break
+
+    return change
+
+
+def _classify_element_change(new: AnyElement, previous: AnyElement) -> ShadowChange:
+    if new is previous:
+        return ShadowChange.NONE
+
+    if type(new) is not type(previous):
+        return ShadowChange.STRUCTURE
+
+    if new.style.layout is not previous.style.layout and new.style.layout != previous.style.layout:
+        return ShadowChange.LAYOUT
+
+    match new, previous:
+        case Text(), Text():
+            if new.style.text_wrap != previous.style.text_wrap or not _same_text_shape(new, previous):
+                return ShadowChange.LAYOUT
+        case Canvas(), Canvas():
+            if new.cell_size != previous.cell_size:
+                return ShadowChange.LAYOUT
+        case Table(), Table():
+            if new.cell_size != previous.cell_size:
+                return ShadowChange.LAYOUT
+        case TextArea(), TextArea():
+            # A single-line text area measures differently from a multi-line one.
+            if new.buffer.multiline != previous.buffer.multiline:
+                return ShadowChange.LAYOUT
+        case (Div(), Div()) | (LogView(), LogView()):
+            pass
+        case _:
+            # An element that isn't classified above might measure differently, so lay it out again to be safe.
+            return ShadowChange.LAYOUT
+
+    return ShadowChange.PAINT
+
+
+def _same_text_shape(new: Text, previous: Text) -> bool:
+    """
+    Text wrapping (and therefore text measurement) only depends on where the spaces and newlines are,
+    so two texts with the same length and the same spaces and newlines always measure the same.
+    """
+    new_text, previous_text = new.styled.text, previous.styled.text
+    if new_text is previous_text:
+        return True
+
+    if len(new_text) != len(previous_text):
+        return False
+
+    return _NOT_BREAKABLE.sub("x", new_text) == _NOT_BREAKABLE.sub("x", previous_text)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from counterweight._context_vars import current_event_queue
+from counterweight.events import StoreChanged
+
+type Listener[T] = Callable[[T], bool]
+
+
+class Store[T]:
+    """
+    A container for state that lives outside of any component
+    (e.g., data pushed in from a network feed).
+
+    Components read from a store with the [`use_store`][counterweight.hooks.use_store] hook.
+    When the store is updated, only the components whose *selected* part of the store changed are re-rendered,
+    instead of the whole tree.
+
+    Any number of updates between two frames are batched into a single re-render.
+    """
+
+    __slots__ = ("_listeners", "_pending", "_value")
+
+    def __init__(self, initial_value: T) -> None:
+        self._value = initial_value
+        self._listeners: set[Listener[T]] = set()
+        self._pending = False
+
+    @property
+    def value(self) -> T:
+        """The current value of the store."""
+        return self._value
+
+    def set(self, value: Callable[[T], T] | T) -> None:
+        """
+        Update the value of the store.
+
+        Parameters:
+            value: Either the new value of the store,
+                or a function that takes the current value of the store and returns the new value of the store.
+
+        This must be called from inside the application's event loop (e.g., from an effect or an event handler).
+        """
+        if callable(value):
+            value = value(self._value)
+
+        self._value = value
+
+        # Only the first update since the last notification needs to wake up the render loop;
+        # later updates will be picked up by that same notification.
+        if self._listeners and not self._pending:
+            self._pending = True
+            current_event_queue.get().put_nowait(StoreChanged(store=self))
+
+    def subscribe(self, listener: Listener[T]) -> None:
+        """
+        Register a `listener` that will be called with the value of the store when it changes.
+        The listener should return `True` if it caused a component to need re-rendering.
+        """
+        self._listeners.add(listener)
+
+    def unsubscribe(self, listener: Listener[T]) -> None:
+        self._listeners.discard(listener)
+
+    def notify(self) -> bool:
+        """
+        Call all listeners with the current value of the store.
+
+        Returns:
+            `True` if any listener marked a component as needing re-rendering.
+        """
+        self._pending = False
+
+        dirtied = False
+        for listener in tuple(self._listeners):
+            dirtied |= listener(self._value)
+
+        return dirtied
@@ -4,7 +4,9 @@ import dataclasses
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import lru_cache
-from typing import Literal, NamedTuple
+from itertools import count
+from threading import get_ident
+from typing import Any, Callable, Literal, NamedTuple
 
 import waxy
 from cachetools import LRUCache
@@ -17,20 +19,44 @@ TextWrap = Literal["none", "stable", "pretty", "balance"]
 STYLE_MERGE_CACHE: LRUCache[tuple[int, int], StyleFragment] = LRUCache(maxsize=2**16)
 
 
+_MERGE_FUNCTIONS: dict[type, Callable[[Any, Any], Any]] = {}
+
+
+def _merge_function[S: StyleFragment](cls: type[S]) -> Callable[[S, S], S]:
+    """
+    Return the merge function for a style class, which is built once per class,
+    so that merging doesn't need to reflect over the class's fields every time.
+    """
+    try:
+        return _MERGE_FUNCTIONS[cls]
+    except KeyError:
+        merge = _MERGE_FUNCTIONS[cls] = _build_merge_function(cls)
+        return merge
+
+
+def _build_merge_function[S: StyleFragment](cls: type[S]) -> Callable[[S, S], S]:
+    fields = [f for f in dataclasses.fields(cls) if f.init]  # type: ignore[arg-type]
+    names = tuple(f.name for f in fields)
+    # Fields with default_factory (e.g. layout) keep left's value — Style.__or__ handles layout separately.
+    overridable = tuple((f.name, f.default) for f in fields if f.default is not dataclasses.MISSING)
+
+    def merge(left: S, right: S) -> S:
+        # Start with left's values as the baseline.
+        kwargs = {name: getattr(left, name) for name in names}
+        # Override with right's non-default values (right wins where it was explicitly set).
+        for name, default in overridable:
+            val = getattr(right, name)
+            if isinstance(val, StyleFragment):
+                kwargs[name] = kwargs[name] | val
+            elif val != default:
+                kwargs[name] = val
+        return cls(**kwargs)
+
+    return merge
+
+
 def merge_style_fragments[S: StyleFragment](left: S, right: S) -> S:
-    # Start with left's values as the baseline.
-    kwargs: dict[str, object] = {f.name: getattr(left, f.name) for f in dataclasses.fields(left) if f.init}  # type: ignore[arg-type]
-    # Override with right's non-default values (right wins where it was explicitly set).
-    for f in dataclasses.fields(right):  # type: ignore[arg-type]
-        if not f.init:
-            continue
-        val = getattr(right, f.name)
-        if isinstance(val, StyleFragment):
-            kwargs[f.name] = merge_style_fragments(getattr(left, f.name), val)
-        elif f.default is not dataclasses.MISSING and val != f.default:
-            kwargs[f.name] = val
-        # Fields with default_factory (e.g. layout) keep left's value — Style.__or__ handles layout separately.
-    return type(left)(**kwargs)
+    return _merge_function(type(left))(left, right)
 
 
 class StyleFragment:
@@ -230,6 +256,9 @@ _WHITE = COLORS_BY_NAME["white"]
 _BLACK = COLORS_BY_NAME["black"]
 
 
+_CELL_STYLE_IDS = count()
+
+
 @flyweight(maxsize=2**10)
 @dataclass(frozen=True, slots=True, kw_only=True)
 class CellStyle(StyleFragment):
@@ -241,19 +270,34 @@ class CellStyle(StyleFragment):
     underline: bool = False
     strikethrough: bool = False
     _hash: int = field(init=False, repr=False, compare=False, hash=False, default=0)
+    _id: int = field(init=False, repr=False, compare=False, hash=False)
 
     def __post_init__(self) -> None:
-        object.__setattr__(
-            self,
-            "_hash",
-            hash(
-                (self.foreground, self.background, self.bold, self.dim, self.italic, self.underline, self.strikethrough)
-            ),
-        )
+        key = (self.foreground, self.background, self.bold, self.dim, self.italic, self.underline, self.strikethrough)
+        object.__setattr__(self, "_hash", hash(key))
+
+        # The flyweight re-runs __init__ on cached instances, which leaves _id alone (since it has no default),
+        # so each instance keeps the id it was given when it was created.
+        try:
+            self._id
+        except AttributeError:
+            object.__setattr__(self, "_id", next(_CELL_STYLE_IDS))
 
     def __hash__(self) -> int:
         return self._hash
 
+    @property
+    def id(self) -> int:
+        """
+        An integer that identifies this style object,
+        so that styles can be compared, and used to look up precomputed data (like SGR codes), as cheaply as possible.
+
+        Styles with the same id are equal.
+        Equal styles almost always have the same id, since styles are flyweights,
+        but a style that is created again after falling out of the flyweight's cache gets a new id.
+        """
+        return self._id
+
 
 _DEFAULT_CELL_STYLE = CellStyle()
 
@@ -386,6 +430,13 @@ class BorderKind(Enum):
         return f"BorderKind.{self.name}"
 
 
+# The bits of a 4-bit mask of the directions that a joined border glyph connects in.
+_CONNECTS_TOP = 1
+_CONNECTS_BOTTOM = 2
+_CONNECTS_LEFT = 4
+_CONNECTS_RIGHT = 8
+
+
 class JoinedBorderParts(NamedTuple):
     vertical: str
     horizontal: str
@@ -399,89 +450,75 @@ class JoinedBorderParts(NamedTuple):
     horizontal_bottom: str
     horizontal_vertical: str
 
+    @property
+    def table(self) -> JoinedBorderTable:
+        """The precomputed connections and glyph selection for these parts."""
+        return _joined_border_table(self)
+
     def select(self, top: bool, bottom: bool, left: bool, right: bool) -> str | None:
-        # This could be a lookup table... not sure if that would be better
-        match top, bottom, left, right:
-            case True, True, True, True:
-                return self.horizontal_vertical
-            case True, True, True, False:
-                return self.vertical_left
-            case True, True, False, True:
-                return self.vertical_right
-            case True, False, True, True:
-                return self.horizontal_top
-            case False, True, True, True:
-                return self.horizontal_bottom
-            case True, True, False, False:
-                return self.vertical
-            case False, False, True, True:
-                return self.horizontal
-            case True, False, True, False:
-                return self.right_bottom
-            case True, False, False, True:
-                return self.left_bottom
-            case False, True, True, False:
-                return self.right_top
-            case False, True, False, True:
-                return self.left_top
-            case _:
-                return None
+        return self.table.glyphs[
+            (top and _CONNECTS_TOP)
+            | (bottom and _CONNECTS_BOTTOM)
+            | (left and _CONNECTS_LEFT)
+            | (right and _CONNECTS_RIGHT)
+        ]
 
     @property
     def connects_right(self) -> frozenset[str]:
-        return frozenset(
-            {
-                self.horizontal,
-                self.left_top,
-                self.left_bottom,
-                self.horizontal_top,
-                self.horizontal_bottom,
-                self.vertical_right,
-                self.horizontal_vertical,
-            }
-        )
+        return self.table.connecting(_CONNECTS_RIGHT)
 
     @property
     def connects_left(self) -> frozenset[str]:
-        return frozenset(
-            {
-                self.horizontal,
-                self.right_top,
-                self.right_top,
-                self.horizontal_top,
-                self.horizontal_bottom,
-                self.vertical_left,
-                self.horizontal_vertical,
-            }
-        )
+        return self.table.connecting(_CONNECTS_LEFT)
 
     @property
     def connects_top(self) -> frozenset[str]:
-        return frozenset(
-            {
-                self.vertical,
-                self.left_bottom,
-                self.right_bottom,
-                self.vertical_right,
-                self.vertical_left,
-                self.horizontal_top,
-                self.horizontal_vertical,
-            }
-        )
+        return self.table.connecting(_CONNECTS_TOP)
 
     @property
     def connects_bottom(self) -> frozenset[str]:
-        return frozenset(
-            {
-                self.vertical,
-                self.left_top,
-                self.right_top,
-                self.vertical_right,
-                self.vertical_left,
-                self.horizontal_bottom,
-                self.horizontal_vertical,
-            }
-        )
+        return self.table.connecting(_CONNECTS_BOTTOM)
+
+
+# The directions that each JoinedBorderParts field connects in, in field order.
+_JOINED_BORDER_FIELD_MASKS = (
+    _CONNECTS_TOP | _CONNECTS_BOTTOM,  # vertical
+    _CONNECTS_LEFT | _CONNECTS_RIGHT,  # horizontal
+    _CONNECTS_BOTTOM | _CONNECTS_RIGHT,  # left_top
+    _CONNECTS_BOTTOM | _CONNECTS_LEFT,  # right_top
+    _CONNECTS_TOP | _CONNECTS_RIGHT,  # left_bottom
+    _CONNECTS_TOP | _CONNECTS_LEFT,  # right_bottom
+    _CONNECTS_TOP | _CONNECTS_BOTTOM | _CONNECTS_RIGHT,  # vertical_right
+    _CONNECTS_TOP | _CONNECTS_BOTTOM | _CONNECTS_LEFT,  # vertical_left
+    _CONNECTS_TOP | _CONNECTS_LEFT | _CONNECTS_RIGHT,  # horizontal_top
+    _CONNECTS_BOTTOM | _CONNECTS_LEFT | _CONNECTS_RIGHT,  # horizontal_bottom
+    _CONNECTS_TOP | _CONNECTS_BOTTOM | _CONNECTS_LEFT | _CONNECTS_RIGHT,  # horizontal_vertical
+)
+
+
+class JoinedBorderTable(NamedTuple):
+    """
+    Lookup tables for healing one kind of joined border,
+    indexed by 4-bit masks of the directions that a glyph connects in.
+    """
+
+    glyphs: tuple[str | None, ...]
+    """The glyph that connects in exactly the directions of each mask, or `None` if there isn't one."""
+    masks: dict[str, int]
+    """The directions that each glyph connects in."""
+
+    def connecting(self, direction: int) -> frozenset[str]:
+        return frozenset(glyph for glyph, mask in self.masks.items() if mask & direction)
+
+
+@lru_cache(maxsize=2**6)
+def _joined_border_table(parts: JoinedBorderParts) -> JoinedBorderTable:
+    glyphs: list[str | None] = [None] * 16
+    masks: dict[str, int] = {}
+    for glyph, mask in zip(parts, _JOINED_BORDER_FIELD_MASKS, strict=True):
+        glyphs[mask] = glyph
+        masks[glyph] = masks.get(glyph, 0) | mask
+    return JoinedBorderTable(glyphs=tuple(glyphs), masks=masks)
 
 
 class JoinedBorderKind(Enum):
@@ -562,8 +599,50 @@ class Style(StyleFragment):
     text_wrap: TextWrap = "none"
 
     def __or__[SS: Style](self: SS, other: SS | None) -> SS:
+        """
+        Compose two styles, with the fields that are set in `other` taking precedence.
+
+        Styles must only be composed on the thread that imported this module (i.e., the application's thread):
+        their layouts can't be used from any other thread,
+        and composing evicts old compositions from a shared cache, which drops their layouts.
+        """
         if other is None:
             return self
-        merged_layout = self.layout | other.layout
-        merged = merge_style_fragments(self, other)
-        return dataclasses.replace(merged, layout=merged_layout)
+
+        # Styles are usually composed from the same module-level styles on every render
+        # (e.g., `col | align_children_center | border_light`), so compositions are cached by the identity
+        # of their operands, which is much cheaper than hashing them. The entry holds on to the operands,
+        # so their ids can't be reused by other styles while it is in the cache.
+        key = (id(self), id(other))
+        entry = _STYLE_COMPOSITION_CACHE.get(key)
+        if entry is not None and entry[0] is self and entry[1] is other:
+            return entry[2]  # type: ignore[return-value]
+
+        assert get_ident() == _STYLE_CACHE_THREAD, "Styles can only be composed on the thread that imported them"
+
+        merged = _intern_style(_merge_function(type(self))(self, other), self.layout | other.layout)
+        _STYLE_COMPOSITION_CACHE[key] = (self, other, merged)
+        return merged
+
+
+_STYLE_COMPOSITION_CACHE: LRUCache[tuple[int, int], tuple[Style, Style, Style]] = LRUCache(maxsize=2**14)
+_STYLE_INTERN_CACHE: LRUCache[tuple[object, ...], Style] = LRUCache(maxsize=2**14)
+# The cached styles own layouts, which must be dropped on the thread that created them,
+# so only this thread may add entries to (and so evict entries from) the caches.
+_STYLE_CACHE_THREAD = get_ident()
+
+
+def _intern_style[SS: Style](style: SS, layout: waxy.Style) -> SS:
+    """
+    Return the canonical instance of the style with the given fields and layout,
+    so that equal compositions of different styles share an identity
+    (which lets layout and paint comparisons short-circuit on `is`).
+    """
+    key = (type(style), layout, *(getattr(style, name) for name in _STYLE_FIELD_NAMES))
+    interned = _STYLE_INTERN_CACHE.get(key)
+    if interned is None:
+        interned = _STYLE_INTERN_CACHE[key] = dataclasses.replace(style, layout=layout)
+    return interned  # type: ignore[return-value]
+
+
+_STYLE_FIELD_NAMES = tuple(f.name for f in dataclasses.fields(Style) if f.compare)
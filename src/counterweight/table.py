@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+
+from counterweight.elements import TableSource
+
+
+class RowSource:
+    """
+    A [`Table`][counterweight.elements.Table] source backed by a sequence of rows,
+    each of which is a sequence of values (one per column).
+    """
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: Sequence[Sequence[object]]) -> None:
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def cell(self, row: int, column: int) -> object:
+        return self.rows[row][column]
+
+
+class ColumnSource:
+    """
+    A [`Table`][counterweight.elements.Table] source backed by a sequence of columns,
+    each of which is a sequence of values (one per row), e.g. the columns of a data frame.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Sequence[Sequence[object]]) -> None:
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def cell(self, row: int, column: int) -> object:
+        return self.columns[column][row]
+
+
+def sort_rows(
+    source: TableSource,
+    column: int,
+    reverse: bool = False,
+    key: Callable[[object], object] | None = None,
+) -> list[int]:
+    """
+    Returns:
+        The indexes of the rows of `source`, sorted by their values in `column`,
+            to be used as a [`Table`][counterweight.elements.Table]'s `order`.
+    """
+    values = [source.cell(row, column) for row in range(len(source))]
+    if key is not None:
+        values = [key(value) for value in values]
+    return sorted(range(len(values)), key=values.__getitem__, reverse=reverse)  # type: ignore[arg-type]
+
+
+def filter_rows(
+    source: TableSource,
+    predicate: Callable[[int], bool],
+    order: Sequence[int] | None = None,
+) -> list[int]:
+    """
+    Returns:
+        The indexes of the rows of `source` (in `order`, if given) for which `predicate(row)` is true,
+            to be used as a [`Table`][counterweight.elements.Table]'s `order`.
+    """
+    return [row for row in (order if order is not None else range(len(source))) if predicate(row)]
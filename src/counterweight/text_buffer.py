@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from counterweight.events import KeyPressed
+from counterweight.keys import Key
+from counterweight.layout import WRAP_CACHE, Line
+from counterweight.store import Store
+from counterweight.styles.styles import TextWrap
+
+_EMPTY_LINE = Line(start=0, end=0)
+
+TAB_SIZE = 4
+"""The distance between tab stops: tabs are expanded into spaces up to the next tab stop."""
+
+
+class TextBuffer:
+    """
+    An editable piece of text, displayed (and edited) by a [`TextArea`][counterweight.elements.TextArea].
+
+    The text is held in a two-level gap buffer:
+    the paragraphs before and after the cursor's paragraph are kept in two stacks,
+    and the cursor's paragraph is split into the characters before and after the cursor.
+    Typing, deleting, and moving the cursor only touch the cursor's paragraph,
+    so editing a long document costs the same as editing a short one,
+    and only the edited paragraph needs to be re-wrapped.
+
+    Every change to the buffer increments the [`Store`][counterweight.hooks.Store] `version`,
+    so components that display the buffer can subscribe to it
+    (e.g., with [`use_text_buffer`][counterweight.hooks.use_text_buffer]).
+    """
+
+    __slots__ = ("_after", "_before", "_column", "_head", "_multiline", "_tail", "_top", "version")
+
+    def __init__(self, text: str = "", multiline: bool = True) -> None:
+        self._multiline = multiline
+        self.version: Store[int] = Store(0)
+
+        # The paragraphs before the cursor's paragraph, in order.
+        self._before: list[str] = []
+        # The paragraphs after the cursor's paragraph, in reverse order (so the next paragraph is on top).
+        self._after: list[str] = []
+        # The characters of the cursor's paragraph before the cursor, in order,
+        # and after the cursor, in reverse order (so the character under the cursor is on top).
+        self._head: list[str] = []
+        self._tail: list[str] = []
+
+        # The column that vertical cursor movement tries to stay in.
+        self._column: int | None = None
+        # The (paragraph, row) at the top of the last window, which is kept as long as the cursor stays in view.
+        self._top = (0, 0)
+
+        self._load(text)
+
+    def _load(self, text: str) -> None:
+        text = text.expandtabs(TAB_SIZE)
+        paragraphs = text.split("\n") if self.multiline else [text.replace("\n", " ")]
+        self._before = []
+        self._after = paragraphs[:0:-1]
+        self._head = []
+        self._tail = list(reversed(paragraphs[0]))
+        self._column = None
+        self._top = (0, 0)
+
+    def _changed(self) -> None:
+        self.version.set(lambda version: version + 1)
+
+    @property
+    def multiline(self) -> bool:
+        """Whether the buffer can hold more than one paragraph. This is fixed when the buffer is created."""
+        return self._multiline
+
+    @property
+    def text(self) -> str:
+        """The whole text of the buffer. This has to join every paragraph, so prefer `paragraph` where possible."""
+        return "\n".join((*self._before, self._current(), *reversed(self._after)))
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self._load(text)
+        self._changed()
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self._before) + 1 + len(self._after)
+
+    def paragraph(self, index: int) -> str:
+        """The text of the `index`-th paragraph (line) of the buffer."""
+        before = len(self._before)
+        if index < before:
+            return self._before[index]
+        elif index == before:
+            return self._current()
+        else:
+            return self._after[len(self._after) - (index - before)]
+
+    def _current(self) -> str:
+        return "".join(self._head) + "".join(reversed(self._tail))
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        """The `(paragraph, column)` of the cursor."""
+        return len(self._before), len(self._head)
+
+    def insert(self, text: str) -> None:
+        """
+        Insert `text` at the cursor, and move the cursor to the end of it.
+
+        This must be called from inside the application's event loop (e.g., from an effect or an event handler).
+        """
+        if not self.multiline:
+            text = text.replace("\n", " ")
+
+        first, *rest = text.split("\n")
+        if "\t" in first:
+            # The first line continues the cursor's paragraph, so its tab stops are measured from the start of that.
+            column = len(self._head)
+            first = ("x" * column + first).expandtabs(TAB_SIZE)[column:]
+        self._head.extend(first)
+        for paragraph in rest:
+            self._before.append("".join(self._head))
+            self._head = list(paragraph.expandtabs(TAB_SIZE))
+
+        self._column = None
+        self._changed()
+
+    def backspace(self) -> None:
+        """Delete the character before the cursor (joining two paragraphs if the cursor is at the start of one)."""
+        if self._head:
+            self._head.pop()
+        elif self._before:
+            self._head = list(self._before.pop())
+        else:
+            return
+
+        self._column = None
+        self._changed()
+
+    def delete(self) -> None:
+        """Delete the character after the cursor (joining two paragraphs if the cursor is at the end of one)."""
+        if self._tail:
+            self._tail.pop()
+        elif self._after:
+            self._tail = list(reversed(self._after.pop()))
+        else:
+            return
+
+        self._column = None
+        self._changed()
+
+    def left(self) -> None:
+        if self._head:
+            self._tail.append(self._head.pop())
+        elif self._before:
+            self._after.append(self._current())
+            self._head = list(self._before.pop())
+            self._tail = []
+        else:
+            return
+
+        self._column = None
+        self._changed()
+
+    def right(self) -> None:
+        if self._tail:
+            self._head.append(self._tail.pop())
+        elif self._after:
+            self._before.append(self._current())
+            self._head = []
+            self._tail = list(reversed(self._after.pop()))
+        else:
+            return
+
+        self._column = None
+        self._changed()
+
+    def home(self) -> None:
+        """Move the cursor to the start of its paragraph."""
+        self._move_to_column(0)
+        self._column = None
+        self._changed()
+
+    def end(self) -> None:
+        """Move the cursor to the end of its paragraph."""
+        self._move_to_column(len(self._head) + len(self._tail))
+        self._column = None
+        self._changed()
+
+    def up(self) -> None:
+        """Move the cursor to the previous paragraph, staying in the same column if possible."""
+        if not self._before:
+            return
+
+        column = self._column if self._column is not None else len(self._head)
+        self._after.append(self._current())
+        self._head, self._tail = [], list(reversed(self._before.pop()))
+        self._move_to_column(column)
+        self._column = column
+        self._changed()
+
+    def down(self) -> None:
+        """Move the cursor to the next paragraph, staying in the same column if possible."""
+        if not self._after:
+            return
+
+        column = self._column if self._column is not None else len(self._head)
+        self._before.append(self._current())
+        self._head, self._tail = [], list(reversed(self._after.pop()))
+        self._move_to_column(column)
+        self._column = column
+        self._changed()
+
+    def _move_to_column(self, column: int) -> None:
+        head, tail = self._head, self._tail
+        while len(head) > column:
+            tail.append(head.pop())
+        while len(head) < column and tail:
+            head.append(tail.pop())
+
+    def handle_key(self, event: KeyPressed) -> bool:
+        """
+        Apply the standard editing action for a key press (typing, deleting, and moving the cursor).
+
+        Returns:
+            Whether the key was handled by the buffer.
+        """
+        match event.key:
+            case Key.Backspace:
+                self.backspace()
+            case Key.Delete:
+                self.delete()
+            case Key.Left:
+                self.left()
+            case Key.Right:
+                self.right()
+            case Key.Up if self.multiline:
+                self.up()
+            case Key.Down if self.multiline:
+                self.down()
+            case Key.ControlA:
+                self.home()
+            case Key.End | Key.ControlE:
+                self.end()
+            case Key.Enter if self.multiline:
+                self.insert("\n")
+            case Key.Tab if self.multiline:
+                # Tabs are expanded into spaces, since each character is drawn in a single cell.
+                # In a single-line buffer (i.e., a text input), tab is left to the application (e.g., to move focus).
+                self.insert(" " * (TAB_SIZE - len(self._head) % TAB_SIZE))
+            case key if len(key) == 1 and key.isprintable():
+                self.insert(key)
+            case _:
+                return False
+
+        return True
+
+    def _lines(self, index: int, wrap: TextWrap, width: int) -> Sequence[Line]:
+        return WRAP_CACHE.wrap(self.paragraph(index), wrap, width) or (_EMPTY_LINE,)
+
+    def _cursor_row(self, lines: Sequence[Line]) -> int:
+        column = len(self._head)
+        return max(row for row, line in enumerate(lines) if line.start <= column or row == 0)
+
+    def window(self, wrap: TextWrap, width: int, height: int) -> tuple[list[tuple[str, Line]], tuple[int, int]]:
+        """
+        Return the (at most `height`) wrapped lines that are visible in a `width` by `height` window,
+        and the `(x, y)` position of the cursor inside the window.
+
+        The window is scrolled as little as possible to keep the cursor in view,
+        and only the paragraphs inside the window are wrapped.
+        """
+        if width <= 0 or height <= 0:
+            return [], (0, 0)
+
+        paragraph = len(self._before)
+        cursor_lines = self._lines(paragraph, wrap, width)
+        cursor_row = self._cursor_row(cursor_lines)
+
+        # The topmost (paragraph, row) that still has the cursor in view: walk back height - 1 rows from the cursor.
+        earliest = (paragraph, cursor_row)
+        remaining = height - 1
+        while remaining > 0:
+            p, r = earliest
+            if r > 0:
+                step = min(r, remaining)
+                earliest = (p, r - step)
+                remaining -= step
+            elif p > 0:
+                earliest = (p - 1, len(self._lines(p - 1, wrap, width)) - 1)
+                remaining -= 1
+            else:
+                break
+
+        top = min(max(self._top, earliest), (paragraph, cursor_row))
+        if top[0] < self.paragraph_count and top[1] >= len(self._lines(top[0], wrap, width)):
+            top = (top[0], 0)
+        self._top = top
+
+        rows: list[tuple[str, Line]] = []
+        cursor = (0, 0)
+        p, r = top
+        while len(rows) < height and p < self.paragraph_count:
+            text = self.paragraph(p)
+            lines = cursor_lines if p == paragraph else self._lines(p, wrap, width)
+            for row in range(r, len(lines)):
+                if len(rows) == height:
+                    break
+                line = lines[row]
+                if p == paragraph and row == cursor_row:
+                    x = len(self._head) - line.start
+                    if x >= width and wrap != "none":
+                        # The cursor is just past the end of a full wrapped line.
+                        x = width - 1
+                    elif x >= width:
+                        # Unwrapped lines are scrolled sideways to keep the cursor in view.
+                        shift = x - width + 1
+                        line = Line(start=line.start + shift, end=max(line.end, line.start + shift))
+                        x -= shift
+                    cursor = (x, len(rows))
+                rows.append((text, line))
+            p, r = p + 1, 0
+
+        return rows, cursor
@@ -40,6 +40,9 @@ def canvas(
     `width` and `height` are in pixels; `height` must be even. `cells` is a sparse mapping
     of `(x, y)` pixel coordinates to colors — unmapped pixels use `default` (black).
     The returned chunks are suitable for use as the `content` of a `Text` element.
+
+    For canvases that change every frame, prefer the [`Canvas`][counterweight.elements.Canvas] element,
+    which paints its pixels directly instead of going through text layout.
     """
     if height % 2 != 0:
         raise ValueError(f"canvas height must be even, got {height}")
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from counterweight.cli import cli
+
+
+def test_replay(runner: CliRunner, tmp_path: Path) -> None:
+    path = tmp_path / "session.jsonl"
+    path.write_text('{"version":1,"width":20,"height":3}\n[0.01,"k","a"]\n')
+
+    result = runner.invoke(cli, ("replay", "tests.test_recording:counter", str(path)))
+
+    assert result.exit_code == 0, result.output
+    assert "total" in result.output
+
+
+def test_replay_on_virtual_time(runner: CliRunner, tmp_path: Path) -> None:
+    path = tmp_path / "session.jsonl"
+    path.write_text('{"version":1,"width":20,"height":3}\n[3600,"k","a"]\n')
+
+    result = runner.invoke(cli, ("replay", "tests.test_recording:counter", str(path), "--virtual-time"))
+
+    assert result.exit_code == 0, result.output
+    assert "total" in result.output
@@ -1,13 +1,20 @@
+import io
 from pathlib import Path
-from xml.etree.ElementTree import Element, ElementTree, SubElement
+from xml.etree.ElementTree import Element, ElementTree, SubElement, fromstring, tostring
 
 import pytest
 
-from counterweight.controls import Screenshot
+from counterweight.app import app
+from counterweight.components import component
+from counterweight.controls import Quit, Screenshot
+from counterweight.elements import Text
+from counterweight.geometry import Position
+from counterweight.paint import P, Paint, svg, write_svg
+from counterweight.styles.styles import CellStyle, Color
 
 
 @pytest.fixture
-def svg() -> ElementTree:
+def tree() -> ElementTree:
     root = Element("parent")
     SubElement(root, "child")
     return ElementTree(element=root)
@@ -20,19 +27,106 @@ def svg() -> ElementTree:
         ("subdir", "screenshot.svg"),
     ),
 )
-def test_to_file(tmp_path: Path, path_parts: tuple[str], svg: ElementTree) -> None:
+def test_to_file(tmp_path: Path, path_parts: tuple[str], tree: ElementTree) -> None:
     full_path = tmp_path.joinpath(*path_parts)
     screenshot = Screenshot.to_file(full_path)
 
-    screenshot.handler(svg)
+    screenshot.handler(tree)
 
     assert full_path.stat().st_size > 0
 
 
-def test_indent(tmp_path: Path, svg: ElementTree) -> None:
+def test_indent(tmp_path: Path, tree: ElementTree) -> None:
     path = tmp_path / "screenshot.svg"
     screenshot = Screenshot.to_file(path, indent=4)
 
-    screenshot.handler(svg)
+    screenshot.handler(tree)
 
     assert "\n    " in path.read_text()
+
+
+_STYLE = CellStyle()
+_RED_ON_BLUE = CellStyle(foreground=Color.from_name("red"), background=Color.from_name("blue"))
+
+
+def _paint(lines: list[str], styles: dict[Position, CellStyle] | None = None) -> Paint:
+    styles = styles or {}
+    return {
+        Position(x, y): P(char=c, style=styles.get(Position(x, y), _STYLE), z=0)
+        for y, line in enumerate(lines)
+        for x, c in enumerate(line)
+    }
+
+
+def _written(paint: Paint, indent: int | None = None) -> Element:
+    f = io.StringIO()
+    write_svg(paint, f, indent=indent)
+    return fromstring(f.getvalue())
+
+
+def _shape(element: Element) -> list[tuple[str, dict[str, str], str | None]]:
+    return [(e.tag, dict(e.attrib), (e.text or "").strip() or None) for e in element.iter()]
+
+
+def test_write_svg_matches_svg() -> None:
+    styles = {Position(x, y): _RED_ON_BLUE for x in range(1, 4) for y in range(3)}
+    paint = _paint(["a < b", "c & d", "e   f"], styles)
+
+    tree = svg(paint).getroot()
+    assert tree is not None
+
+    assert _shape(_written(paint)) == _shape(fromstring(tostring(tree, encoding="unicode")))
+
+
+def test_write_svg_indent() -> None:
+    f = io.StringIO()
+    write_svg(_paint(["ab"]), f, indent=2)
+
+    assert "\n  <text" in f.getvalue()
+    assert "\n    <tspan" in f.getvalue()
+
+
+def test_svg_merges_background_rectangles_across_rows() -> None:
+    styles = {Position(x, y): _RED_ON_BLUE for x in range(1, 4) for y in range(3)}
+    root = _written(_paint(["     "] * 3, styles))
+
+    rects = [e for e in root.iter() if e.tag.endswith("rect")]
+    # The black background, and one rectangle for the blue block.
+    assert len(rects) == 2
+    assert rects[1].attrib["height"] == f"{3 * 1.13:0.2f}em"
+    assert rects[1].attrib["width"] == f"{3 * 0.55:0.2f}em"
+
+
+def test_svg_emits_one_text_run_per_row_and_style() -> None:
+    styles = {Position(x, 0): _RED_ON_BLUE for x in range(4, 7)}
+    root = _written(_paint(["ab cdef  g"], styles))
+
+    runs = [(e.attrib["x"], e.attrib.get("class"), e.text) for e in root.iter() if e.tag.endswith("tspan")]
+    assert runs == [
+        (f"{0 * 0.55:0.2f}em", None, "ab c"),
+        (f"{4 * 0.55:0.2f}em", "t0", "def"),
+        (f"{9 * 0.55:0.2f}em", None, "g"),
+    ]
+
+
+def test_svg_uses_css_classes_for_colors() -> None:
+    styles = {Position(0, y): _RED_ON_BLUE for y in range(2)}
+    f = io.StringIO()
+    write_svg(_paint(["a ", "  ", "b "], styles), f)
+    text = f.getvalue()
+
+    assert text.count(Color.from_name("red").hex) == 1
+    assert text.count(Color.from_name("blue").hex) == 1
+
+
+async def test_screenshot_to_file_streams_svg(tmp_path: Path) -> None:
+    path = tmp_path / "subdir" / "screenshot.svg"
+
+    @component
+    def root() -> Text:
+        return Text(content="hello")
+
+    await app(root, headless=True, dimensions=(10, 2), autopilot=[Screenshot.to_file(path), Quit()])
+
+    tspans = [e.text for e in fromstring(path.read_text()).iter() if e.tag.endswith("tspan")]
+    assert tspans == ["hello"]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import waxy
+
+from counterweight.elements import Canvas, LogView, Table, Text, TextArea
+from counterweight.paint import Paint, paint_canvas, paint_log_view, paint_table, paint_text, paint_text_area
+
+
+def rows(element: Text | Canvas | LogView | TextArea | Table, width: int, height: int) -> list[str]:
+    """Paint the content of `element` into a `width` by `height` box, and return the characters of each row."""
+    rect = waxy.Rect(left=0, right=width - 1, top=0, bottom=height - 1)
+
+    paint: Paint
+    match element:
+        case Text():
+            paint = paint_text(element, rect)
+        case Canvas():
+            paint = paint_canvas(element, rect)
+        case LogView():
+            paint = paint_log_view(element, rect)
+        case TextArea():
+            paint = paint_text_area(element, rect)
+        case Table():
+            paint = paint_table(element, rect)
+
+    return ["".join(paint[pos].char for pos in sorted(paint) if pos.y == y) for y in range(height)]
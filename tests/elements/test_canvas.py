@@ -0,0 +1,168 @@
+import io
+import random
+
+import pytest
+import waxy
+
+from counterweight import app
+from counterweight._canvas import CELL_SIZES, GLYPHS, SubCellMode, _pack_numpy, _pack_python
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit
+from counterweight.elements import Canvas, CanvasMode, Div
+from counterweight.geometry import Position
+from counterweight.layout import compute_layout
+from counterweight.paint import paint_canvas
+from counterweight.shadow import update_shadow
+from counterweight.styles.styles import CellStyle, Color, Style
+from counterweight.styles.utilities import border_light, col
+
+_RED = Color.from_name("red")
+_BLUE = Color.from_name("blue")
+_BLACK = Color.from_name("black")
+
+
+def test_canvases_have_no_children() -> None:
+    assert Canvas.from_colors(width=1, height=2, colors={}).children == ()
+
+
+def test_canvas_height_must_be_even() -> None:
+    with pytest.raises(ValueError):
+        Canvas(width=1, height=1, pixels=bytes(3))
+
+
+def test_canvas_pixels_must_match_size() -> None:
+    with pytest.raises(ValueError):
+        Canvas(width=2, height=2, pixels=bytes(3))
+
+
+def test_from_colors_fills_default_and_ignores_out_of_bounds() -> None:
+    canvas = Canvas.from_colors(width=2, height=2, colors={(1, 0): _RED, (5, 5): _BLUE}, default=_BLACK)
+
+    assert canvas.pixels == bytes(_BLACK) + bytes(_RED) + bytes(_BLACK) + bytes(_BLACK)
+
+
+def test_paint_canvas_uses_half_blocks() -> None:
+    canvas = Canvas.from_colors(width=2, height=2, colors={(0, 0): _RED, (1, 1): _BLUE})
+
+    paint = paint_canvas(canvas, waxy.Rect(left=3, right=4, top=5, bottom=5))
+
+    assert {pos: (p.char, p.style) for pos, p in paint.items()} == {
+        Position(3, 5): ("▀", CellStyle(foreground=_RED, background=_BLACK)),
+        Position(4, 5): ("▀", CellStyle(foreground=_BLACK, background=_BLUE)),
+    }
+
+
+def test_paint_canvas_clips_to_rect() -> None:
+    canvas = Canvas.from_colors(width=4, height=4, colors={})
+
+    paint = paint_canvas(canvas, waxy.Rect(left=0, right=1, top=0, bottom=0))
+
+    assert set(paint) == {Position(0, 0), Position(1, 0)}
+
+
+def test_canvas_is_measured_in_cells() -> None:
+    canvas = Canvas.from_colors(width=6, height=4, colors={})
+    shadow, _ = update_shadow(Div(style=col, children=[canvas]), None)
+
+    layout = compute_layout(shadow, waxy.AvailableSize(width=waxy.Definite(20), height=waxy.Definite(20)))
+
+    (_, resolved) = next((element, resolved) for element, resolved in layout if element is canvas)
+    assert (resolved.content.width + 1, resolved.content.height + 1) == (6, 2)
+
+
+async def test_canvas_renders_in_app() -> None:
+    @component
+    def root() -> Canvas:
+        return Canvas.from_colors(width=3, height=2, colors={}, style=border_light)
+
+    capture = io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(5, 3),
+        autopilot=(
+            PrintPaint(stream=capture, ansi=False),
+            Quit(),
+        ),
+    )
+
+    assert capture.getvalue().rstrip("\n") == "\n".join(["┌───┐", "│▀▀▀│", "└───┘"])
+
+
+def test_canvas_size_must_match_mode() -> None:
+    with pytest.raises(ValueError):
+        Canvas(width=3, height=4, pixels=bytes(36), mode="braille")
+
+    with pytest.raises(ValueError):
+        Canvas(width=2, height=4, pixels=bytes(24), mode="sextant")
+
+
+@pytest.mark.parametrize(
+    ("mode", "expected"),
+    (
+        ("half_block", (4, 6)),
+        ("sextant", (2, 4)),
+        ("braille", (2, 3)),
+    ),
+)
+def test_canvas_cell_size(mode: CanvasMode, expected: tuple[int, int]) -> None:
+    assert Canvas.from_colors(width=4, height=12, colors={}, mode=mode).cell_size == expected
+
+
+def test_sextant_glyphs() -> None:
+    glyphs = GLYPHS["sextant"]
+
+    assert glyphs[0b000000] == " "
+    assert glyphs[0b000001] == "\U0001fb00"
+    assert glyphs[0b010101] == "▌"
+    assert glyphs[0b101010] == "▐"
+    assert glyphs[0b111110] == "\U0001fb3b"
+    assert glyphs[0b111111] == "█"
+    assert len(set(glyphs)) == 64
+
+
+def test_braille_glyphs() -> None:
+    glyphs = GLYPHS["braille"]
+
+    assert glyphs[0] == " "
+    assert glyphs[0b0000_0001] == "⠁"
+    assert glyphs[0b1111_1111] == "⣿"
+
+
+def test_paint_braille_canvas() -> None:
+    # A diagonal line through a 4x4 pixel canvas: two braille cells wide, one tall.
+    canvas = Canvas.from_colors(
+        width=4,
+        height=4,
+        colors={(0, 0): _RED, (1, 1): _BLUE, (2, 2): _BLUE, (3, 3): _RED},
+        mode="braille",
+    )
+
+    paint = paint_canvas(canvas, waxy.Rect(left=0, right=1, top=0, bottom=0))
+
+    assert {pos: (p.char, p.style.foreground) for pos, p in paint.items()} == {
+        Position(0, 0): ("⠑", _RED),
+        Position(1, 0): ("⢄", _BLUE),
+    }
+
+
+def test_paint_sextant_canvas_uses_content_color_as_background() -> None:
+    canvas = Canvas.from_colors(
+        width=2, height=3, colors={(0, 0): _RED}, mode="sextant", style=Style(content_color=_BLUE)
+    )
+
+    (p,) = paint_canvas(canvas, waxy.Rect(left=0, right=0, top=0, bottom=0)).values()
+
+    assert p.char == "\U0001fb00"
+    assert p.style == CellStyle(foreground=_RED, background=_BLUE)
+
+
+@pytest.mark.parametrize("mode", ["sextant", "braille"])
+def test_pack_numpy_matches_python(mode: SubCellMode) -> None:
+    pytest.importorskip("numpy")
+
+    rng = random.Random(mode)
+    width, height = 2 * 7, CELL_SIZES[mode][1] * 5
+    pixels = bytes(rng.choice((0, 0, 0, rng.randrange(256))) for _ in range(3 * width * height))
+
+    assert _pack_numpy(pixels, width, height, mode) == _pack_python(pixels, width, height, mode)
@@ -0,0 +1,109 @@
+import io
+
+import waxy
+
+from counterweight import app
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit
+from counterweight.elements import Chunk, LogView
+from counterweight.events import KeyPressed
+from counterweight.hooks import LogBuffer, use_log_buffer
+from counterweight.paint import paint_log_view
+from counterweight.styles.styles import CellStyle, Color
+from counterweight.styles.utilities import full, text_wrap_stable
+from tests.elements.conftest import rows
+
+
+def test_log_buffer_drops_oldest_lines() -> None:
+    buffer = LogBuffer(max_lines=3)
+
+    buffer.extend(str(i) for i in range(5))
+
+    assert len(buffer) == 3
+    assert [line.styled.text for line in buffer._lines] == ["2", "3", "4"]
+
+
+def test_log_buffer_version_counts_changes() -> None:
+    buffer = LogBuffer(max_lines=3)
+
+    buffer.append("a")
+    buffer.extend(["b", "c"])
+    buffer.clear()
+
+    assert buffer.version.value == 3
+    assert len(buffer) == 0
+
+
+def test_log_view_follows_the_end() -> None:
+    buffer = LogBuffer(max_lines=10)
+    buffer.extend(["one", "two", "three", "four"])
+
+    assert rows(LogView(buffer=buffer), 5, 2) == ["three", "four "]
+
+
+def test_log_view_with_offset() -> None:
+    buffer = LogBuffer(max_lines=10)
+    buffer.extend(["one", "two", "three", "four"])
+
+    assert rows(LogView(buffer=buffer, follow=False, offset=1), 5, 2) == ["two  ", "three"]
+
+
+def test_log_view_wraps_lines() -> None:
+    buffer = LogBuffer(max_lines=10)
+    buffer.extend(["aaa bbb", "ccc"])
+
+    assert rows(LogView(buffer=buffer, style=text_wrap_stable), 3, 3) == ["aaa", "bbb", "ccc"]
+    assert rows(LogView(buffer=buffer, style=text_wrap_stable), 3, 2) == ["bbb", "ccc"]
+
+
+def test_log_view_only_wraps_visible_lines() -> None:
+    buffer = LogBuffer(max_lines=100)
+    buffer.extend(str(i) for i in range(100))
+
+    rows(LogView(buffer=buffer, style=text_wrap_stable), 3, 2)
+
+    assert [line.width for line in buffer._lines].count(3) == 2
+
+
+def test_log_view_keeps_chunk_styles() -> None:
+    red = CellStyle(foreground=Color.from_name("red"))
+    buffer = LogBuffer(max_lines=10)
+    buffer.append([Chunk(content="E", style=red), Chunk(content="rr")])
+
+    paint = paint_log_view(LogView(buffer=buffer), waxy.Rect(left=0, right=2, top=0, bottom=0))
+
+    assert [p.style.foreground for p in paint.values()] == [
+        red.foreground,
+        CellStyle().foreground,
+        CellStyle().foreground,
+    ]
+
+
+async def test_use_log_buffer_rerenders_once_per_batch_of_appends() -> None:
+    renders: list[int] = []
+
+    @component
+    def root() -> LogView:
+        buffer = use_log_buffer(max_lines=100)
+        renders.append(len(buffer))
+
+        def on_key(event: KeyPressed) -> None:
+            for i in range(10):
+                buffer.append(f"line {i}")
+
+        return LogView(buffer=buffer, style=full, on_key=on_key)
+
+    capture = io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(6, 2),
+        autopilot=(
+            KeyPressed(key="f"),
+            PrintPaint(stream=capture, ansi=False),
+            Quit(),
+        ),
+    )
+
+    assert renders == [0, 0, 10]
+    assert capture.getvalue().rstrip("\n") == "line 8\nline 9"
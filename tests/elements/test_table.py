@@ -0,0 +1,102 @@
+import io
+
+from counterweight import app
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit
+from counterweight.elements import Column, Div, Table
+from counterweight.paint import table_offset
+from counterweight.shadow import ShadowChange, _classify_element_change
+from counterweight.styles.utilities import col, full
+from counterweight.table import ColumnSource, RowSource, filter_rows, sort_rows
+from tests.elements.conftest import rows
+
+ROWS = RowSource([("b", 2), ("a", 10), ("c", 1)])
+COLUMNS = (Column(header="name"), Column(header="n", justify="right"))
+
+
+class _CountingSource:
+    def __init__(self, rows: int) -> None:
+        self.rows = rows
+        self.reads: set[int] = set()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def cell(self, row: int, column: int) -> object:
+        self.reads.add(row)
+        return row
+
+
+def test_column_widths_fit_headers_and_values() -> None:
+    table = Table(columns=COLUMNS, source=ROWS)
+
+    assert table.widths == (4, 2)
+    assert table.cell_size == (7, 4)
+
+
+def test_fixed_column_width() -> None:
+    table = Table(columns=(Column(header="name", width=2), COLUMNS[1]), source=ROWS)
+
+    assert rows(table, 5, 2) == ["n…  n", "b   2"]
+
+
+def test_paint_table() -> None:
+    assert rows(Table(columns=COLUMNS, source=ROWS), 7, 4) == [
+        "name  n",
+        "b     2",
+        "a    10",
+        "c     1",
+    ]
+
+
+def test_paint_table_in_order() -> None:
+    order = sort_rows(ROWS, 1)
+
+    assert rows(Table(columns=COLUMNS, source=ROWS, order=order), 7, 4) == [
+        "name  n",
+        "c     1",
+        "b     2",
+        "a    10",
+    ]
+
+
+def test_only_visible_rows_are_read() -> None:
+    source = _CountingSource(1_000_000)
+    table = Table(columns=(Column(header="row", width=7),), source=source, offset=500_000, sample=0)
+
+    assert rows(table, 7, 3) == ["row    ", "500000 ", "500001 "]
+    assert source.reads == {500_000, 500_001}
+
+
+def test_selected_row_is_scrolled_into_view() -> None:
+    table = Table(columns=COLUMNS, source=ROWS, offset=0, selected=2)
+
+    assert table_offset(table, 2) == 1
+    assert table_offset(Table(columns=COLUMNS, source=ROWS, offset=2, selected=0), 2) == 0
+    assert table_offset(Table(columns=COLUMNS, source=ROWS, offset=5), 2) == 1
+
+
+def test_sort_and_filter_rows() -> None:
+    source = ColumnSource([["b", "a", "c"], [2, 10, 1]])
+
+    assert sort_rows(source, 0) == [1, 0, 2]
+    assert sort_rows(source, 1, reverse=True) == [1, 0, 2]
+    assert filter_rows(source, lambda row: source.cell(row, 1) != 10, order=[2, 1, 0]) == [2, 0]
+
+
+def test_scrolling_only_repaints() -> None:
+    previous = Table(columns=COLUMNS, source=ROWS)
+
+    assert _classify_element_change(Table(columns=COLUMNS, source=ROWS, offset=1), previous) is ShadowChange.PAINT
+    assert _classify_element_change(Table(columns=COLUMNS, source=ROWS, order=[0]), previous) is ShadowChange.LAYOUT
+
+
+async def test_table_in_app() -> None:
+    @component
+    def root() -> Div:
+        return Div(style=col, children=[Table(columns=COLUMNS, source=ROWS, style=full)])
+
+    stream = io.StringIO()
+    await app(root, headless=True, dimensions=(7, 3), autopilot=(PrintPaint(stream=stream, ansi=False), Quit()))
+
+    assert stream.getvalue().splitlines() == ["name  n", "b     2", "a    10"]
@@ -3,7 +3,8 @@ from collections.abc import Sequence
 import pytest
 
 from counterweight.elements import CellPaint, Chunk, Text
-from counterweight.styles import Style
+from counterweight.styles import CellStyle, Style
+from counterweight.styles.styles import Color
 
 
 def test_texts_have_no_children() -> None:
@@ -54,3 +55,43 @@ def test_chunk_space() -> None:
 
 def test_chunk_newline() -> None:
     assert Chunk.newline() == Chunk(content="\n")
+
+
+_RED = CellStyle(foreground=Color.from_name("red"))
+_BLUE = CellStyle(foreground=Color.from_name("blue"))
+
+
+def test_styled_text_merges_adjacent_chunks_with_the_same_style() -> None:
+    styled = Text(
+        content=[Chunk(content="ab", style=_RED), Chunk(content="cd", style=_RED), Chunk(content="ef", style=_BLUE)]
+    ).styled
+
+    assert styled.text == "abcdef"
+    assert styled.run_starts == (0, 4)
+    assert styled.run_styles == (_RED, _BLUE)
+
+
+def test_styled_text_is_interned() -> None:
+    assert Text(content="foo").styled is Text(content="foo").styled
+
+
+@pytest.mark.parametrize(
+    ("start", "end", "expected"),
+    (
+        (0, None, [("abcd", _RED), ("ef", _BLUE)]),
+        (1, 3, [("bc", _RED)]),
+        (3, 5, [("d", _RED), ("e", _BLUE)]),
+        (4, 6, [("ef", _BLUE)]),
+        (2, 2, []),
+    ),
+)
+def test_styled_text_runs(start: int, end: int | None, expected: list[tuple[str, CellStyle]]) -> None:
+    styled = Text(content=[Chunk(content="abcd", style=_RED), Chunk(content="ef", style=_BLUE)]).styled
+
+    assert list(styled.runs(start, end)) == expected
+
+
+def test_styled_text_style_at() -> None:
+    styled = Text(content=[Chunk(content="abcd", style=_RED), Chunk(content="ef", style=_BLUE)]).styled
+
+    assert [styled.style_at(i) for i in range(6)] == [_RED] * 4 + [_BLUE] * 2
@@ -0,0 +1,169 @@
+import io
+
+import pytest
+import waxy
+
+from counterweight import app
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit
+from counterweight.elements import Div, TextArea
+from counterweight.events import KeyPressed
+from counterweight.hooks import TextBuffer, use_text_buffer
+from counterweight.keys import Key
+from counterweight.paint import paint_text_area
+from counterweight.styles.utilities import col, full, text_wrap_stable
+from tests.elements.conftest import rows
+
+
+def _type(buffer: TextBuffer, *keys: str) -> None:
+    for key in keys:
+        buffer.handle_key(KeyPressed(key=key))
+
+
+def test_insert_and_move() -> None:
+    buffer = TextBuffer("hello\nworld")
+
+    _type(buffer, Key.Down, Key.End, "!", Key.Up, Key.Right, Key.Enter)
+
+    assert buffer.text == "hello\n\nworld!"
+    assert buffer.cursor == (2, 0)
+
+
+def test_backspace_and_delete_join_paragraphs() -> None:
+    buffer = TextBuffer("ab\ncd")
+
+    _type(buffer, Key.Down, Key.Backspace)
+    assert buffer.text == "abcd"
+    assert buffer.cursor == (0, 2)
+
+    _type(buffer, Key.Enter, Key.Left, Key.Delete)
+    assert buffer.text == "abcd"
+
+
+def test_vertical_movement_keeps_column() -> None:
+    buffer = TextBuffer("abcd\na\nabcd")
+
+    _type(buffer, Key.End, Key.Down)
+    assert buffer.cursor == (1, 1)
+
+    _type(buffer, Key.Down)
+    assert buffer.cursor == (2, 4)
+
+
+def test_single_line_buffer_replaces_newlines() -> None:
+    buffer = TextBuffer("a\nb", multiline=False)
+
+    _type(buffer, Key.Enter, Key.Down)
+    buffer.insert("c\nd")
+
+    assert buffer.text == "c da b"
+    assert buffer.paragraph_count == 1
+
+
+def test_tab_is_expanded_to_the_next_tab_stop() -> None:
+    buffer = TextBuffer("ab")
+    _type(buffer, Key.End, Key.Tab, "c", Key.Tab, Key.Tab)
+
+    assert buffer.text == "ab  c       "
+    assert buffer.cursor == (0, 12)
+    assert "\t" not in "".join(rows(TextArea(buffer=buffer, cursor=False), 12, 1))
+
+
+def test_tabs_in_inserted_text_are_expanded() -> None:
+    buffer = TextBuffer("a\tb\nc")
+    _type(buffer, Key.End)
+    buffer.insert("\tx\n\ty")
+
+    assert buffer.text == "a   b   x\n    y\nc"
+
+
+def test_single_line_buffer_leaves_tab_to_the_application() -> None:
+    buffer = TextBuffer("ab", multiline=False)
+
+    assert not buffer.handle_key(KeyPressed(key=Key.Tab))
+    assert buffer.text == "ab"
+
+
+def test_unhandled_key() -> None:
+    assert not TextBuffer().handle_key(KeyPressed(key=Key.F1))
+
+
+@pytest.mark.parametrize(
+    ("keys", "expected"),
+    (
+        ((), ["aaa bbb", "ccc"]),
+        ((Key.Down, Key.Down, Key.Down), ["", "ddd"]),
+        ((Key.Down, Key.Down, Key.Down, Key.Up), ["", "ddd"]),
+        ((Key.Down, Key.Down, Key.Down, Key.Up, Key.Up), ["ccc", ""]),
+        ((Key.Down, Key.Down, Key.Down, Key.Up, Key.Up, Key.Up), ["aaa bbb", "ccc"]),
+    ),
+)
+def test_window_scrolls_to_cursor(keys: tuple[str, ...], expected: list[str]) -> None:
+    buffer = TextBuffer("aaa bbb\nccc\n\nddd")
+    rows, _ = buffer.window("none", 7, 2)
+    for key in keys:
+        _type(buffer, key)
+        rows, _ = buffer.window("none", 7, 2)
+
+    assert [text[line.start : line.end] for text, line in rows] == expected
+
+
+def test_window_wraps_paragraphs() -> None:
+    buffer = TextBuffer("aaa bbb\nccc")
+    _type(buffer, Key.Down)
+
+    rows, cursor = buffer.window("stable", 3, 3)
+
+    assert [text[line.start : line.end] for text, line in rows] == ["aaa", "bbb", "ccc"]
+    assert cursor == (0, 2)
+
+
+def test_single_line_scrolls_sideways() -> None:
+    buffer = TextBuffer("abcdefgh", multiline=False)
+    _type(buffer, Key.End)
+
+    assert rows(TextArea(buffer=buffer), 4, 1) == ["fgh "]
+
+
+def test_cursor_is_painted_inverted() -> None:
+    buffer = TextBuffer("ab")
+    _type(buffer, Key.Right)
+
+    paint = paint_text_area(TextArea(buffer=buffer), waxy.Rect(left=0, right=1, top=0, bottom=0))
+    a, b = (paint[pos] for pos in sorted(paint))
+
+    assert (b.style.foreground, b.style.background) == (a.style.background, a.style.foreground)
+
+
+def test_editing_only_repaints_the_edited_rows() -> None:
+    buffer = TextBuffer("one\ntwo\nthree")
+    area = TextArea(buffer=buffer, cursor=False, style=text_wrap_stable)
+    rect = waxy.Rect(left=0, right=4, top=0, bottom=2)
+
+    before = paint_text_area(area, rect)
+    buffer.insert("x")
+    after = paint_text_area(area, rect)
+
+    changed = {pos.y for pos in before if before[pos] is not after[pos]}
+    assert changed == {0}
+
+
+async def test_text_area_in_app() -> None:
+    @component
+    def root() -> Div:
+        buffer = use_text_buffer("hi")
+
+        def on_key(event: KeyPressed) -> None:
+            buffer.handle_key(event)
+
+        return Div(style=col, children=[TextArea(buffer=buffer, cursor=False, style=full)], on_key=on_key)
+
+    stream = io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(4, 2),
+        autopilot=(KeyPressed(key="!"), PrintPaint(stream=stream, ansi=False), Quit()),
+    )
+
+    assert stream.getvalue().splitlines() == ["!hi ", "    "]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from time import monotonic
+
+from counterweight.app import app
+from counterweight.clock import VirtualClock
+from counterweight.components import Component
+from counterweight.controls import AnyControl, Quit, Wait
+from counterweight.events import AnyEvent
+
+
+def until(done: Callable[[], bool], step: float = 0.01, timeout: float = 10) -> Iterator[AnyControl]:
+    """
+    An autopilot that waits, `step` seconds of virtual time at a time, until `done()`, and then quits.
+
+    Hooks that wait on real I/O (e.g., a subprocess) can take any number of steps to finish,
+    so this gives up (and quits anyway) after `timeout` seconds of real time.
+    """
+    deadline = monotonic() + timeout
+    while not done() and monotonic() < deadline:
+        yield Wait(seconds=step)
+    yield Quit()
+
+
+async def run_headless(
+    root: Callable[[], Component],
+    autopilot: Iterable[AnyEvent | AnyControl],
+    dimensions: tuple[int, int] = (10, 3),
+) -> VirtualClock:
+    """Run an application headlessly, on a virtual clock, and return the clock."""
+    clock = VirtualClock()
+    await app(root, headless=True, dimensions=dimensions, autopilot=autopilot, clock=clock)
+    return clock
@@ -0,0 +1,85 @@
+from asyncio import sleep
+from collections.abc import AsyncIterator
+
+from counterweight.components import component
+from counterweight.controls import Quit, Wait
+from counterweight.elements import Div, Text
+from counterweight.events import KeyPressed
+from counterweight.hooks import AsyncIterMode, AsyncIterState, Ref, use_async_iter, use_ref, use_state
+from tests.hooks.conftest import run_headless, until
+
+
+async def _count(n: int, delay: float = 0, start: int = 0) -> AsyncIterator[int]:
+    for i in range(start, start + n):
+        await sleep(delay)
+        yield i
+
+
+async def _run(
+    source: AsyncIterator[int],
+    mode: AsyncIterMode,
+    max_rate: float | None = 60,
+    max_buffer: int = 1_000,
+) -> list[AsyncIterState[int]]:
+    snapshots: list[AsyncIterState[int]] = []
+
+    @component
+    def root() -> Div:
+        state = use_async_iter(source, mode=mode, max_rate=max_rate, max_buffer=max_buffer)
+        snapshots.append(state)
+        return Div(children=[Text(content=str(state.latest))])
+
+    await run_headless(root, until(lambda: bool(snapshots) and snapshots[-1].done), dimensions=(10, 1))
+
+    return snapshots
+
+
+async def test_latest_mode_counts_dropped_items() -> None:
+    snapshots = await _run(_count(10_000), mode="latest")
+    final = snapshots[-1]
+
+    assert final.done
+    assert final.latest == 9_999
+    assert final.items == ()
+    assert final.received == 10_000
+    # Every item was either rendered or counted as dropped.
+    seen = {snapshot.latest for snapshot in snapshots if snapshot.latest is not None}
+    assert final.dropped + len(seen) == final.received
+    assert len(snapshots) < 100
+
+
+async def test_buffer_mode_keeps_most_recent_items() -> None:
+    final = (await _run(_count(100), mode="buffer", max_buffer=10))[-1]
+
+    assert final.items == tuple(range(90, 100))
+    assert final.dropped == 90
+
+
+async def test_max_rate_limits_renders() -> None:
+    snapshots = await _run(_count(50, delay=0.01), mode="latest", max_rate=5)
+
+    assert snapshots[-1].latest == 49
+    assert len(snapshots) < 10
+
+
+async def test_switching_source_resets_state() -> None:
+    snapshots: list[tuple[int, AsyncIterState[int]]] = []
+
+    @component
+    def root() -> Div:
+        sources: Ref[tuple[AsyncIterator[int], ...]] = use_ref(lambda: (_count(20), _count(3, start=100)))
+        index, set_index = use_state(0)
+        state = use_async_iter(sources.current[index], mode="buffer", max_buffer=10)
+        snapshots.append((index, state))
+
+        def on_key(event: KeyPressed) -> None:
+            set_index(1)
+
+        return Div(children=[Text(content=str(state.latest))], on_key=on_key)
+
+    await run_headless(root, [Wait(seconds=0.1), KeyPressed(key="n"), Wait(seconds=0.1), Quit()], dimensions=(10, 1))
+
+    assert snapshots[-1] == (1, AsyncIterState(latest=102, items=(100, 101, 102), received=3, dropped=0, done=True))
+    # Nothing from the first source is carried over, not even in the render that switched sources.
+    first_after_switch = next(state for index, state in snapshots if index == 1)
+    assert first_after_switch == AsyncIterState(latest=None, items=(), received=0, dropped=0, done=False)
@@ -0,0 +1,113 @@
+import io
+
+from counterweight import app
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit
+from counterweight.elements import Div, Text
+from counterweight.events import KeyPressed
+from counterweight.hooks import Store, use_store
+from counterweight.styles.utilities import col
+
+
+async def test_use_store_only_rerenders_subscribers() -> None:
+    store = Store({"a": 0, "b": 0})
+    renders: list[str] = []
+
+    @component
+    def reader(key: str) -> Text:
+        value = use_store(store, lambda s: s[key])
+        renders.append(f"{key}={value}")
+        return Text(content=f"{key}={value}")
+
+    @component
+    def bystander() -> Text:
+        renders.append("bystander")
+        return Text(content="-")
+
+    @component
+    def root() -> Div:
+        renders.append("root")
+
+        def on_key(event: KeyPressed) -> None:
+            store.set(lambda s: {**s, "a": s["a"] + 1})
+
+        return Div(style=col, children=[reader("a"), reader("b"), bystander()], on_key=on_key)
+
+    capture = io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(3, 3),
+        autopilot=(
+            KeyPressed(key="f"),
+            PrintPaint(stream=capture, ansi=False),
+            Quit(),
+        ),
+    )
+
+    # warmup render + initial render, then only the subscriber to "a" re-renders
+    first_render = ["root", "a=0", "b=0", "bystander"]
+    assert renders == [*first_render, *first_render, "a=1"]
+    assert capture.getvalue().rstrip("\n") == "\n".join(["a=1", "b=0", "-  "])
+
+
+async def test_use_store_skips_render_when_selection_unchanged() -> None:
+    store = Store({"a": 0, "b": 0})
+    renders: list[int] = []
+
+    @component
+    def root() -> Div:
+        value = use_store(store, lambda s: s["a"])
+        renders.append(value)
+
+        def on_key(event: KeyPressed) -> None:
+            store.set(lambda s: {**s, "b": s["b"] + 1})
+
+        return Div(on_key=on_key)
+
+    await app(
+        root,
+        headless=True,
+        autopilot=(
+            KeyPressed(key="f"),
+            Quit(),
+        ),
+    )
+
+    assert renders == [0, 0]
+
+
+async def test_use_store_batches_updates_into_one_render() -> None:
+    store = Store(0)
+    renders: list[int] = []
+
+    @component
+    def root() -> Div:
+        value = use_store(store, lambda s: s)
+        renders.append(value)
+
+        def on_key(event: KeyPressed) -> None:
+            for _ in range(100):
+                store.set(lambda s: s + 1)
+
+        return Div(on_key=on_key)
+
+    await app(
+        root,
+        headless=True,
+        autopilot=(
+            KeyPressed(key="f"),
+            Quit(),
+        ),
+    )
+
+    assert renders == [0, 0, 100]
+
+
+def test_store_without_subscribers_does_not_need_an_event_loop() -> None:
+    store = Store(1)
+
+    store.set(2)
+
+    assert store.value == 2
+    assert store.notify() is False
@@ -0,0 +1,84 @@
+import os
+import sys
+from collections.abc import Callable
+
+import pytest
+
+from counterweight.clock import VirtualClock
+from counterweight.components import component
+from counterweight.elements import Div, LogView
+from counterweight.hooks import Subprocess, use_subprocess
+from counterweight.styles.styles import CellStyle, Color
+from counterweight.styles.utilities import full
+from tests.hooks.conftest import run_headless, until
+
+SCRIPT = "import sys; print('one'); print('\\x1b[31mtwo\\x1b[0m', file=sys.stderr); sys.exit(3)"
+
+
+async def _run(
+    cmd: list[str],
+    max_rate: float | None = 60,
+    done: Callable[[Subprocess], bool] = lambda process: process.returncode is not None,
+) -> tuple[list[Subprocess], VirtualClock]:
+    snapshots: list[Subprocess] = []
+
+    @component
+    def root() -> Div:
+        process = use_subprocess(cmd, max_rate=max_rate)
+        snapshots.append(process)
+        return Div(children=[LogView(buffer=process.output, style=full)])
+
+    clock = await run_headless(root, until(lambda: bool(snapshots) and done(snapshots[-1])))
+
+    return snapshots, clock
+
+
+async def test_use_subprocess_collects_output() -> None:
+    snapshots, _ = await _run([sys.executable, "-c", SCRIPT])
+    final = snapshots[-1]
+
+    assert final.returncode == 3
+    assert [(styled.text, styled.style_at(0)) for styled, _ in final.output.window("none", 10, 3, start=0)] == [
+        ("one", CellStyle()),
+        ("two", CellStyle(foreground=Color(205, 0, 0))),
+    ]
+
+
+async def test_use_subprocess_renders_at_most_once_per_frame() -> None:
+    # A burst of output is appended in many reads, but only causes a handful of renders.
+    snapshots, _ = await _run([sys.executable, "-c", "for i in range(100_000): print(i)"])
+
+    assert snapshots[-1].returncode == 0
+    assert len(snapshots[-1].output) == 1_000
+    assert len(snapshots) < 100
+
+
+async def test_use_subprocess_renders_at_most_max_rate_times_per_second() -> None:
+    # The process writes a line every few milliseconds, each in its own read.
+    script = "import sys, time\nfor i in range(100):\n    print(i, flush=True)\n    time.sleep(0.005)"
+    snapshots, clock = await _run([sys.executable, "-c", script], max_rate=10)
+
+    assert snapshots[-1].returncode == 0
+    assert len(snapshots[-1].output) == 100
+    # The rate is measured on the loop's (virtual) clock; a few more renders come from mounting and exiting.
+    assert len(snapshots) <= 10 * clock.elapsed + 4
+
+
+async def test_use_subprocess_joins_crlf_split_across_reads() -> None:
+    script = "import sys, time\nsys.stdout.buffer.write(b'a\\r'); sys.stdout.flush(); time.sleep(0.1)\nsys.stdout.buffer.write(b'\\nb\\r\\n')"
+    snapshots, _ = await _run([sys.executable, "-c", script])
+
+    assert snapshots[-1].returncode == 0
+    assert [styled.text for styled, _ in snapshots[-1].output.window("none", 10, 3, start=0)] == ["a", "b"]
+
+
+async def test_use_subprocess_kills_process_when_unmounted() -> None:
+    snapshots, _ = await _run(
+        [sys.executable, "-c", "import os, time; print(os.getpid(), flush=True); time.sleep(60)"],
+        done=lambda process: len(process.output) > 0,
+    )
+
+    assert snapshots[-1].returncode is None
+    (styled, _), *_ = snapshots[-1].output.window("none", 10, 1, start=0)
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(styled.text), 0)
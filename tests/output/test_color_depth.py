@@ -0,0 +1,82 @@
+import pytest
+
+from counterweight.ansi import PALETTE_256
+from counterweight.output import (
+    ColorDepth,
+    detect_color_depth,
+    quantize_16,
+    quantize_256,
+    sgr_delta,
+    sgr_from_cell_style,
+)
+from counterweight.styles import CellStyle
+from counterweight.styles.styles import Color
+
+
+@pytest.mark.parametrize(
+    ("environ", "expected"),
+    (
+        ({}, "truecolor"),
+        ({"TERM": "xterm-256color", "COLORTERM": "truecolor"}, "truecolor"),
+        ({"TERM": "xterm-256color", "COLORTERM": "24bit"}, "truecolor"),
+        ({"TERM": "xterm-direct"}, "truecolor"),
+        ({"TERM": "xterm-256color"}, "256"),
+        ({"TERM": "screen-256color"}, "256"),
+        ({"TERM": "xterm"}, "16"),
+        ({"TERM": "linux"}, "16"),
+    ),
+)
+def test_detect_color_depth(environ: dict[str, str], expected: ColorDepth) -> None:
+    assert detect_color_depth(environ) == expected
+
+
+@pytest.mark.parametrize("index", range(16, 256))
+def test_quantize_256_is_exact_for_palette_colors(index: int) -> None:
+    # Some grays are in both the cube and the ramp, so compare colors rather than indexes.
+    assert PALETTE_256[quantize_256(PALETTE_256[index])] == PALETTE_256[index]
+
+
+@pytest.mark.parametrize(
+    ("color", "expected"),
+    (
+        (Color(0, 0, 0), 16),
+        (Color(255, 255, 255), 231),
+        (Color(250, 10, 5), 196),
+        (Color(128, 128, 130), 244),
+    ),
+)
+def test_quantize_256(color: Color, expected: int) -> None:
+    assert quantize_256(color) == expected
+
+
+@pytest.mark.parametrize(
+    ("color", "expected"),
+    (
+        (Color(0, 0, 0), 0),
+        (Color(200, 10, 10), 1),
+        (Color(250, 250, 250), 15),
+        (Color(100, 100, 250), 12),
+    ),
+)
+def test_quantize_16(color: Color, expected: int) -> None:
+    assert quantize_16(color) == expected
+
+
+@pytest.mark.parametrize(
+    ("color_depth", "expected"),
+    (
+        ("truecolor", "\x1b[38;2;250;10;5m\x1b[48;2;0;0;0m\x1b[1m"),
+        ("256", "\x1b[38;5;196m\x1b[48;5;16m\x1b[1m"),
+        ("16", "\x1b[91m\x1b[40m\x1b[1m"),
+    ),
+)
+def test_sgr_at_color_depth(color_depth: ColorDepth, expected: str) -> None:
+    assert sgr_from_cell_style(CellStyle(foreground=Color(250, 10, 5), bold=True), color_depth) == expected
+
+
+def test_delta_skips_colors_that_quantize_the_same() -> None:
+    a = CellStyle(foreground=Color(250, 10, 5))
+    b = CellStyle(foreground=Color(255, 0, 0))
+
+    assert sgr_delta(a, b, "truecolor") == "\x1b[38;2;255;0;0m"
+    assert sgr_delta(a, b, "256") == ""
@@ -1,7 +1,8 @@
 import pytest
 
+from counterweight import output
 from counterweight.geometry import Position
-from counterweight.output import move_to, paint_to_instructions, sgr_from_cell_style
+from counterweight.output import move_to, paint_to_instructions, sgr_delta, sgr_from_cell_style
 from counterweight.paint import P
 from counterweight.styles import CellStyle
 from counterweight.styles.styles import Color
@@ -31,22 +32,87 @@ def cell(char: str, style: CellStyle = DEFAULT, z: int = 0) -> P:
             {Position(0, 0): cell("A")},
             f"{mt(0, 0)}{sgr(DEFAULT)}A{RESET}",
         ),
-        # two adjacent cells — each gets its own escape sequence
+        # two adjacent cells in the same style — one move and one escape sequence
         (
             {Position(0, 0): cell("A"), Position(1, 0): cell("B")},
-            f"{mt(0, 0)}{sgr(DEFAULT)}A{RESET}{mt(1, 0)}{sgr(DEFAULT)}B{RESET}",
+            f"{mt(0, 0)}{sgr(DEFAULT)}AB{RESET}",
         ),
-        # style change mid-row
+        # style change mid-row — only the changed attribute is emitted
         (
             {Position(0, 0): cell("A"), Position(1, 0): cell("B", RED_FG)},
-            f"{mt(0, 0)}{sgr(DEFAULT)}A{RESET}{mt(1, 0)}{sgr(RED_FG)}B{RESET}",
+            f"{mt(0, 0)}{sgr(DEFAULT)}A\x1b[38;2;255;0;0mB{RESET}",
         ),
         # different rows
         (
             {Position(0, 0): cell("A"), Position(0, 1): cell("B")},
-            f"{mt(0, 0)}{sgr(DEFAULT)}A{RESET}{mt(0, 1)}{sgr(DEFAULT)}B{RESET}",
+            f"{mt(0, 0)}{sgr(DEFAULT)}A{mt(0, 1)}B{RESET}",
         ),
+        # a gap in the row
+        (
+            {Position(0, 0): cell("A"), Position(2, 0): cell("B")},
+            f"{mt(0, 0)}{sgr(DEFAULT)}A{mt(2, 0)}B{RESET}",
+        ),
+        # control characters are drawn as spaces
+        (
+            {Position(0, 0): cell("a"), Position(1, 0): cell("\t"), Position(2, 0): cell("b")},
+            f"{mt(0, 0)}{sgr(DEFAULT)}a b{RESET}",
+        ),
+        (
+            {Position(0, 0): cell("\x1b"), Position(1, 0): cell("\r")},
+            f"{mt(0, 0)}{sgr(DEFAULT)}  {RESET}",
+        ),
+        # non-ASCII single-width characters don't need a move after them
+        (
+            {Position(0, 0): cell("é"), Position(1, 0): cell("─")},
+            f"{mt(0, 0)}{sgr(DEFAULT)}é─{RESET}",
+        ),
+        # the cursor is moved explicitly after characters that aren't one column wide
+        (
+            {Position(0, 0): cell("界"), Position(1, 0): cell("b"), Position(2, 0): cell("c")},
+            f"{mt(0, 0)}{sgr(DEFAULT)}界{mt(1, 0)}bc{RESET}",
+        ),
+        (
+            {Position(0, 0): cell("\u0301"), Position(1, 0): cell("b")},
+            f"{mt(0, 0)}{sgr(DEFAULT)}\u0301{mt(1, 0)}b{RESET}",
+        ),
+        # no cells
+        ({}, ""),
     ),
 )
 def test_paint_to_instructions(paint: dict[Position, P], expected: str) -> None:
     assert paint_to_instructions(paint) == expected
+
+
+@pytest.mark.parametrize(
+    ("previous", "next", "expected"),
+    (
+        (DEFAULT, DEFAULT, ""),
+        (DEFAULT, RED_FG, "\x1b[38;2;255;0;0m"),
+        (DEFAULT, CellStyle(background=Color(1, 2, 3), italic=True), "\x1b[48;2;1;2;3;3m"),
+        (CellStyle(bold=True, dim=True), CellStyle(dim=True), "\x1b[22;2m"),
+        (CellStyle(dim=True), CellStyle(bold=True, dim=True), "\x1b[1m"),
+        (CellStyle(underline=True, strikethrough=True), CellStyle(strikethrough=True), "\x1b[24m"),
+        (CellStyle(italic=True), CellStyle(strikethrough=True), "\x1b[23;9m"),
+    ),
+)
+def test_sgr_delta(previous: CellStyle, next: CellStyle, expected: str) -> None:
+    assert sgr_delta(previous, next) == expected
+
+
+def test_equal_styles_have_equal_ids() -> None:
+    assert CellStyle(bold=True).id == CellStyle(bold=True).id
+    assert CellStyle(bold=True).id != CellStyle(dim=True).id
+
+
+def test_generated_styles_do_not_grow_caches_without_limit() -> None:
+    # e.g., a gradient on a canvas, which creates new styles all the time
+    for i in range(2 * output._MAX_CACHED_SGRS):
+        style = CellStyle(foreground=Color(i % 256, i // 256 % 256, 0))
+        paint = {Position(0, 0): P(char="x", style=DEFAULT, z=0), Position(1, 0): P(char="x", style=style, z=0)}
+        assert (
+            paint_to_instructions(paint)
+            == f"{move_to(Position(0, 0))}{sgr(DEFAULT)}x{sgr_delta(DEFAULT, style)}x{RESET}"
+        )
+
+    assert len(output._SGR_BY_ID) <= output._MAX_CACHED_SGRS
+    assert len(output._SGR_DELTA_BY_IDS) <= output._MAX_CACHED_SGRS
@@ -1,3 +1,5 @@
+from threading import Thread
+
 import pytest
 import waxy
 
@@ -116,3 +118,40 @@ def test_absolute_merge_with_visual() -> None:
     assert result.layout.inset_left == waxy.Length(3)
     assert result.layout.inset_top == waxy.Length(5)
     assert result.layout.border_top == waxy.Length(1)
+
+
+def test_composition_is_cached_by_identity() -> None:
+    assert position_relative | border_heavy is position_relative | border_heavy
+
+
+def test_composing_on_another_thread_is_refused() -> None:
+    errors: list[str] = []
+
+    def compose() -> None:
+        # The styles are created (and must be dropped) on this thread, so only the message leaves it, not the traceback.
+        try:
+            Style(border_kind=BorderKind.Heavy) | Style(z=1)
+        except AssertionError as e:
+            errors.append(str(e))
+
+    thread = Thread(target=compose)
+    thread.start()
+    thread.join()
+
+    assert errors == ["Styles can only be composed on the thread that imported them"]
+
+
+def test_equal_compositions_share_an_identity() -> None:
+    left = Style(border_kind=BorderKind.Heavy) | Style(layout=waxy.Style(flex_grow=1.0))
+    right = Style(layout=waxy.Style(flex_grow=1.0)) | Style(border_kind=BorderKind.Heavy)
+
+    assert left is right
+
+
+def test_compositions_with_different_layouts_are_distinct() -> None:
+    left = border_heavy | Style(layout=waxy.Style(flex_grow=1.0))
+    right = border_heavy | Style(layout=waxy.Style(flex_grow=2.0))
+
+    assert left == right  # layout isn't compared...
+    assert left is not right  # ...but it is part of a style's identity
+    assert right.layout.flex_grow == 2.0
@@ -0,0 +1,76 @@
+import pytest
+
+from counterweight.ansi import PALETTE_256, AnsiDecoder, parse_ansi
+from counterweight.elements import Chunk
+from counterweight.styles.styles import CellStyle, Color
+
+RED = Color(205, 0, 0)
+DEFAULT = CellStyle()
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    (
+        ("plain", (Chunk(content="plain"),)),
+        ("", ()),
+        (
+            "a\x1b[31mb\x1b[0mc",
+            (Chunk(content="a"), Chunk(content="b", style=CellStyle(foreground=RED)), Chunk(content="c")),
+        ),
+        (
+            "\x1b[1;4mx\x1b[22my",
+            (
+                Chunk(content="x", style=CellStyle(bold=True, underline=True)),
+                Chunk(content="y", style=CellStyle(underline=True)),
+            ),
+        ),
+        ("\x1b[38;5;196mx", (Chunk(content="x", style=CellStyle(foreground=Color(255, 0, 0))),)),
+        (
+            "\x1b[48;2;1;2;3mx\x1b[49my",
+            (Chunk(content="x", style=CellStyle(background=Color(1, 2, 3))), Chunk(content="y")),
+        ),
+        ("\x1b[92mx\x1b[39my", (Chunk(content="x", style=CellStyle(foreground=Color(0, 255, 0))), Chunk(content="y"))),
+        # Non-SGR sequences are dropped, and runs in the same style are merged.
+        ("a\x1b[2Kb\x1b]0;title\x07c\x1b[0md", (Chunk(content="abcd"),)),
+    ),
+)
+def test_parse_ansi(text: str, expected: tuple[Chunk, ...]) -> None:
+    assert parse_ansi(text) == expected
+
+
+def test_reset_returns_to_the_given_style() -> None:
+    base = CellStyle(foreground=Color(1, 1, 1))
+
+    assert parse_ansi("\x1b[31ma\x1b[0mb", base) == (
+        Chunk(content="a", style=CellStyle(foreground=RED)),
+        Chunk(content="b", style=base),
+    )
+    assert parse_ansi("\x1b[39mc", base) == (Chunk(content="c", style=base),)
+
+
+def test_palette() -> None:
+    assert len(PALETTE_256) == 256
+    assert PALETTE_256[16] == Color(0, 0, 0)
+    assert PALETTE_256[231] == Color(255, 255, 255)
+    assert PALETTE_256[255] == Color(238, 238, 238)
+
+
+@pytest.mark.parametrize("split", range(1, len("a\x1b[31mb\x1b]0;t\x1b\\c")))
+def test_decoder_handles_sequences_split_across_reads(split: int) -> None:
+    data = "a\x1b[31mb\x1b]0;t\x1b\\c"
+    decoder = AnsiDecoder()
+
+    chunks = (*decoder.feed(data[:split]), *decoder.feed(data[split:]))
+
+    assert "".join(chunk.content for chunk in chunks) == "abc"
+    assert chunks[-1].style == CellStyle(foreground=RED)
+
+
+def test_decoder_lines_carry_style() -> None:
+    decoder = AnsiDecoder()
+
+    assert decoder.feed_lines("\x1b[31mone\ntw") == [(Chunk(content="one", style=CellStyle(foreground=RED)),)]
+    assert decoder.feed_lines("o\x1b[0m\nthree") == [
+        (Chunk(content="tw", style=CellStyle(foreground=RED)), Chunk(content="o", style=CellStyle(foreground=RED)))
+    ]
+    assert decoder.flush() == (Chunk(content="three"),)
@@ -3,10 +3,16 @@ from __future__ import annotations
 import io
 from collections.abc import Callable
 
+import pytest
+
 from counterweight.app import app
+from counterweight.border_healing import BorderHealer, heal_borders
 from counterweight.components import Component, component
 from counterweight.controls import PrintPaint, Quit
 from counterweight.elements import Div, Text
+from counterweight.geometry import Position
+from counterweight.paint import P, Paint
+from counterweight.styles.styles import CellStyle, JoinedBorderKind
 from counterweight.styles.utilities import (
     align_children_center,
     align_self_stretch,
@@ -190,3 +196,64 @@ async def test_doc_example_border_healing() -> None:
             "╚════════════════════════════╩═════════╩═════════╩═════════╝",
         ]
     )
+
+
+# ---------------------------------------------------------------------------
+# Lookup tables and incremental healing
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("kind", list(JoinedBorderKind))
+def test_select_finds_every_part_by_its_connections(kind: JoinedBorderKind) -> None:
+    parts = kind.value
+
+    assert parts.select(top=True, bottom=True, left=False, right=False) == parts.vertical
+    assert parts.select(top=False, bottom=False, left=True, right=True) == parts.horizontal
+    assert parts.select(top=False, bottom=True, left=False, right=True) == parts.left_top
+    assert parts.select(top=True, bottom=False, left=True, right=False) == parts.right_bottom
+    assert parts.select(top=True, bottom=True, left=True, right=False) == parts.vertical_left
+    assert parts.select(top=False, bottom=True, left=True, right=True) == parts.horizontal_bottom
+    assert parts.select(top=True, bottom=True, left=True, right=True) == parts.horizontal_vertical
+    assert parts.select(top=True, bottom=False, left=False, right=False) is None
+    assert parts.select(top=False, bottom=False, left=False, right=False) is None
+
+
+def test_connects_left_includes_right_corners() -> None:
+    parts = JoinedBorderKind.Light.value
+
+    assert parts.connects_left == {"─", "┐", "┘", "┤", "┴", "┬", "┼"}
+
+
+_STYLE = CellStyle()
+
+
+def _paint(lines: list[str]) -> Paint:
+    return {Position(x, y): P(char=c, style=_STYLE, z=0) for y, line in enumerate(lines) for x, c in enumerate(line)}
+
+
+def test_border_healer_matches_heal_borders_across_frames() -> None:
+    parts = JoinedBorderKind.Light.value
+    both = {Position(2, 0): parts, Position(2, 2): parts}
+    bottom = {Position(2, 2): parts}
+
+    frames = [
+        (["┌─┐─┐", "│ │ │", "└─┘─┘"], both),
+        (["┌─┐─┐", "│ │ │", "└─┘─┘"], both),  # unchanged
+        (["┌─┐─┐", "│ │ │", "└─┘─┘"], bottom),  # the top seam is no longer hinted, but its cells are unchanged
+        (["┌─┐─┐", "│ │ │", "└─┘─┘"], both),  # and hinted again
+        (["┌─┐──", "│ │  ", "└─┘─┘"], both),  # the top-right corner is gone
+        (["┌─X─┐", "│ │ │", "└─┘─┘"], both),  # the top seam is covered
+        (["┌─X─┐", "│ │ │", "└─┘─┘", "hello"], both),  # text changed away from the borders
+    ]
+
+    healer = BorderHealer()
+    previous: Paint = {}
+    screen: Paint = {}
+    for lines, hints in frames:
+        paint = _paint(lines)
+        damage = {position: cell for position, cell in paint.items() if previous.get(position) != cell}
+
+        screen |= damage | healer.heal(paint, hints, damage)
+
+        assert screen == paint | heal_borders(paint, hints)
+        previous = paint
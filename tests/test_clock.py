@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from asyncio import get_running_loop, sleep
+from time import perf_counter
+from xml.etree.ElementTree import ElementTree
+
+import pytest
+
+from counterweight.app import app
+from counterweight.clock import VirtualClock
+from counterweight.components import component
+from counterweight.controls import Quit, Screenshot, Wait
+from counterweight.elements import Text
+from counterweight.hooks import use_effect, use_state
+
+
+@component
+def stopwatch() -> Text:
+    seconds, set_seconds = use_state(0)
+
+    async def tick() -> None:
+        while True:
+            await sleep(1)
+            set_seconds(lambda s: s + 1)
+
+    use_effect(tick, deps=())
+
+    return Text(content=f"{seconds}s")
+
+
+async def test_timers_run_faster_than_real_time() -> None:
+    clock = VirtualClock()
+    screenshots: list[ElementTree] = []
+
+    start = perf_counter()
+    await app(
+        stopwatch,
+        headless=True,
+        dimensions=(10, 1),
+        autopilot=[Wait(seconds=60.5), Screenshot(handler=screenshots.append), Quit()],
+        clock=clock,
+    )
+
+    assert perf_counter() - start < 5
+    assert clock.elapsed == pytest.approx(60.5)
+    assert len(screenshots) == 1
+    root = screenshots[0].getroot()
+    assert root is not None
+    assert "60s" in "".join(root.itertext())
+
+
+async def test_the_loop_returns_to_real_time_afterwards() -> None:
+    loop = get_running_loop()
+    clock = VirtualClock()
+
+    clock.attach(loop)
+    try:
+        before = loop.time()
+        await sleep(3600)
+        assert loop.time() - before == pytest.approx(3600)
+    finally:
+        clock.detach()
+
+    assert "time" not in vars(loop)
+    assert clock.elapsed == pytest.approx(3600)
+
+    start = perf_counter()
+    await sleep(0.01)
+    assert perf_counter() - start >= 0.01
+
+
+async def test_virtual_clock_requires_headless() -> None:
+    with pytest.raises(ValueError):
+        await app(stopwatch, clock=VirtualClock())
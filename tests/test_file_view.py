@@ -0,0 +1,181 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from counterweight import app
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit, Wait
+from counterweight.elements import Div
+from counterweight.events import KeyPressed
+from counterweight.file_view import _BLOCK_SIZE, FileIndex, file_view, use_file_index
+from counterweight.hooks import use_state
+from counterweight.styles.utilities import col, full
+
+
+@pytest.fixture
+def big_file(tmp_path: Path) -> Path:
+    # Enough lines to span many index blocks, with lines that straddle block boundaries.
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"line {i} {'x' * (i % 97)}\n" for i in range(20_000)))
+    assert path.stat().st_size > 4 * _BLOCK_SIZE
+    return path
+
+
+def _index(path: Path, encoding: str = "utf-8") -> FileIndex:
+    index = FileIndex(path, encoding=encoding)
+    index.start()
+    assert index._thread is not None
+    index._thread.join()
+    return index
+
+
+def test_line_count(big_file: Path) -> None:
+    index = _index(big_file)
+
+    assert index.complete
+    assert index.line_count == 20_000
+
+    index.close()
+
+
+@pytest.mark.parametrize("first", [0, 1, 657, 9_999, 19_998])
+def test_lines(big_file: Path, first: int) -> None:
+    index = _index(big_file)
+    expected = big_file.read_text().splitlines()
+
+    assert index.lines(first, 3) == expected[first : first + 3]
+
+    index.close()
+
+
+def test_line_starts(big_file: Path) -> None:
+    index = _index(big_file)
+    content = big_file.read_bytes()
+    starts = [0, *(offset + 1 for offset in range(len(content) - 1) if content[offset] == ord("\n"))]
+
+    # Every line, in an order that reads each block's lines both before and after the block is first visited.
+    for line in [*range(0, 20_000, 7), *range(19_999, -1, -3)]:
+        assert index._line_start(line) == starts[line]
+
+    index.close()
+
+
+def test_lines_past_the_end(big_file: Path) -> None:
+    index = _index(big_file)
+
+    assert index.lines(19_999, 5) == [f"line 19999 {'x' * (19_999 % 97)}"]
+    assert index.lines(20_000, 5) == []
+
+    index.close()
+
+
+def test_find(big_file: Path) -> None:
+    index = _index(big_file)
+
+    assert index.find("line 12345 ") == 12_345
+    assert index.find("line 1 ", start_line=2) is None
+    assert index.find("no such line") is None
+
+    index.close()
+
+
+@pytest.mark.parametrize(
+    ("content", "lines"),
+    (
+        ("", []),
+        ("a", ["a"]),
+        ("a\n", ["a"]),
+        ("a\r\nb", ["a", "b"]),
+        ("\n\n", ["", ""]),
+    ),
+)
+def test_small_files(tmp_path: Path, content: str, lines: list[str]) -> None:
+    path = tmp_path / "small.log"
+    path.write_bytes(content.encode())
+    index = _index(path)
+
+    assert index.line_count == len(lines)
+    assert index.lines(0, 10) == lines
+
+    index.close()
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-32", "utf-8-sig", "cp500"])
+def test_encodings_must_be_ascii_compatible(tmp_path: Path, encoding: str) -> None:
+    path = tmp_path / "small.log"
+    path.write_text("a\nb\n", encoding=encoding)
+
+    with pytest.raises(ValueError, match="ASCII-compatible"):
+        FileIndex(path, encoding=encoding)
+
+
+def test_latin_1(tmp_path: Path) -> None:
+    path = tmp_path / "small.log"
+    path.write_text("café\nnaïve\n", encoding="latin-1")
+    index = _index(path, encoding="latin-1")
+
+    assert index.lines(0, 2) == ["café", "naïve"]
+    assert index.find("naïve") == 1
+
+    index.close()
+
+
+async def test_file_view_shows_lines_from_top(big_file: Path) -> None:
+    index = _index(big_file)
+
+    @component
+    def root() -> Div:
+        return Div(style=col, children=[file_view(index, top=100, style=full)])
+
+    capture = io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(8, 2),
+        autopilot=(
+            PrintPaint(stream=capture, ansi=False),
+            Quit(),
+        ),
+    )
+
+    assert capture.getvalue().rstrip("\n") == "line 100\nline 101"
+
+    index.close()
+
+
+async def test_use_file_index_follows_path(tmp_path: Path) -> None:
+    paths = [tmp_path / "a.log", tmp_path / "b.log"]
+    paths[0].write_text("first\n")
+    paths[1].write_text("second\n")
+    indexes: list[FileIndex] = []
+
+    @component
+    def root() -> Div:
+        choice, set_choice = use_state(0)
+        index = use_file_index(paths[choice], poll_interval=0.01)
+        indexes.append(index)
+
+        def on_key(event: KeyPressed) -> None:
+            set_choice(1)
+
+        return Div(style=col, children=[file_view(index, style=full)], on_key=on_key)
+
+    capture = io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(8, 1),
+        autopilot=(
+            Wait(seconds=0.1),
+            KeyPressed(key="n"),
+            Wait(seconds=0.1),
+            PrintPaint(stream=capture, ansi=False),
+            Quit(),
+        ),
+    )
+
+    assert capture.getvalue().rstrip("\n") == "second  "
+    first, *_, last = indexes
+    assert (first.path, last.path) == (paths[0], paths[1])
+    assert first._stop.is_set()
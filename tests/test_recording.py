@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+from asyncio import sleep
+from itertools import pairwise
+from pathlib import Path
+from time import perf_counter
+
+from counterweight.app import app
+from counterweight.clock import VirtualClock
+from counterweight.components import component
+from counterweight.controls import Quit, Wait
+from counterweight.elements import Text
+from counterweight.events import (
+    KeyPressed,
+    MouseDown,
+    MouseMoved,
+    MouseScrolledDown,
+    MouseScrolledUp,
+    MouseUp,
+    TerminalResized,
+)
+from counterweight.geometry import Position
+from counterweight.hooks import use_effect, use_state
+from counterweight.keys import Key
+from counterweight.recording import (
+    AsciicastRecorder,
+    InputRecorder,
+    InputRecording,
+    RecordedEvent,
+)
+from counterweight.replay import replay
+
+
+def _read(path: Path) -> tuple[dict[str, object], list[list[object]]]:
+    header, *events = (json.loads(line) for line in path.read_text().splitlines())
+    return header, events
+
+
+async def test_asciicast_recording(tmp_path: Path) -> None:
+    @component
+    def root() -> Text:
+        count, set_count = use_state(0)
+
+        def on_key(event: KeyPressed) -> None:
+            set_count(lambda c: c + 1)
+
+        return Text(content=f"count={count}", on_key=on_key)
+
+    path = tmp_path / "recordings" / "app.cast"
+    await app(
+        root,
+        headless=True,
+        dimensions=(20, 3),
+        autopilot=[KeyPressed(key=Key.Space), TerminalResized(dimensions=(30, 4)), Quit()],
+        recorder=AsciicastRecorder(path, title="test"),
+    )
+
+    header, events = _read(path)
+
+    assert header["version"] == 2
+    assert header["width"] == 20
+    assert header["height"] == 3
+    assert header["title"] == "test"
+
+    output = "".join(str(data) for _, code, data in events if code == "o")
+    assert "count=0" in output
+    assert "=1" in output
+
+    assert [data for _, code, data in events if code == "r"] == ["30x4"]
+
+    times = [float(str(t)) for t, _, _ in events]
+    assert times == sorted(times)
+
+
+async def test_asciicast_frame_markers(tmp_path: Path) -> None:
+    @component
+    def root() -> Text:
+        return Text(content="héllo")
+
+    path = tmp_path / "app.cast"
+    await app(root, headless=True, dimensions=(10, 2), autopilot=[Quit()], recorder=AsciicastRecorder(path))
+
+    _, events = _read(path)
+
+    for (_, code, data), (_, next_code, next_data) in pairwise(events):
+        if code == "o":
+            assert next_code == "m"
+            assert next_data == f"{len(str(data).encode())} bytes"
+
+
+async def test_asciicast_without_frame_markers(tmp_path: Path) -> None:
+    @component
+    def root() -> Text:
+        return Text(content="hello")
+
+    path = tmp_path / "app.cast"
+    await app(
+        root,
+        headless=True,
+        dimensions=(10, 2),
+        autopilot=[Quit()],
+        recorder=AsciicastRecorder(path, frame_markers=False),
+    )
+
+    _, events = _read(path)
+
+    assert {code for _, code, _ in events} == {"o"}
+
+
+@component
+def counter() -> Text:
+    count, set_count = use_state(0)
+
+    def on_key(event: KeyPressed) -> None:
+        set_count(lambda c: c + 1)
+
+    return Text(content=f"count={count}", on_key=on_key)
+
+
+async def test_input_recording_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "session.jsonl"
+    events: list[RecordedEvent] = [
+        KeyPressed(key="a"),
+        MouseMoved(absolute=Position(1, 2), button=None),
+        MouseDown(absolute=Position(1, 2), button=1),
+        MouseUp(absolute=Position(1, 2), button=1),
+        MouseScrolledDown(absolute=Position(3, 0)),
+        MouseScrolledUp(absolute=Position(3, 0)),
+        TerminalResized(dimensions=(25, 5)),
+        KeyPressed(key=Key.Enter),
+    ]
+
+    await app(
+        counter,
+        headless=True,
+        dimensions=(20, 3),
+        autopilot=[*events, Quit()],
+        input_recorder=InputRecorder(path),
+    )
+
+    recording = InputRecording.load(path)
+
+    assert (recording.width, recording.height) == (20, 3)
+    assert [event for _, event in recording.events] == events
+    assert all(gap >= 0 for gap, _ in recording.events)
+
+
+def test_input_recording_autopilot() -> None:
+    recording = InputRecording(
+        width=10,
+        height=2,
+        events=((0.0, KeyPressed(key="a")), (0.5, KeyPressed(key="b"))),
+    )
+
+    assert list(recording.autopilot()) == [KeyPressed(key="a"), Wait(seconds=0.5), KeyPressed(key="b"), Quit()]
+    assert list(recording.autopilot(realtime=False)) == [KeyPressed(key="a"), KeyPressed(key="b"), Quit()]
+
+
+async def test_wait_pauses_autopilot_while_the_app_runs() -> None:
+    ticks: list[int] = []
+
+    @component
+    def ticker() -> Text:
+        tick, set_tick = use_state(0)
+
+        async def run() -> None:
+            while True:
+                await sleep(0.01)
+                set_tick(lambda t: t + 1)
+
+        use_effect(run, deps=())
+        ticks.append(tick)
+
+        return Text(content=str(tick))
+
+    start = perf_counter()
+    await app(ticker, headless=True, dimensions=(10, 2), autopilot=[Wait(seconds=0.1), Quit()])
+
+    assert perf_counter() - start >= 0.1
+    # The app kept rendering while the autopilot was paused.
+    assert max(ticks) >= 3
+
+
+async def test_replay(tmp_path: Path) -> None:
+    path = tmp_path / "session.jsonl"
+    await app(
+        counter,
+        headless=True,
+        dimensions=(20, 3),
+        autopilot=[KeyPressed(key="a"), KeyPressed(key="b"), Quit()],
+        input_recorder=InputRecorder(path),
+    )
+
+    timings = await replay(counter, InputRecording.load(path))
+
+    assert len(timings.frames) >= 3
+    summary = timings.summary()
+    assert {"shadow", "layout", "paint", "diff", "instructions", "total"} <= summary.keys()
+    assert summary["total"].count == len(timings.frames)
+    assert "shadow" in timings.report()
+
+
+async def test_replay_on_a_virtual_clock() -> None:
+    recording = InputRecording(
+        width=20,
+        height=3,
+        events=((30.0, KeyPressed(key="a")), (30.0, KeyPressed(key="b"))),
+    )
+    clock = VirtualClock()
+
+    start = perf_counter()
+    timings = await replay(counter, recording, clock=clock)
+
+    assert perf_counter() - start < 5
+    assert clock.elapsed >= 60
+    assert len(timings.frames) >= 3
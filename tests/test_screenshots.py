@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from pathlib import Path
+from textwrap import dedent
+
+from typer.testing import CliRunner
+
+from counterweight.cli import cli
+from counterweight.components import component
+from counterweight.controls import Quit, Screenshot
+from counterweight.elements import Text
+from counterweight.screenshots import ScreenshotJob, render_screenshots, run_scripts
+
+
+@component
+def root() -> Text:
+    return Text(content="hello")
+
+
+def test_render_screenshots(tmp_path: Path) -> None:
+    jobs = [
+        ScreenshotJob(
+            root=root,
+            dimensions=(10, 2),
+            autopilot=[Screenshot.to_file(tmp_path / f"{n}.svg"), Quit()],
+        )
+        for n in range(4)
+    ]
+
+    elapsed = render_screenshots(jobs, processes=2)
+
+    assert len(elapsed) == len(jobs)
+    for n in range(4):
+        assert "hello" in (tmp_path / f"{n}.svg").read_text()
+
+
+def test_render_screenshots_from_reference(tmp_path: Path) -> None:
+    job = ScreenshotJob(
+        root=f"{__name__}:root",
+        dimensions=(10, 2),
+        autopilot=[Screenshot.to_file(tmp_path / "screenshot.svg"), Quit()],
+    )
+
+    render_screenshots([job], processes=1)
+
+    assert "hello" in (tmp_path / "screenshot.svg").read_text()
+
+
+SCRIPT = dedent(
+    """\
+    import asyncio
+    from pathlib import Path
+
+    from counterweight.app import app
+    from counterweight.components import component
+    from counterweight.controls import Quit, Screenshot
+    from counterweight.elements import Text
+
+
+    @component
+    def root() -> Text:
+        return Text(content="hello")
+
+
+    if __name__ == "__main__":
+        asyncio.run(
+            app(
+                root,
+                headless=True,
+                dimensions=(10, 2),
+                autopilot=[Screenshot.to_file(Path(__file__).with_suffix(".svg")), Quit()],
+            )
+        )
+    """
+)
+
+
+def test_render_screenshots_from_file_reference(tmp_path: Path) -> None:
+    script = tmp_path / "example.py"
+    script.write_text(SCRIPT)
+    job = ScreenshotJob(
+        root=f"{script}:root",
+        dimensions=(10, 2),
+        autopilot=[Screenshot.to_file(tmp_path / "screenshot.svg"), Quit()],
+    )
+
+    render_screenshots([job], processes=1)
+
+    assert "hello" in (tmp_path / "screenshot.svg").read_text()
+
+
+def test_run_scripts(tmp_path: Path) -> None:
+    scripts = [tmp_path / f"example_{n}.py" for n in range(3)]
+    for script in scripts:
+        script.write_text(SCRIPT)
+
+    run_scripts(scripts, processes=2)
+
+    for script in scripts:
+        assert "hello" in script.with_suffix(".svg").read_text()
+
+
+def test_screenshots_command(runner: CliRunner, tmp_path: Path) -> None:
+    script = tmp_path / "example.py"
+    script.write_text(SCRIPT)
+
+    result = runner.invoke(cli, ("screenshots", str(script), "--processes", "1"))
+
+    assert result.exit_code == 0, result.output
+    assert "Ran 1 scripts" in result.output
+    assert "hello" in script.with_suffix(".svg").read_text()
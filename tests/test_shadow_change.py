@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+import waxy
+
+from counterweight.app import app
+from counterweight.components import component
+from counterweight.controls import PrintPaint, Quit
+from counterweight.elements import AnyElement, Chunk, Div, LogView, Text, TextArea
+from counterweight.events import KeyPressed
+from counterweight.hooks import LogBuffer, TextBuffer, use_rects, use_state
+from counterweight.hooks.impls import Hooks
+from counterweight.shadow import ShadowChange, ShadowNode, classify_change
+from counterweight.styles.styles import CellStyle, Color
+from counterweight.styles.utilities import border_heavy, border_light, col, size, text_wrap_stable
+
+
+def _shadow(element: AnyElement, children: list[ShadowNode] | None = None) -> ShadowNode:
+    return ShadowNode(component=None, element=element, hooks=Hooks(), children=children or [])
+
+
+def _tree(text: Text, div: Div | None = None) -> ShadowNode:
+    return _shadow(div or Div(style=col), children=[_shadow(text)])
+
+
+@pytest.mark.parametrize(
+    ("previous", "new", "expected"),
+    (
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="hello world")),
+            ShadowChange.PAINT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="jello wurld")),
+            ShadowChange.PAINT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content=[Chunk(content="hello world", style=CellStyle(foreground=Color.from_name("red")))])),
+            ShadowChange.PAINT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="hello worlds")),
+            ShadowChange.LAYOUT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="hello_world")),
+            ShadowChange.LAYOUT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="hello\nworld")),
+            ShadowChange.LAYOUT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="hello world", style=text_wrap_stable)),
+            ShadowChange.LAYOUT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _tree(Text(content="hello world", style=size(5, 5))),
+            ShadowChange.LAYOUT,
+        ),
+        (
+            _tree(Text(content="hello world"), Div(style=col | border_light)),
+            _tree(Text(content="hello world"), Div(style=col | border_heavy)),
+            ShadowChange.PAINT,
+        ),
+        (
+            _shadow(Div(style=col | border_light)),
+            _shadow(Div(style=col | border_heavy)),
+            ShadowChange.PAINT,
+        ),
+        (
+            _shadow(Div(style=col), children=[_shadow(LogView(buffer=LogBuffer(max_lines=10)))]),
+            _shadow(
+                Div(style=col), children=[_shadow(LogView(buffer=LogBuffer(max_lines=10), follow=False, offset=3))]
+            ),
+            ShadowChange.PAINT,
+        ),
+        (
+            _shadow(Div(style=col), children=[_shadow(TextArea(buffer=TextBuffer("hello")))]),
+            _shadow(Div(style=col), children=[_shadow(TextArea(buffer=TextBuffer("hello", multiline=False)))]),
+            ShadowChange.LAYOUT,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _shadow(Div(style=col), children=[_shadow(Div())]),
+            ShadowChange.STRUCTURE,
+        ),
+        (
+            _tree(Text(content="hello world")),
+            _shadow(Div(style=col), children=[_shadow(Text(content="hello world")), _shadow(Div())]),
+            ShadowChange.STRUCTURE,
+        ),
+    ),
+)
+def test_classify_change(previous: ShadowNode, new: ShadowNode, expected: ShadowChange) -> None:
+    assert classify_change(new, previous) is expected
+
+
+def test_classify_change_same_tree_is_no_change() -> None:
+    tree = _tree(Text(content="hello world"))
+
+    assert classify_change(tree, tree) is ShadowChange.NONE
+
+
+async def test_paint_only_change_renders_with_reused_layout() -> None:
+    @component
+    def root() -> Div:
+        word, set_word = use_state("hello")
+
+        def on_key(event: KeyPressed) -> None:
+            set_word("jello")
+
+        return Div(style=col, children=[Text(content=word)], on_key=on_key)
+
+    c1, c2 = io.StringIO(), io.StringIO()
+    await app(
+        root,
+        headless=True,
+        dimensions=(5, 1),
+        autopilot=(
+            PrintPaint(stream=c1, ansi=False),
+            KeyPressed(key="f"),
+            PrintPaint(stream=c2, ansi=False),
+            Quit(),
+        ),
+    )
+
+    assert c1.getvalue().rstrip("\n") == "hello"
+    assert c2.getvalue().rstrip("\n") == "jello"
+
+
+async def test_swapped_component_gets_its_rects_from_a_reused_layout() -> None:
+    borders: list[tuple[str, waxy.Rect]] = []
+
+    @component
+    def labelled(label: str, renders: int) -> Text:
+        borders.append((label, use_rects().border))
+        return Text(content=f"{label}{renders:<19}")
+
+    @component
+    def root() -> Div:
+        renders, set_renders = use_state(0)
+
+        def on_key(event: KeyPressed) -> None:
+            set_renders(lambda r: r + 1)
+
+        # Swapping the key mounts a new component, but the tree keeps its shape, so the layout is reused.
+        label = "a" if renders == 0 else "b"
+        return Div(style=col, children=[labelled(label, renders).with_key(label)], on_key=on_key)
+
+    await app(
+        root,
+        headless=True,
+        dimensions=(20, 1),
+        autopilot=(KeyPressed(key="x"), KeyPressed(key="x"), KeyPressed(key="x"), Quit()),
+    )
+
+    label, border = borders[-1]
+    assert label == "b"
+    assert border == waxy.Rect(left=0, right=19, top=0, bottom=0)
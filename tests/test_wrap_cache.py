@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from counterweight.elements import Chunk, Text
+from counterweight.layout import WrapCache, WrapCacheInfo, iter_wrap_text
+from counterweight.styles.styles import CellStyle, Color
+
+
+def test_wrap_cache_returns_same_lines_as_iter_wrap_text() -> None:
+    cache = WrapCache(maxsize=8)
+    t = "the quick brown fox jumps over the lazy dog"
+
+    assert cache.wrap(t, "pretty", 10) == list(iter_wrap_text(t, "pretty", 10))
+
+
+def test_wrap_cache_hits_on_same_text_mode_and_width() -> None:
+    cache = WrapCache(maxsize=8)
+
+    first = cache.wrap("hello world", "stable", 5)
+    second = cache.wrap("hello world", "stable", 5)
+
+    assert second is first
+    assert cache.info() == WrapCacheInfo(hits=1, misses=1, maxsize=8, currsize=1)
+
+
+def test_wrap_cache_misses_on_different_width_or_mode() -> None:
+    cache = WrapCache(maxsize=8)
+    t = "hello world"
+
+    cache.wrap(t, "stable", 5)
+    cache.wrap(t, "stable", 6)
+    cache.wrap(t, "balance", 5)
+    cache.wrap(t, "stable", None)
+
+    assert cache.info().misses == 4
+    assert cache.info().hits == 0
+
+
+def test_wrap_cache_is_shared_by_texts_with_different_styles() -> None:
+    cache = WrapCache(maxsize=8)
+    red = CellStyle(foreground=Color.from_name("red"))
+
+    cache.wrap(Text(content="hello world").styled.text, "stable", 5)
+    cache.wrap(Text(content=[Chunk(content="hello world", style=red)]).styled.text, "stable", 5)
+
+    assert cache.info().hits == 1
+
+
+def test_wrap_cache_is_bounded() -> None:
+    cache = WrapCache(maxsize=2)
+
+    for width in range(1, 6):
+        cache.wrap("hello world", "stable", width)
+
+    assert cache.info().currsize == 2
+
+
+def test_wrap_cache_clear_resets_stats() -> None:
+    cache = WrapCache(maxsize=2)
+    cache.wrap("hello world", "stable", 5)
+    cache.wrap("hello world", "stable", 5)
+
+    cache.clear()
+
+    assert cache.info() == WrapCacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_wrap_cache_limit_returns_only_the_first_lines() -> None:
+    cache = WrapCache(maxsize=8)
+    t = "\n".join(str(i) for i in range(100))
+
+    lines = cache.wrap(t, "stable", 5, limit=3)
+
+    assert lines == list(iter_wrap_text(t, "stable", 5))[:3]
+
+
+def test_wrap_cache_resumes_wrapping_when_more_lines_are_needed() -> None:
+    cache = WrapCache(maxsize=8)
+    t = "\n".join(str(i) for i in range(100))
+
+    cache.wrap(t, "stable", 5, limit=3)
+    cache.wrap(t, "stable", 5, limit=2)
+    more = cache.wrap(t, "stable", 5, limit=10)
+    everything = cache.wrap(t, "stable", 5)
+
+    assert more == everything[:10]
+    assert everything == list(iter_wrap_text(t, "stable", 5))
+    assert cache.info().hits == 1
+    assert cache.info().misses == 3
+
+
+def test_wrap_cache_limit_past_the_end_hits_once_complete() -> None:
+    cache = WrapCache(maxsize=8)
+
+    first = cache.wrap("hello world", "stable", 5, limit=10)
+    second = cache.wrap("hello world", "stable", 5, limit=10)
+
+    assert second is first
+    assert cache.info() == WrapCacheInfo(hits=1, misses=1, maxsize=8, currsize=1)
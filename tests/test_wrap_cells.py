@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import re
+import sys
+from collections.abc import Iterator
+from types import FrameType
+
 import pytest
+from hypothesis import given
+from hypothesis.strategies import integers, lists, sampled_from
 
 from counterweight.elements import CellPaint
-from counterweight.layout import wrap_cells
+from counterweight.layout import Line, iter_wrap_cells, iter_wrap_text, wrap_cells
 from counterweight.styles.styles import CellStyle, TextWrap
 
 
@@ -19,6 +26,63 @@ def lines_text(ls: list[list[CellPaint]]) -> list[str]:
     return [text(l) for l in ls]
 
 
+# ---------------------------------------------------------------------------
+# Limits
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("mode", ["none", "stable", "balance", "pretty"])
+def test_limit_returns_prefix(mode: TextWrap) -> None:
+    c = cells("the quick brown fox\njumps over\nthe lazy dog")
+
+    assert wrap_cells(c, mode, 6, limit=4) == wrap_cells(c, mode, 6)[:4]
+
+
+def test_limit_larger_than_line_count() -> None:
+    assert lines_text(wrap_cells(cells("hello world"), "stable", 5, limit=10)) == ["hello", "world"]
+
+
+def test_iter_wrap_cells_only_consumes_the_paragraphs_it_needs() -> None:
+    consumed = 0
+
+    def source() -> Iterator[CellPaint]:
+        nonlocal consumed
+        for char in "aaa\nbbb\nccc\nddd":
+            consumed += 1
+            yield CellPaint(char=char)
+
+    lines = iter_wrap_cells(source(), "stable", 10)
+
+    assert text(next(lines)) == "aaa"
+    assert text(next(lines)) == "bbb"
+    assert consumed == len("aaa\nbbb\n")
+
+
+# ---------------------------------------------------------------------------
+# Lines as spans of the text
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    ("content", "mode", "width", "expected"),
+    (
+        ("hello world", "none", None, [Line(0, 11)]),
+        ("hello\nworld", "none", 3, [Line(0, 5), Line(6, 11)]),
+        ("  hello   world  ", "stable", 20, [Line(2, 15)]),
+        ("hello world", "stable", 5, [Line(0, 5), Line(6, 11)]),
+        ("abcdefghij", "pretty", 4, [Line(0, 3, hyphen=True), Line(3, 6, hyphen=True), Line(6, 10)]),
+        ("abc", "balance", 1, [Line(0, 1), Line(1, 2), Line(2, 3)]),
+        ("a\n\nb", "stable", 5, [Line(0, 1), Line(2, 2), Line(3, 4)]),
+    ),
+)
+def test_iter_wrap_text(content: str, mode: TextWrap, width: int | None, expected: list[Line]) -> None:
+    assert list(iter_wrap_text(content, mode, width)) == expected
+
+
+def test_line_length_counts_hyphen() -> None:
+    assert Line(3, 6, hyphen=True).length == 4
+
+
 # ---------------------------------------------------------------------------
 # "none" mode
 # ---------------------------------------------------------------------------
@@ -175,6 +239,75 @@ def test_pretty_multi_space_run_in_line_length() -> None:
     assert lines_text(result)[-1] == "c"
 
 
+def _reference_pretty_cost(words: list[int], spaces: list[int], width: int) -> int:
+    """The quadratic-time dynamic program that "pretty" wrapping used to run, returning only the optimal cost."""
+    n = len(words)
+    best = [0] + [-1] * n  # best[j] = min cost of the lines before word j
+    for j in range(1, n + 1):
+        length = 0
+        for i in range(j - 1, -1, -1):
+            length += words[i] + (spaces[i] if i < j - 1 else 0)
+            if length > width:
+                break
+            cost = best[i] + (0 if j == n else (width - length) ** 2)
+            if best[j] < 0 or cost < best[j]:
+                best[j] = cost
+    return best[n]
+
+
+def _pretty_cost(lines: list[str], width: int) -> int:
+    return sum((width - len(line)) ** 2 for line in lines[:-1])
+
+
+@given(
+    words=lists(integers(min_value=1, max_value=8), min_size=1, max_size=40),
+    gaps=lists(sampled_from([1, 1, 1, 2, 3]), min_size=40, max_size=40),
+    width=integers(min_value=8, max_value=30),
+)
+def test_pretty_is_optimal(words: list[int], gaps: list[int], width: int) -> None:
+    spaces = gaps[: len(words) - 1]
+    content = "".join("x" * word + (" " * spaces[idx] if idx < len(spaces) else "") for idx, word in enumerate(words))
+
+    result = lines_text(wrap_cells(cells(content), "pretty", width))
+
+    assert all(len(line) <= width for line in result)
+    assert [len(word) for line in result for word in line.split()] == words
+    assert _pretty_cost(result, width) == _reference_pretty_cost(words, spaces, width)
+
+
+def _count_takeover_calls(words: list[int], width: int) -> int:
+    calls = 0
+
+    def profile(frame: FrameType, event: str, arg: object) -> None:
+        nonlocal calls
+        if event == "call" and frame.f_code.co_name == "takeover":
+            calls += 1
+
+    content = " ".join("x" * word for word in words)
+    sys.setprofile(profile)
+    try:
+        wrap_cells(cells(content), "pretty", width)
+    finally:
+        sys.setprofile(None)
+
+    return calls
+
+
+@pytest.mark.parametrize("n", (1_000, 2_000, 4_000))
+def test_pretty_is_linear_time(n: int) -> None:
+    # With a wide line, a quadratic algorithm would compare each word with ~width/avg-word-length earlier breaks,
+    # while the linear one compares it with O(1) of them, amortized, however wide the line is.
+    words = [(idx * 7) % 9 + 1 for idx in range(n)]
+
+    assert _count_takeover_calls(words, width=2_000) <= 5 * n
+
+
+def test_pretty_lines_have_no_edge_spaces() -> None:
+    result = lines_text(wrap_cells(cells("aaa bb  c dddd e ff ggg"), "pretty", 7))
+
+    assert all(not re.match(r"^\s|.*\s$", line) for line in result)
+
+
 # ---------------------------------------------------------------------------
 # Whitespace preservation
 # ---------------------------------------------------------------------------